@@ -1,31 +1,42 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
-import os
+from sqlalchemy import event
 
-db = SQLAlchemy()
+from app.config import config
+from app.read_routing import RoutingSession, READ_BIND, configure_read_bind
+
+# Read-only routes (@read_only) use their own read-only connections when
+# READ_ONLY_ROUTING is on, see read_routing.py
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 migrate = Migrate()
 
 def create_app(config_name='development'):
     app = Flask(__name__)
     
-    # Configuration
-    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///rca_tool.db')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['UPLOAD_FOLDER'] = 'uploads/investigations'
-    app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
+    # Configuration ('development', 'testing' or 'production', see config.py)
+    app.config.from_object(config[config_name])
+    if app.config['READ_ONLY_ROUTING']:
+        configure_read_bind(app)
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+        if READ_BIND in db.engines:
+            # journal_mode is a property of the file, a read-only connection can't set it
+            apply_sqlite_pragmas(db.engines[READ_BIND], {name: value for name, value in app.config['SQLITE_PRAGMAS'].items()
+                                                         if name != 'journal_mode'})
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
     migrate.init_app(app, db)
     
     # Import models
-    from app.models.investigation import User, Investigation, InvestigationFact
+    from app.models.investigation import User, Investigation, InvestigationFact, ensure_why_path_column, \
+        rebuild_why_paths
     
     @login_manager.user_loader
     def load_user(user_id):
@@ -42,6 +53,33 @@ def create_app(config_name='development'):
     
     # Create tables
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
+        if ensure_why_path_column():
+            print("Added why_tree_node.path column, rebuilding...")
+            rebuild_why_paths()
+    
+    @app.cli.command('rebuild-why-paths')
+    def rebuild_why_paths_command():
+        """Fill in why-tree paths from parent_id (nodes created before the path column)"""
+        ensure_why_path_column()
+        click.echo(f"{rebuild_why_paths()} why nodes updated")
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Refill the full-text search index from investigations, facts and timeline events"""
+        from app.search import rebuild_search_index
+        click.echo(f"{rebuild_search_index()} entries indexed")
+    
+    return app
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Set the PRAGMAs on every new connection (they only last for one connection)"""
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
     
-    return app
\ No newline at end of file
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
@@ -0,0 +1,57 @@
+import os
+
+
+class Config:
+    """Settings shared by every environment"""
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///rca_tool.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    UPLOAD_FOLDER = 'uploads/investigations'
+    MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB max file size
+    DASHBOARD_PAGE_SIZE = 25
+    SEARCH_PAGE_SIZE = 20
+
+    # Reference numbers each worker reserves at a time (1 keeps them in order)
+    REFERENCE_BLOCK_SIZE = 1
+
+    # PRAGMAs run on every new SQLite connection (see create_app)
+    SQLITE_PRAGMAS = {}
+
+    # Send @read_only routes to a separate read-only connection pool
+    READ_ONLY_ROUTING = False
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+class ProductionConfig(Config):
+    # WAL: readers keep reading the last commit while a writer is busy,
+    # instead of waiting for it (only one writer at a time still)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',   # safe with WAL, no fsync on every commit
+        'cache_size': -64000,      # 64 MB page cache per connection
+        'mmap_size': 268435456,    # 256 MB memory-mapped reads
+        'busy_timeout': 5000,      # ms to wait for the write lock
+        'temp_store': 'MEMORY',
+    }
+    READ_ONLY_ROUTING = True
+    REFERENCE_BLOCK_SIZE = 20
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+    }
+
+
+config = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
@@ -1,8 +1,15 @@
-from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
+import os
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
 
-db = SQLAlchemy()
+# The app's db (set up in create_app), so these models use its engines and session
+from app import db
 
 class User(UserMixin, db.Model):
     """User model - you might already have this"""
@@ -50,13 +57,19 @@ class Investigation(db.Model):
     files = db.relationship('InvestigationFile', backref='investigation', lazy=True, cascade='all, delete-orphan')
     action_items = db.relationship('ActionItem', backref='investigation', lazy=True, cascade='all, delete-orphan')
     
+    # Investigations open longer than this count as overdue on the dashboard
+    OVERDUE_DAYS = 30
+    
+    # Dashboard lists a user's investigations newest first
+    __table_args__ = (
+        db.Index('ix_investigation_creator_created', 'created_by_id', 'created_at'),
+    )
+    
     def generate_reference_number(self):
-        """Auto-generate reference number"""
+        """Assign the next RCA-YYYY-NNN number (see ReferenceNumberAllocator)"""
         year = datetime.now().year
-        count = Investigation.query.filter(
-            db.extract('year', Investigation.created_at) == year
-        ).count() + 1
-        self.reference_number = f"RCA-{year}-{count:03d}"
+        number = reference_numbers.next_number(year, current_app.config['REFERENCE_BLOCK_SIZE'])
+        self.reference_number = f"RCA-{year}-{number:03d}"
     
     @property
     def progress(self):
@@ -71,6 +84,11 @@ class Investigation(db.Model):
         }
         return progress_map.get(self.status, 0)
     
+    @staticmethod
+    def overdue_cutoff(now=None):
+        """Incidents on or before this are overdue (days_since_incident > OVERDUE_DAYS)"""
+        return (now or datetime.utcnow()) - timedelta(days=Investigation.OVERDUE_DAYS + 1)
+    
     @property
     def days_since_incident(self):
         """Calculate days since incident"""
@@ -138,18 +156,90 @@ class WhyTreeNode(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     
+    # Materialized path: ids from the top of the tree down to this node,
+    # e.g. '/12/40/57/'. Set on insert and move (see the hooks below), so a
+    # subtree is one range scan on ix_why_tree_node_investigation_path
+    path = db.Column(db.String(255))
+    
     # Self-referential relationship for tree structure
     children = db.relationship('WhyTreeNode', backref=db.backref('parent', remote_side=[id]))
     
+    __table_args__ = (
+        db.Index('ix_why_tree_node_investigation_path', 'investigation_id', 'path'),
+    )
+    
     def calculate_level(self):
-        """Calculate node level in tree"""
-        if not self.parent_id:
+        """Calculate node level in tree from the path instead of walking the parents"""
+        if self.path:
+            self.level = path_depth(self.path)
+        elif not self.parent_id:
             self.level = 1
         else:
-            self.level = self.parent.level + 1
-            # Auto-mark as root cause if deep enough
-            if self.level >= 3:
-                self.is_root_cause = True
+            parent_path = db.session.query(WhyTreeNode.path).filter_by(id=self.parent_id).scalar()
+            self.level = path_depth(parent_path) + 1
+        # Auto-mark as root cause if deep enough
+        if self.level >= 3:
+            self.is_root_cause = True
+
+def path_depth(path):
+    """'/12/40/57/' -> 3"""
+    return path.count('/') - 1
+
+def path_upper_bound(path):
+    """First string after every path that starts with `path` ('0' follows '/')"""
+    return path[:-1] + '0'
+
+def parent_path_of(connection, node):
+    if node.parent_id is None:
+        return '/'
+    table = WhyTreeNode.__table__
+    return connection.scalar(db.select(table.c.path).where(table.c.id == node.parent_id))
+
+@event.listens_for(WhyTreeNode, 'after_insert')
+def set_why_path(mapper, connection, node):
+    """The id is only known after the INSERT, so the path is set right after it"""
+    path = f'{parent_path_of(connection, node)}{node.id}/'
+    table = WhyTreeNode.__table__
+    connection.execute(table.update().where(table.c.id == node.id).values(path=path, level=path_depth(path)))
+    set_committed_value(node, 'path', path)
+    set_committed_value(node, 'level', path_depth(path))
+
+@event.listens_for(WhyTreeNode, 'before_update')
+def move_why_subtree(mapper, connection, node):
+    """A new parent_id rewrites the path of the node and of its whole subtree
+
+    Deleting a node sets its children's parent_id to NULL, so they (and
+    their subtrees) become top nodes through this hook as well.
+    """
+    if not db.inspect(node).attrs.parent_id.history.has_changes():
+        return
+    old_path = node.path
+    new_path = f'{parent_path_of(connection, node)}{node.id}/'
+    if old_path and new_path.startswith(old_path):
+        raise ValueError(f'Why node {node.id} cannot be moved below itself')
+    
+    node.path = new_path
+    node.level = path_depth(new_path)
+    if not old_path:
+        return
+    
+    shift = path_depth(new_path) - path_depth(old_path)
+    table = WhyTreeNode.__table__
+    connection.execute(table.update().where(
+        table.c.investigation_id == node.investigation_id,
+        table.c.path > old_path,
+        table.c.path < path_upper_bound(old_path)
+    ).values(
+        path=db.literal(new_path) + db.func.substr(table.c.path, len(old_path) + 1),
+        level=table.c.level + shift
+    ))
+    
+    # Descendants already loaded in this session get the new values too
+    for other in list(object_session(node).identity_map.values()):
+        other_path = other.__dict__.get('path') if isinstance(other, WhyTreeNode) else None
+        if other is not node and other_path and other_path.startswith(old_path):
+            set_committed_value(other, 'path', new_path + other_path[len(old_path):])
+            set_committed_value(other, 'level', path_depth(other_path) + shift)
 
 class InvestigationFile(db.Model):
     """File attachments"""
@@ -185,4 +275,241 @@ class ActionItem(db.Model):
     def is_overdue(self):
         if self.status != 'completed' and self.due_date:
             return datetime.utcnow().date() > self.due_date
-        return False
\ No newline at end of file
+        return False
+
+class ReferenceSequence(db.Model):
+    """Last reference number handed out per year"""
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+def reserve_reference_block(year, size):
+    """Reserve the next `size` numbers of `year`; returns the last one
+
+    One UPDATE ... RETURNING in its own short transaction, so two workers can
+    never get the same numbers and nothing has to count investigations. The
+    first block of a year creates the row, starting after the highest
+    RCA-YYYY-NNN already stored (ON CONFLICT covers two workers doing that at once).
+    """
+    sequence = ReferenceSequence.__table__
+    with db.engine.begin() as connection:
+        last = connection.execute(
+            sequence.update()
+            .where(sequence.c.year == year)
+            .values(last_value=sequence.c.last_value + size)
+            .returning(sequence.c.last_value)
+        ).scalar()
+        if last is None:
+            prefix = f'RCA-{year}-'
+            highest = db.select(db.func.max(
+                db.cast(db.func.substr(Investigation.reference_number, len(prefix) + 1), db.Integer)
+            )).where(
+                Investigation.reference_number >= prefix,
+                Investigation.reference_number < f'RCA-{year}.'
+            ).scalar_subquery()
+            last = connection.execute(
+                sqlite_insert(sequence)
+                .values(year=year, last_value=db.func.coalesce(highest, 0) + size)
+                .on_conflict_do_update(index_elements=[sequence.c.year],
+                                       set_={'last_value': sequence.c.last_value + size})
+                .returning(sequence.c.last_value)
+            ).scalar()
+    return last
+
+class ReferenceNumberAllocator:
+    """Per-worker reference numbers, taken from blocks reserved in the database
+
+    Each worker process reserves REFERENCE_BLOCK_SIZE numbers at a time and
+    hands them out from memory, so most investigations need no extra
+    statement at all. Numbers of a reserved block that the worker never uses
+    (or of a create that fails) are skipped, and with blocks larger than 1
+    numbers from different workers are not in creation order.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}  # (process, engine, year) -> [next number, last number]
+
+    def next_number(self, year, block_size=1):
+        # The process id keeps a forked worker from reusing its parent's block
+        key = (os.getpid(), db.engine, year)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                last = reserve_reference_block(year, block_size)
+                block = self._blocks[key] = [last - block_size + 1, last]
+            number = block[0]
+            block[0] += 1
+            return number
+
+reference_numbers = ReferenceNumberAllocator()
+
+def load_investigation_detail(investigation_id):
+    """Everything the detail page shows, in a fixed number of queries
+
+    Returns None if the investigation does not exist. Collections use
+    selectinload (one extra SELECT ... WHERE investigation_id IN (...) each,
+    no duplicated parent rows); the single creator row is joined. The why
+    nodes come back as one flat list and build_why_tree links them, so
+    walking the tree costs nothing afterwards.
+    """
+    investigation = Investigation.query.options(
+        db.joinedload(Investigation.creator),
+        db.selectinload(Investigation.facts),
+        db.selectinload(Investigation.timeline_events),
+        db.selectinload(Investigation.why_nodes),
+        db.selectinload(Investigation.files),
+        db.selectinload(Investigation.action_items),
+    ).filter_by(id=investigation_id).first()
+    if investigation is None:
+        return None
+    
+    # Group facts by category in one pass
+    facts_by_category = {
+        category: {'label': label, 'facts': []} for category, label in InvestigationFact.CATEGORIES
+    }
+    for fact in investigation.facts:
+        if fact.category in facts_by_category:
+            facts_by_category[fact.category]['facts'].append(fact)
+    
+    return {
+        'investigation': investigation,
+        'facts_by_category': facts_by_category,
+        'timeline_events': sorted(investigation.timeline_events, key=lambda event: event.event_time),
+        'why_roots': build_why_tree(sorted(investigation.why_nodes, key=lambda node: (node.sequence or 0, node.id))),
+        'files': investigation.files,
+        'action_items': investigation.action_items,
+    }
+
+def investigation_stats(user_id, now=None):
+    """Dashboard counts for one user from a single aggregate query"""
+    completed = db.case((Investigation.status == 'completed', 1), else_=0)
+    overdue = db.case((Investigation.incident_date <= Investigation.overdue_cutoff(now), 1), else_=0)
+    
+    total, completed_count, overdue_count = db.session.query(
+        db.func.count(Investigation.id),
+        db.func.coalesce(db.func.sum(completed), 0),
+        db.func.coalesce(db.func.sum(overdue), 0),
+    ).filter(Investigation.created_by_id == user_id).one()
+    
+    return {
+        'total': total,
+        'in_progress': total - completed_count,
+        'completed': completed_count,
+        'overdue': overdue_count
+    }
+
+def encode_page_cursor(investigation):
+    return f"{investigation.created_at.isoformat()}_{investigation.id}"
+
+def decode_page_cursor(cursor):
+    """(created_at, id) from a cursor; ValueError if it is malformed"""
+    created_at, _, investigation_id = cursor.rpartition('_')
+    return datetime.fromisoformat(created_at), int(investigation_id)
+
+def investigation_page(user_id, cursor=None, page_size=25):
+    """One page of a user's investigations, newest first (keyset pagination)
+
+    Instead of OFFSET (which reads and throws away every earlier row), the
+    next page starts after the (created_at, id) of the last row shown, so
+    every page is a short range read on ix_investigation_creator_created.
+    Returns (investigations, cursor for the next page or None).
+    """
+    query = Investigation.query.filter(Investigation.created_by_id == user_id)
+    if cursor:
+        created_at, investigation_id = decode_page_cursor(cursor)
+        query = query.filter(db.tuple_(Investigation.created_at, Investigation.id) < (created_at, investigation_id))
+    
+    rows = query.order_by(Investigation.created_at.desc(), Investigation.id.desc()).limit(page_size + 1).all()
+    investigations = rows[:page_size]
+    next_cursor = encode_page_cursor(investigations[-1]) if len(rows) > page_size else None
+    return investigations, next_cursor
+
+def build_why_tree(nodes):
+    """Link a flat list of why nodes into trees in one pass; returns the top nodes
+
+    Sets each node's children (and parent, when it is in the list) directly,
+    so walking node.children / node.parent afterwards runs no queries.
+    Siblings keep their order in `nodes`. A node whose parent is not in the
+    list is a top node, e.g. the first node of a why_subtree result.
+    """
+    by_id = {node.id: node for node in nodes}
+    children = {node.id: [] for node in nodes}
+    tops = []
+    for node in nodes:
+        parent = by_id.get(node.parent_id)
+        if parent is None:
+            tops.append(node)
+        else:
+            children[parent.id].append(node)
+            set_committed_value(node, 'parent', parent)
+    for node in nodes:
+        set_committed_value(node, 'children', children[node.id])
+    return tops
+
+def why_tree_nodes(investigation_id):
+    """Every why node of an investigation, one query"""
+    return WhyTreeNode.query.filter_by(investigation_id=investigation_id).order_by(
+        WhyTreeNode.sequence, WhyTreeNode.id
+    ).all()
+
+def why_subtree(node):
+    """The node and everything below it, one range query on the path"""
+    return WhyTreeNode.query.filter(
+        WhyTreeNode.investigation_id == node.investigation_id,
+        WhyTreeNode.path >= node.path,
+        WhyTreeNode.path < path_upper_bound(node.path)
+    ).order_by(WhyTreeNode.sequence, WhyTreeNode.id).all()
+
+def why_ancestors(node):
+    """The chain of whys above a node, top first; the ids are in its path"""
+    ancestor_ids = [int(node_id) for node_id in node.path.strip('/').split('/')[:-1]]
+    if not ancestor_ids:
+        return []
+    return WhyTreeNode.query.filter(WhyTreeNode.id.in_(ancestor_ids)).order_by(WhyTreeNode.level).all()
+
+def why_root_causes(investigation_id):
+    """Nodes marked as root cause, in tree order"""
+    return WhyTreeNode.query.filter_by(investigation_id=investigation_id, is_root_cause=True).order_by(
+        WhyTreeNode.path
+    ).all()
+
+def ensure_why_path_column():
+    """Add WhyTreeNode.path and its index to databases created before they existed
+
+    create_all does not add columns to existing tables. Returns True if the
+    column was added; the paths then still have to be filled in with
+    rebuild_why_paths.
+    """
+    columns = [column['name'] for column in db.inspect(db.engine).get_columns('why_tree_node')]
+    with db.engine.begin() as connection:
+        if 'path' not in columns:
+            connection.execute(db.text('ALTER TABLE why_tree_node ADD COLUMN path VARCHAR(255)'))
+        connection.execute(db.text('CREATE INDEX IF NOT EXISTS ix_why_tree_node_investigation_path '
+                                   'ON why_tree_node (investigation_id, path)'))
+    return 'path' not in columns
+
+def rebuild_why_paths():
+    """Fill in path and level from parent_id for every why node
+
+    For databases created before the path column existed (after
+    ensure_why_path_column) and as a repair tool; one pass over
+    (id, parent_id). Returns the number of nodes.
+    """
+    parent_of = dict(db.session.execute(db.select(WhyTreeNode.id, WhyTreeNode.parent_id)).all())
+    paths = {}
+    for node_id in parent_of:
+        # Walk up to the first node whose path is known, then fill in downwards
+        chain = []
+        while node_id is not None and node_id not in paths:
+            chain.append(node_id)
+            node_id = parent_of.get(node_id)
+        path = paths[node_id] if node_id is not None else '/'
+        for chain_id in reversed(chain):
+            path = paths[chain_id] = f'{path}{chain_id}/'
+    
+    if paths:
+        db.session.execute(db.update(WhyTreeNode), [
+            {'id': node_id, 'path': path, 'level': path_depth(path)} for node_id, path in paths.items()
+        ])
+        db.session.commit()
+    return len(paths)
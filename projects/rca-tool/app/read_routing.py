@@ -0,0 +1,64 @@
+"""
+Read-only connection routing for the dashboard (see week06-database/read_routing.py)
+
+A trimmed copy of the course module: the rca-tool package is deployed on
+its own and does not import from the week folders. Only the mode=ro bind
+is kept; there is no replica (refresh_replica), since the dashboard must
+show an investigation as soon as it is saved. Fixes to the routing logic
+(RoutingSession, read_only, route_blueprint_reads) belong in both files.
+"""
+
+from functools import wraps
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+READ_BIND = 'read'
+ROLE_KEY = 'database.role'
+
+
+def configure_read_bind(app):
+    """Add a 'read' bind: the same SQLite file opened read-only (mode=ro)
+
+    Must run before db.init_app(app). Does nothing for in-memory or
+    non-SQLite databases.
+    """
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds[READ_BIND] = f'sqlite:///file:{url.database}?mode=ro&uri=true'
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+class RoutingSession(Session):
+    """Session that runs the queries of read-only routes on the read bind
+
+    A write from such a route fails ("attempt to write a readonly database")
+    instead of going anywhere unexpected.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_request_context() and request.environ.get(ROLE_KEY) == 'read'
+                and READ_BIND in self._db.engines):
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_read_connections():
+    request.environ[ROLE_KEY] = 'read'
+
+
+def read_only(view):
+    """Route decorator: this view only reads"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        use_read_connections()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def route_blueprint_reads(blueprint):
+    """Send every route of a blueprint to the read bind"""
+    blueprint.before_request(use_read_connections)
@@ -0,0 +1,172 @@
+"""
+Full-text search over investigations, facts and timeline events
+
+One SQLite FTS5 table, search_index, holds the searchable text of all
+three. Triggers on the source tables keep it in sync, so ORM writes, bulk
+inserts and cascaded deletes are all covered. The rowid encodes the source
+row (id * 4 + kind), so triggers find the entry to replace without a scan.
+
+search() returns ranked (bm25), highlighted, paginated matches, filtered by
+investigation severity/status and fact category.
+"""
+
+import re
+
+from markupsafe import escape
+from sqlalchemy import event
+
+from app import db
+
+KINDS = {'investigation': 1, 'fact': 2, 'event': 3}
+
+# bm25 weights (the index's rank): title matches count more than the text
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+# Unlikely in incident text; replaced by <mark> after HTML escaping
+MARK_START, MARK_END = '\x02', '\x03'
+
+# kind: (table, columns whose update re-indexes the row, values of its
+# search_index row). {row} is empty in INSERT ... SELECT and NEW. in triggers
+SOURCES = {
+    'investigation': ('investigation', 'title, description',
+                      "{row}title, coalesce({row}description, ''), NULL, {row}id"),
+    'fact': ('investigation_fact', 'title, description, category, investigation_id',
+             '{row}title, {row}description, {row}category, {row}investigation_id'),
+    'event': ('timeline_event', 'event_description, investigation_id',
+              "'', {row}event_description, NULL, {row}investigation_id"),
+}
+
+INDEX_COLUMNS = 'rowid, kind, title, body, category, investigation_id'
+
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE search_index USING fts5(
+    title, body,
+    kind UNINDEXED, investigation_id UNINDEXED, category UNINDEXED,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+
+def index_values(kind, row=''):
+    table, _, columns = SOURCES[kind]
+    return f"{row}id * 4 + {KINDS[kind]}, '{kind}', " + columns.format(row=row)
+
+
+def trigger_statements():
+    statements = []
+    for kind, (table, indexed_columns, _) in SOURCES.items():
+        insert = f"INSERT INTO search_index ({INDEX_COLUMNS}) VALUES ({index_values(kind, 'NEW.')});"
+        delete = f"DELETE FROM search_index WHERE rowid = OLD.id * 4 + {KINDS[kind]};"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {indexed_columns} ON {table} "
+            f"BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        ]
+    return statements
+
+
+def fill_search_index(connection):
+    connection.exec_driver_sql('DELETE FROM search_index')
+    for kind, (table, _, _) in SOURCES.items():
+        connection.exec_driver_sql(
+            f"INSERT INTO search_index ({INDEX_COLUMNS}) SELECT {index_values(kind)} FROM {table}"
+        )
+
+
+@event.listens_for(db.metadata, 'after_create')
+def create_search_index(metadata, connection, **kwargs):
+    """Runs with create_all: index and triggers, filled from existing rows the first time"""
+    if connection.dialect.name != 'sqlite':
+        return
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).first()
+    if not exists:
+        connection.exec_driver_sql(CREATE_INDEX)
+        connection.exec_driver_sql(
+            f"INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25({TITLE_WEIGHT}, {BODY_WEIGHT})')"
+        )
+        fill_search_index(connection)
+    for statement in trigger_statements():
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_search_index():
+    """Refill the index from the source tables (e.g. after restoring a backup)"""
+    with db.engine.begin() as connection:
+        fill_search_index(connection)
+        connection.exec_driver_sql("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        return connection.exec_driver_sql('SELECT count(*) FROM search_index').scalar()
+
+
+def match_expression(text):
+    """User text -> FTS5 query: every word must match, as a prefix ('bear' finds 'bearing')
+
+    Quoting each word means FTS5 syntax in the input (quotes, AND, NEAR, *)
+    is searched for as text instead of causing a syntax error.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def highlighted(text):
+    """Escape for HTML, then turn the FTS5 markers into <mark> tags"""
+    return str(escape(text or '')).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search(text, severity=None, status=None, category=None, page=1, page_size=20):
+    """One page of matches, best first; returns (results, has_more)
+
+    Ranked results are paged with OFFSET: the ranking is computed per query,
+    so there is no stable key to continue from like on the dashboard.
+    """
+    match = match_expression(text)
+    if not match:
+        return [], False
+
+    filters = ['search_index MATCH :match']
+    params = {'match': match, 'limit': page_size + 1, 'offset': (page - 1) * page_size,
+              'start': MARK_START, 'end': MARK_END}
+    if severity:
+        filters.append('investigation.severity = :severity')
+        params['severity'] = severity
+    if status:
+        filters.append('investigation.status = :status')
+        params['status'] = status
+    if category:
+        filters.append("search_index.kind = 'fact' AND search_index.category = :category")
+        params['category'] = category
+
+    # ORDER BY rank is sorted inside FTS5, so highlight() and snippet() only
+    # run for the rows of the page, not for every match
+    rows = db.session.execute(db.text(f"""
+        SELECT search_index.kind, search_index.rowid / 4 AS source_id, search_index.category,
+               highlight(search_index, 0, :start, :end) AS title,
+               snippet(search_index, 1, :start, :end, '…', 24) AS snippet,
+               search_index.rank AS score, investigation.id AS investigation_id,
+               investigation.reference_number, investigation.title AS investigation_title,
+               investigation.severity, investigation.status, investigation.incident_date
+        FROM search_index JOIN investigation ON investigation.id = search_index.investigation_id
+        WHERE {' AND '.join(filters)}
+        ORDER BY search_index.rank
+        LIMIT :limit OFFSET :offset
+    """), params).mappings().all()
+
+    results = [{
+        'kind': row['kind'],
+        'id': row['source_id'],
+        'category': row['category'],
+        'title': highlighted(row['title']),
+        'snippet': highlighted(row['snippet']),
+        'score': round(-row['score'], 3),
+        'investigation': {
+            'id': row['investigation_id'],
+            'reference_number': row['reference_number'],
+            'title': row['investigation_title'],
+            'severity': row['severity'],
+            'status': row['status'],
+            'incident_date': str(row['incident_date']),
+        },
+    } for row in rows[:page_size]]
+    return results, len(rows) > page_size
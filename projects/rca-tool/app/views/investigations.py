@@ -1,29 +1,32 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, abort, current_app, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from app.models.investigation import db, Investigation, InvestigationFact, TimelineEvent
+from app.models.investigation import db, Investigation, InvestigationFact, TimelineEvent, \
+    load_investigation_detail, investigation_page, investigation_stats
+from app.read_routing import read_only
+from app.search import search
 from datetime import datetime
 
 investigations_bp = Blueprint('investigations', __name__)
 
 @investigations_bp.route('/')
 @login_required
+@read_only
 def dashboard():
-    """Main dashboard showing all investigations"""
-    investigations = Investigation.query.filter_by(
-        created_by_id=current_user.id
-    ).order_by(Investigation.created_at.desc()).all()
-    
-    # Calculate statistics
-    stats = {
-        'total': len(investigations),
-        'in_progress': sum(1 for i in investigations if i.status != 'completed'),
-        'completed': sum(1 for i in investigations if i.status == 'completed'),
-        'overdue': sum(1 for i in investigations if i.days_since_incident and i.days_since_incident > 30)
-    }
+    """Main dashboard: statistics plus one page of investigations
+
+    ?cursor=... (from the "Older" link) selects the next page.
+    """
+    try:
+        investigations, next_cursor = investigation_page(
+            current_user.id, request.args.get('cursor'), current_app.config['DASHBOARD_PAGE_SIZE']
+        )
+    except ValueError:
+        abort(400)
     
     return render_template('investigations/dashboard.html', 
                          investigations=investigations,
-                         stats=stats)
+                         next_cursor=next_cursor,
+                         stats=investigation_stats(current_user.id))
 
 @investigations_bp.route('/new', methods=['GET', 'POST'])
 @login_required
@@ -50,21 +53,45 @@ def create_investigation():
 
 @investigations_bp.route('/<int:id>')
 @login_required
+@read_only
 def view_investigation(id):
-    """View investigation details"""
-    investigation = Investigation.query.get_or_404(id)
+    """View investigation details
+
+    All relationships are loaded up front (see load_investigation_detail),
+    so the template can walk facts, timeline, why tree, files and actions
+    without triggering more queries.
+    """
+    detail = load_investigation_detail(id)
+    if detail is None:
+        abort(404)
     
-    # Organize facts by category
-    facts_by_category = {}
-    for category, label in InvestigationFact.CATEGORIES:
-        facts_by_category[category] = {
-            'label': label,
-            'facts': [f for f in investigation.facts if f.category == category]
-        }
+    return render_template('investigations/detail.html', **detail)
+
+@investigations_bp.route('/search')
+@login_required
+@read_only
+def search_investigations():
+    """Full-text search (AJAX endpoint): ?q=...&severity=&status=&category=&page=
+
+    Matches in investigations, facts and timeline events, best first. title
+    and snippet are escaped HTML with <mark> around the matched words.
+    """
+    page = max(1, request.args.get('page', 1, type=int))
+    results, has_more = search(
+        request.args.get('q', ''),
+        severity=request.args.get('severity'),
+        status=request.args.get('status'),
+        category=request.args.get('category'),
+        page=page,
+        page_size=current_app.config['SEARCH_PAGE_SIZE']
+    )
     
-    return render_template('investigations/detail.html',
-                         investigation=investigation,
-                         facts_by_category=facts_by_category)
+    return jsonify({
+        'query': request.args.get('q', ''),
+        'page': page,
+        'has_more': has_more,
+        'results': results
+    })
 
 @investigations_bp.route('/<int:id>/add-fact', methods=['POST'])
 @login_required
@@ -0,0 +1,116 @@
+"""
+Benchmark: investigations dashboard with many investigations for one user
+Usage: python benchmark_dashboard.py [number_of_investigations]
+
+Compares the old dashboard (load every investigation, count in Python)
+with investigation_stats (one aggregate query) plus investigation_page
+(keyset pagination), and checks that both give the same numbers and that
+walking all pages returns every investigation exactly once, in order.
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app import db
+from app.models.investigation import User, Investigation, investigation_page, investigation_stats
+from check_query_counts import make_app
+
+STATUSES = ['s0', 's1', 's2', 'why_tree', 'draft_report', 'completed']
+
+
+def old_dashboard(user_id):
+    investigations = Investigation.query.filter_by(
+        created_by_id=user_id
+    ).order_by(Investigation.created_at.desc()).all()
+    stats = {
+        'total': len(investigations),
+        'in_progress': sum(1 for i in investigations if i.status != 'completed'),
+        'completed': sum(1 for i in investigations if i.status == 'completed'),
+        'overdue': sum(1 for i in investigations if i.days_since_incident and i.days_since_incident > 30)
+    }
+    return investigations[:25], stats
+
+
+def new_dashboard(user_id, cursor=None):
+    investigations, next_cursor = investigation_page(user_id, cursor)
+    return investigations, next_cursor, investigation_stats(user_id)
+
+
+def timed(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f'user{i}', email=f'user{i}@example.com') for i in range(3)]
+        db.session.add_all(users)
+        db.session.commit()
+
+        # Bulk insert; several investigations share a created_at on purpose
+        start = datetime(2015, 1, 1)
+        rows = [{
+            'reference_number': f'RCA-BENCH-{i}',
+            'title': f'Incident {i}',
+            'incident_date': start + timedelta(hours=i * 2),
+            'status': rng.choice(STATUSES),
+            'created_by_id': users[0].id if i % 10 else users[1 + i % 2].id,
+            'created_at': start + timedelta(hours=(i // 3) * 6),
+        } for i in range(count)]
+        db.session.execute(Investigation.__table__.insert(), rows)
+        db.session.commit()
+        user_id = users[0].id
+        user_rows = sum(1 for row in rows if row['created_by_id'] == user_id)
+
+        plan = db.session.execute(text(
+            'EXPLAIN QUERY PLAN ' + str(
+                Investigation.query.filter(Investigation.created_by_id == user_id)
+                .filter(db.tuple_(Investigation.created_at, Investigation.id) < (datetime(2020, 1, 1), 5))
+                .order_by(Investigation.created_at.desc(), Investigation.id.desc()).limit(26)
+                .statement.compile(compile_kwargs={'literal_binds': True})
+            )
+        )).all()
+        print("Next-page query plan: " + "; ".join(row[-1] for row in plan))
+
+        old_ms, (_, old_stats) = timed(old_dashboard, user_id)
+        first_ms, (page, cursor, new_stats) = timed(new_dashboard, user_id)
+        stats_ms, _ = timed(investigation_stats, user_id)
+
+        # Jump deep into the list, then time one more page from there
+        deep_cursor = cursor
+        for _ in range(1000):
+            _, deep_cursor = investigation_page(user_id, deep_cursor)
+        deep_ms, _ = timed(investigation_page, user_id, deep_cursor)
+
+        print(f"{count:,} investigations, {user_rows:,} for the measured user")
+        print(f"Old dashboard (all rows + Python counts): {old_ms:8.1f} ms")
+        print(f"New first page + stats:                   {first_ms:8.1f} ms  (stats alone {stats_ms:.1f} ms)")
+        print(f"New page 1000:                            {deep_ms:8.1f} ms")
+
+        assert old_stats == new_stats, (old_stats, new_stats)
+        seen, cursor = [], None
+        while True:
+            page, cursor = investigation_page(user_id, cursor, page_size=500)
+            seen += [(inv.created_at, inv.id) for inv in page]
+            if cursor is None:
+                break
+        assert seen == sorted(seen, reverse=True) and len(set(seen)) == user_rows
+        print(f"Stats match the old dashboard ({new_stats}); pages cover every row once, in order")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark: full-text search vs. LIKE '%...%' over years of incident history
+Usage: python benchmark_search.py [number_of_investigations]   (exit code 1 on a wrong result)
+
+Each investigation gets 3 facts and 3 timeline events of generated plant
+text. Compares a naive LIKE scan of the three description columns with
+GET /investigations/search (FTS5), checks that both find the same rows for
+a single word, and that the index follows inserts, updates and deletes.
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.investigation import User, Investigation, InvestigationFact, TimelineEvent
+from app.views.investigations import investigations_bp
+from check_query_counts import make_app
+
+EQUIPMENT = ['pump', 'compressor', 'conveyor', 'boiler', 'turbine', 'gearbox', 'valve', 'heat exchanger', 'motor']
+PARTS = ['bearing', 'mechanical seal', 'impeller', 'coupling', 'shaft', 'gasket', 'actuator', 'winding', 'belt']
+FAILURES = ['overheated', 'vibrated', 'leaked', 'seized', 'tripped', 'cracked', 'corroded', 'wore out']
+CAUSES = ['lubrication was missed', 'alignment was off', 'the procedure was unclear', 'cavitation at low suction',
+          'the filter was blocked', 'operator was not trained', 'spare part was wrong', 'inspection was overdue']
+SEVERITIES = ['low', 'medium', 'high', 'critical']
+STATUSES = ['s0', 's1', 's2', 'why_tree', 'draft_report', 'completed']
+CATEGORIES = ['people', 'position', 'paper', 'parts']
+
+problems = []
+
+
+def sentence(rng):
+    return f"{rng.choice(EQUIPMENT)} {rng.choice(PARTS)} {rng.choice(FAILURES)} because {rng.choice(CAUSES)}"
+
+
+def fill(count, rng):
+    user = User(username='engineer', email='engineer@example.com')
+    db.session.add(user)
+    db.session.commit()
+
+    start = datetime(2010, 1, 1)
+    db.session.execute(Investigation.__table__.insert(), [{
+        'id': i, 'reference_number': f'RCA-BENCH-{i}', 'title': sentence(rng).capitalize(),
+        'description': '. '.join(sentence(rng) for _ in range(3)), 'incident_date': start + timedelta(hours=i * 3),
+        'severity': rng.choice(SEVERITIES), 'status': rng.choice(STATUSES), 'created_by_id': user.id,
+    } for i in range(1, count + 1)])
+    db.session.execute(InvestigationFact.__table__.insert(), [{
+        'investigation_id': i, 'category': rng.choice(CATEGORIES), 'title': f'Finding {n}',
+        'description': sentence(rng),
+    } for i in range(1, count + 1) for n in range(3)])
+    db.session.execute(TimelineEvent.__table__.insert(), [{
+        'investigation_id': i, 'event_time': start + timedelta(hours=i * 3, minutes=n),
+        'event_description': sentence(rng),
+    } for i in range(1, count + 1) for n in range(3)])
+    db.session.commit()
+
+
+def like_search(word):
+    pattern = f'%{word}%'
+    found = {('investigation', row.id) for row in Investigation.query.filter(
+        db.or_(Investigation.title.like(pattern), Investigation.description.like(pattern)))}
+    found |= {('fact', row.id) for row in InvestigationFact.query.filter(
+        db.or_(InvestigationFact.title.like(pattern), InvestigationFact.description.like(pattern)))}
+    found |= {('event', row.id) for row in TimelineEvent.query.filter(TimelineEvent.event_description.like(pattern))}
+    return found
+
+
+def fts_search(client, **params):
+    """Every page of /investigations/search -> list of results"""
+    results, page = [], 1
+    while True:
+        body = client.get('/investigations/search', query_string={**params, 'page': page}).get_json()
+        results += body['results']
+        if not body['has_more']:
+            return results
+        page += 1
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(7)
+
+    app = make_app()
+    app.config['LOGIN_DISABLED'] = True
+    app.register_blueprint(investigations_bp, url_prefix='/investigations')
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        fill(count, rng)
+        print(f"{count:,} investigations, {count * 6:,} facts and events, "
+              f"inserted and indexed in {time.perf_counter() - start:.1f} s")
+
+        like_ms, like_rows = timed(like_search, 'cavitation')
+        page_ms, first_page = timed(client.get, '/investigations/search', query_string={'q': 'cavitation'})
+        filtered_ms, _ = timed(client.get, '/investigations/search',
+                               query_string={'q': 'pump bearing overheated', 'severity': 'critical'})
+        deep_ms, _ = timed(client.get, '/investigations/search', query_string={'q': 'cavitation', 'page': 50})
+        print(f"LIKE '%cavitation%' over 3 tables:          {like_ms:8.1f} ms  ({len(like_rows):,} rows)")
+        print(f"Search 'cavitation', first page:            {page_ms:8.1f} ms")
+        print(f"Search 'cavitation', page 50:               {deep_ms:8.1f} ms")
+        print(f"Search 'pump bearing overheated', critical: {filtered_ms:8.1f} ms")
+
+        # Compare every result, in pages of 1000
+        app.config['SEARCH_PAGE_SIZE'] = 1000
+        fts_rows = fts_search(client, q='cavitation')
+
+        if {(row['kind'], row['id']) for row in fts_rows} != like_rows or len(fts_rows) != len(like_rows):
+            problems.append('FTS and LIKE found different rows for one word')
+        scores = [row['score'] for row in fts_rows]
+        if scores != sorted(scores, reverse=True):
+            problems.append('results are not ranked best first')
+        if '<mark>cavitation</mark>' not in first_page.get_json()['results'][0]['snippet'].lower():
+            problems.append('no highlight in the snippet')
+
+        for row in fts_search(client, q='leaked', severity='high', status='completed'):
+            if (row['investigation']['severity'], row['investigation']['status']) != ('high', 'completed'):
+                problems.append(f"severity/status filter let through {row['investigation']}")
+        for row in fts_search(client, q='seal', category='parts'):
+            if (row['kind'], row['category']) != ('fact', 'parts'):
+                problems.append(f"category filter let through {row['kind']} {row['category']}")
+
+        # The index follows ORM writes, including cascaded deletes
+        fact = InvestigationFact.query.first()
+        fact.description = 'Found <b>graphite</b> dust in the housing'
+        db.session.add(Investigation(title='Xylophone-shaped crack', incident_date=datetime(2024, 1, 1),
+                                     created_by_id=1, reference_number='RCA-BENCH-NEW'))
+        db.session.commit()
+        graphite = fts_search(client, q='graphite')
+        if [(row['kind'], row['id']) for row in graphite] != [('fact', fact.id)]:
+            problems.append(f'updated fact not found: {graphite}')
+        elif '&lt;b&gt;<mark>graphite</mark>' not in graphite[0]['snippet']:
+            problems.append(f"snippet is not escaped: {graphite[0]['snippet']}")
+        if len(fts_search(client, q='xylophone')) != 1:
+            problems.append('new investigation not found')
+
+        investigation = db.session.get(Investigation, fact.investigation_id)
+        db.session.delete(investigation)
+        db.session.commit()
+        if fts_search(client, q='graphite'):
+            problems.append('deleted investigation still found')
+        if client.get('/investigations/search', query_string={'q': '"unbalanced AND ('}).status_code != 200:
+            problems.append('search syntax in the query text caused an error')
+
+    if problems:
+        print("FAIL:\n  " + "\n  ".join(problems[:20]))
+        sys.exit(1)
+    print("OK: same rows as LIKE, ranked, filtered, highlighted, and in sync after writes")
+
+
+if __name__ == '__main__':
+    main()
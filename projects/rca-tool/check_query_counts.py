@@ -0,0 +1,133 @@
+"""
+Query-count check for the investigation detail page
+Usage: python check_query_counts.py   (exit code 1 when the count grows with the data)
+
+Loads a small and a large investigation with load_investigation_detail and
+then walks everything the detail template shows (facts, timeline, the whole
+why tree, files, actions, creator). Both must cost the same, small number
+of SQL statements.
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import event
+
+from app import db
+from app.config import config
+from app.models.investigation import User, Investigation, InvestigationFact, TimelineEvent, WhyTreeNode, \
+    InvestigationFile, ActionItem, load_investigation_detail
+
+MAX_QUERIES = 6
+
+
+def make_app():
+    """Just the database part of create_app, on an in-memory database"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+    return app
+
+
+def add_investigation(user, facts: int, events: int, branches: int, depth: int, files: int, actions: int):
+    investigation = Investigation(title=f'Incident with {facts} facts', incident_date=datetime(2024, 5, 1),
+                                  created_by_id=user.id, reference_number=f'RCA-TEST-{facts}')
+    db.session.add(investigation)
+    db.session.flush()
+
+    categories = [category for category, _ in InvestigationFact.CATEGORIES]
+    db.session.add_all(
+        InvestigationFact(investigation_id=investigation.id, category=categories[i % 4],
+                          title=f'Fact {i}', description='Observed on site')
+        for i in range(facts)
+    )
+    db.session.add_all(
+        TimelineEvent(investigation_id=investigation.id, event_time=datetime(2024, 5, 1) + timedelta(minutes=i),
+                      event_description=f'Event {i}')
+        for i in range(events)
+    )
+
+    # `branches` chains of `depth` whys under one problem statement
+    top = WhyTreeNode(investigation_id=investigation.id, answer='Pump tripped')
+    db.session.add(top)
+    db.session.flush()
+    for branch in range(branches):
+        parent = top
+        for level in range(2, depth + 1):
+            node = WhyTreeNode(investigation_id=investigation.id, parent_id=parent.id,
+                               answer=f'Cause {branch}.{level}', level=level, sequence=branch)
+            db.session.add(node)
+            db.session.flush()
+            parent = node
+
+    db.session.add_all(
+        InvestigationFile(investigation_id=investigation.id, filename=f'photo-{i}.jpg') for i in range(files)
+    )
+    db.session.add_all(
+        ActionItem(investigation_id=investigation.id, title=f'Action {i}', due_date=date(2024, 6, 1))
+        for i in range(actions)
+    )
+    db.session.commit()
+    return investigation.id
+
+
+def walk_why_tree(node, seen):
+    seen.append((node.answer, node.parent.answer if node.parent else None))
+    for child in node.children:
+        walk_why_tree(child, seen)
+
+
+def render_like_template(detail):
+    """Touch every attribute the detail page shows"""
+    investigation = detail['investigation']
+    shown = [investigation.title, investigation.creator.username, investigation.progress]
+    for group in detail['facts_by_category'].values():
+        shown += [(fact.title, fact.description) for fact in group['facts']]
+    shown += [event.event_description for event in detail['timeline_events']]
+    for root in detail['why_roots']:
+        walk_why_tree(root, shown)
+    shown += [file.filename for file in detail['files']]
+    shown += [(action.title, action.is_overdue) for action in detail['action_items']]
+    return len(shown)
+
+
+def count_queries(app, investigation_id):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        db.session.expunge_all()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            items = render_like_template(load_investigation_detail(investigation_id))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return len(statements), items
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='engineer', email='engineer@example.com')
+        db.session.add(user)
+        db.session.commit()
+        small = add_investigation(user, facts=1, events=1, branches=1, depth=2, files=1, actions=1)
+        large = add_investigation(user, facts=400, events=200, branches=60, depth=6, files=30, actions=40)
+
+    small_queries, small_items = count_queries(app, small)
+    large_queries, large_items = count_queries(app, large)
+    print(f"Small investigation: {small_queries} queries for {small_items} rendered items")
+    print(f"Large investigation: {large_queries} queries for {large_items} rendered items")
+
+    if small_queries != large_queries or large_queries > MAX_QUERIES:
+        print(f"FAIL: the detail page should cost the same {MAX_QUERIES} or fewer queries for any size")
+        sys.exit(1)
+    print("OK: constant number of queries")
+
+
+if __name__ == '__main__':
+    main()
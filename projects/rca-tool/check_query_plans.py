@@ -0,0 +1,87 @@
+"""
+Query plan check for the investigations dashboard
+Usage: python check_query_plans.py   (exit code 1 when a query stopped using its index)
+
+Runs investigation_stats and investigation_page (first and next page)
+against an in-memory database, records the SQL they send, and runs
+EXPLAIN QUERY PLAN on each statement. Every one must SEARCH investigation
+with ix_investigation_creator_created; the pages must also come out of
+the index in order (no "USE TEMP B-TREE FOR ORDER BY").
+"""
+
+import sys
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import db
+from app.models.investigation import User, Investigation, investigation_page, investigation_stats
+from check_query_counts import make_app
+
+INDEX = 'ix_investigation_creator_created'
+
+
+def recorded_statements(func, *args):
+    """(sql, parameters) of every statement func sends"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        func(*args)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def explain(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [row[-1] for row in rows]
+
+
+def find_problems(plan, may_sort):
+    problems = []
+    if not any(line.startswith('SEARCH investigation USING') and INDEX in line for line in plan):
+        problems.append(f'no SEARCH on {INDEX}')
+    if not may_sort and any(line.startswith('USE TEMP B-TREE FOR ORDER BY') for line in plan):
+        problems.append('sorts the rows instead of reading them in index order')
+    return problems
+
+
+def main():
+    app = make_app()
+    failed = False
+    with app.app_context():
+        db.create_all()
+        user = User(username='engineer', email='engineer@example.com')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all(
+            Investigation(title=f'Incident {i}', incident_date=datetime(2024, 1, 1), created_by_id=user.id,
+                          reference_number=f'RCA-PLAN-{i}', created_at=datetime(2024, 1, 1 + i))
+            for i in range(3)
+        )
+        db.session.commit()
+        _, cursor = investigation_page(user.id, page_size=1)
+
+        checks = {
+            'dashboard stats': (investigation_stats, (user.id,), True),
+            'dashboard first page': (investigation_page, (user.id,), False),
+            'dashboard next page (keyset)': (investigation_page, (user.id, cursor), False),
+        }
+        for name, (func, args, may_sort) in checks.items():
+            for statement, parameters in recorded_statements(func, *args):
+                plan = explain(statement, parameters)
+                problems = find_problems(plan, may_sort)
+                print(f"{'FAIL' if problems else 'OK  '}  {name}" + (f": {', '.join(problems)}" if problems else ''))
+                for line in plan:
+                    print(f"        {line}")
+                failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
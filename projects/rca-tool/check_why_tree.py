@@ -0,0 +1,154 @@
+"""
+Check: why-tree materialized paths and single-query tree reads
+Usage: python check_why_tree.py [branches] [depth]   (exit code 1 on any mismatch)
+
+Builds a deep why tree with many branches, then moves and deletes nodes
+and compares every stored path and level with the ones implied by
+parent_id. Also counts the queries for the whole tree, a subtree, the
+ancestors of a node and the root causes, against walking node.children
+with lazy loads as before.
+"""
+
+import sys
+import time
+
+from sqlalchemy import event
+
+from app import db
+from app.models.investigation import User, WhyTreeNode, build_why_tree, why_tree_nodes, why_subtree, \
+    why_ancestors, why_root_causes, rebuild_why_paths
+from check_query_counts import make_app, add_investigation
+
+problems = []
+
+
+def expected_paths():
+    parent_of = dict(db.session.execute(db.select(WhyTreeNode.id, WhyTreeNode.parent_id)).all())
+
+    def path_of(node_id):
+        parent_id = parent_of[node_id]
+        return (path_of(parent_id) if parent_id else '/') + f'{node_id}/'
+    return {node_id: path_of(node_id) for node_id in parent_of}
+
+
+def check_paths(step):
+    db.session.expire_all()
+    stored = {node.id: (node.path, node.level) for node in WhyTreeNode.query.all()}
+    for node_id, path in expected_paths().items():
+        if stored[node_id] != (path, path.count('/') - 1):
+            problems.append(f'{step}: node {node_id} has {stored[node_id]}, expected {path}')
+    print(f"{step:40s} {len(stored):6,} nodes checked")
+
+
+def count_queries(func, *args):
+    statements = []
+
+    def record(conn, cursor, statement, *rest):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return len(statements), elapsed * 1000, result
+
+
+def walk(node):
+    return 1 + sum(walk(child) for child in node.children)
+
+
+def lazy_tree(investigation_id):
+    tops = WhyTreeNode.query.filter_by(investigation_id=investigation_id, parent_id=None).all()
+    return sum(walk(top) for top in tops)
+
+
+def built_tree(investigation_id):
+    return sum(walk(top) for top in build_why_tree(why_tree_nodes(investigation_id)))
+
+
+def main():
+    branches = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='engineer', email='engineer@example.com')
+        db.session.add(user)
+        db.session.commit()
+        investigation_id = add_investigation(user, facts=0, events=0, branches=branches, depth=depth, files=0, actions=0)
+        for node in WhyTreeNode.query.filter(WhyTreeNode.level == depth):
+            node.is_root_cause = True
+        db.session.commit()
+        check_paths('after insert')
+
+        nodes = why_tree_nodes(investigation_id)
+        top = next(node for node in nodes if node.parent_id is None)
+        second_level = [node for node in nodes if node.level == 2]
+
+        # Move a branch (children loaded in the session) under another branch
+        moved, target = second_level[0], second_level[1]
+        [child.path for child in moved.children]
+        moved.parent_id = target.id
+        db.session.commit()
+        check_paths('after moving a branch under another')
+        if moved.children and moved.children[0].level != 4:
+            problems.append('loaded child kept its old level after the move')
+
+        # Move a leaf back to the top
+        leaf = WhyTreeNode.query.filter_by(investigation_id=investigation_id, level=depth).first()
+        leaf.parent_id = None
+        db.session.commit()
+        check_paths('after moving a leaf to the top')
+
+        # Delete a middle node: its children become top nodes
+        middle = WhyTreeNode.query.filter_by(level=3).first()
+        db.session.delete(middle)
+        db.session.commit()
+        check_paths('after deleting a middle node')
+
+        # A node cannot be moved into its own subtree
+        try:
+            target = db.session.get(WhyTreeNode, second_level[1].id)
+            target.parent_id = WhyTreeNode.query.filter(WhyTreeNode.path.like(target.path + '%'),
+                                                        WhyTreeNode.level == depth).first().id
+            db.session.commit()
+            problems.append('moving a node below itself was accepted')
+        except ValueError:
+            db.session.rollback()
+            print(f"{'move below itself':40s} rejected")
+
+        # Old rows without a path are repaired by rebuild_why_paths
+        db.session.execute(db.update(WhyTreeNode).values(path=None, level=1))
+        db.session.commit()
+        rebuild_why_paths()
+        check_paths('after rebuild_why_paths')
+
+        print()
+        top_id = top.id
+        deepest_id = WhyTreeNode.query.order_by(WhyTreeNode.level.desc()).first().id
+        for label, func, node_id in (
+            ('whole tree, lazy children', lambda node: lazy_tree(investigation_id), None),
+            ('whole tree, build_why_tree', lambda node: built_tree(investigation_id), None),
+            ('subtree of a top node', lambda node: len(why_subtree(node)), top_id),
+            ('ancestors of the deepest node', lambda node: len(why_ancestors(node)), deepest_id),
+            ('root causes', lambda node: len(why_root_causes(investigation_id)), None),
+        ):
+            db.session.expunge_all()
+            arg = db.session.get(WhyTreeNode, node_id) if node_id else None
+            queries, ms, rows = count_queries(func, arg)
+            print(f"{label:40s} {queries:5,} queries {ms:8.1f} ms   {rows:6,} nodes")
+            if 'lazy' not in label and queries > 1:
+                problems.append(f'{label} took {queries} queries')
+
+    if problems:
+        print("\nFAIL:\n  " + "\n  ".join(problems[:20]))
+        sys.exit(1)
+    print("\nOK: paths match parent_id after every change")
+
+
+if __name__ == '__main__':
+    main()
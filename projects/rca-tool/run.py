@@ -1,7 +1,9 @@
 # run.py
 from app import create_app, db
+import os
 
-app = create_app()
+# FLASK_CONFIG=production turns on WAL and the tuned SQLite settings
+app = create_app(os.environ.get('FLASK_CONFIG', 'development'))
 
 if __name__ == '__main__':
     with app.app_context():
@@ -0,0 +1,127 @@
+"""
+Stress test: reference numbers under parallel investigation creates
+Usage: python stress_reference_numbers.py [workers] [threads_per_worker] [creates_per_thread] [block_size]
+       (exit code 1 if any create failed or a reference number was handed out twice)
+
+Worker processes (like gunicorn workers), each with several threads, all
+create investigations at the same time in one scratch SQLite file (WAL,
+production PRAGMAs). First with the old way of numbering (count this
+year's investigations + 1), then with the reference_sequence table and
+per-worker blocks. The old way collides on the unique reference_number;
+the new one must not.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+
+from app import db, apply_sqlite_pragmas
+from app.config import config
+from app.models.investigation import User, Investigation
+
+
+def old_reference_number(investigation):
+    """The numbering this replaces: count this year's investigations"""
+    year = datetime.now().year
+    count = Investigation.query.filter(
+        db.extract('year', Investigation.created_at) == year
+    ).count() + 1
+    investigation.reference_number = f"RCA-{year}-{count:03d}"
+
+
+def make_app(path, block_size):
+    app = Flask(__name__)
+    app.config.from_object(config['production'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['REFERENCE_BLOCK_SIZE'] = block_size
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+    return app
+
+
+def run_worker(path, method, threads, creates, block_size, failures):
+    app = make_app(path, block_size)
+
+    def create_many(worker_thread):
+        with app.app_context():
+            user_id = User.query.first().id
+            for i in range(creates):
+                investigation = Investigation(title=f'Incident {worker_thread}.{i}', incident_date=datetime.utcnow(),
+                                              created_by_id=user_id)
+                if method == 'old':
+                    old_reference_number(investigation)
+                else:
+                    investigation.generate_reference_number()
+                db.session.add(investigation)
+                try:
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    with failures.get_lock():
+                        failures.value += 1
+
+    workers = [threading.Thread(target=create_many, args=(f'{os.getpid()}.{n}',)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def run(method, workers, threads, creates, block_size):
+    path = os.path.join(tempfile.mkdtemp(), 'references.db')
+    app = make_app(path, block_size)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='engineer', email='engineer@example.com'))
+        db.session.commit()
+        db.engine.dispose()  # don't carry open connections into the workers
+
+    failures = multiprocessing.get_context('fork').Value('i', 0)
+    processes = [multiprocessing.get_context('fork').Process(
+        target=run_worker, args=(path, method, threads, creates, block_size, failures)
+    ) for _ in range(workers)]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stored = db.session.query(db.func.count(Investigation.id)).scalar()
+        distinct = db.session.query(db.func.count(db.distinct(Investigation.reference_number))).scalar()
+
+    attempted = workers * threads * creates
+    label = 'count + 1' if method == 'old' else f'sequence, block {block_size}'
+    print(f"{label:20s} {attempted:6,} creates in {elapsed:6.2f} s ({attempted / elapsed:7.0f}/s)   "
+          f"stored {stored:6,}   duplicate-number failures {failures.value:6,}")
+    return failures.value == 0 and stored == distinct == attempted
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    creates = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    block_size = int(sys.argv[4]) if len(sys.argv) > 4 else config['production'].REFERENCE_BLOCK_SIZE
+
+    print(f"{workers} workers x {threads} threads x {creates} creates")
+    run('old', workers, threads, creates, block_size)
+    ok = run('new', workers, threads, creates, 1)
+    ok = run('new', workers, threads, creates, block_size) and ok
+
+    if not ok:
+        print("FAIL: reference numbers collided")
+        sys.exit(1)
+    print("OK: every investigation got its own reference number")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Fleet Metrics Engine
+Goal: Calculate reliability metrics for a whole fleet in one pass
+New concepts: NumPy arrays, vectorized math, masks instead of if-statements
+
+Same rules as calculate_mtbf / calculate_availability / calculate_mttr
+from day01, but every argument is a column (one value per asset):
+- availability is 0 when total hours is 0
+- MTBF is uptime / failures, or `no_failure_mtbf` when there are no failures
+- MTTR is downtime / failures, or 0 when there are no failures
+"""
+
+from typing import Dict
+
+import numpy as np
+
+# Status thresholds used by every dashboard (availability %)
+GOOD_THRESHOLD = 95
+FAIR_THRESHOLD = 90
+
+# The Flask apps store "no failures" as 999999 instead of infinity
+NO_FAILURE_MTBF = 999999
+
+
+def calculate_availability(uptime_hours, total_hours) -> np.ndarray:
+    """Availability percentage for each asset (0 where total hours is 0)"""
+    uptime_hours = np.asarray(uptime_hours, dtype=np.float64)
+    total_hours = np.asarray(total_hours, dtype=np.float64)
+
+    # Divide only where it is safe, everything else stays 0
+    availability = np.zeros(np.broadcast(uptime_hours, total_hours).shape)
+    np.divide(uptime_hours, total_hours, out=availability, where=total_hours > 0)
+    return availability * 100
+
+
+def calculate_mtbf(uptime_hours, failures, no_failure_mtbf=float('inf')) -> np.ndarray:
+    """Mean Time Between Failures for each asset"""
+    uptime_hours = np.asarray(uptime_hours, dtype=np.float64)
+    failures = np.asarray(failures)
+
+    mtbf = np.full(np.broadcast(uptime_hours, failures).shape, no_failure_mtbf, dtype=np.float64)
+    np.divide(uptime_hours, failures, out=mtbf, where=failures > 0)
+    return mtbf
+
+
+def calculate_mttr(downtime_hours, failures) -> np.ndarray:
+    """Mean Time To Repair for each asset (0 where there are no failures)"""
+    downtime_hours = np.asarray(downtime_hours, dtype=np.float64)
+    failures = np.asarray(failures)
+
+    mttr = np.zeros(np.broadcast(downtime_hours, failures).shape)
+    np.divide(downtime_hours, failures, out=mttr, where=failures > 0)
+    return mttr
+
+
+def classify_status(availability) -> np.ndarray:
+    """GOOD / FAIR / POOR label for each availability value"""
+    availability = np.asarray(availability, dtype=np.float64)
+    return np.select(
+        [availability >= GOOD_THRESHOLD, availability >= FAIR_THRESHOLD],
+        ['GOOD', 'FAIR'],
+        default='POOR'
+    )
+
+
+def calculate_fleet_metrics(total_hours, uptime_hours, failures,
+                            no_failure_mtbf=float('inf')) -> Dict[str, np.ndarray]:
+    """Calculate every metric for a whole fleet at once
+
+    Takes three columns of equal length and returns a dictionary of
+    columns: downtime, availability, mtbf, mttr and status.
+    """
+    total_hours = np.asarray(total_hours, dtype=np.float64)
+    uptime_hours = np.asarray(uptime_hours, dtype=np.float64)
+    failures = np.asarray(failures, dtype=np.int64)
+
+    downtime = total_hours - uptime_hours
+    availability = calculate_availability(uptime_hours, total_hours)
+
+    return {
+        'downtime': downtime,
+        'availability': availability,
+        'mtbf': calculate_mtbf(uptime_hours, failures, no_failure_mtbf),
+        'mttr': calculate_mttr(downtime, failures),
+        'status': classify_status(availability)
+    }
+
+
+def fleet_summary(total_hours, uptime_hours, failures) -> Dict[str, float]:
+    """Fleet-wide availability and MTBF (same math as display_fleet_summary)"""
+    total_hours = np.asarray(total_hours, dtype=np.float64)
+    uptime_hours = np.asarray(uptime_hours, dtype=np.float64)
+    failures = np.asarray(failures, dtype=np.int64)
+
+    fleet_total = total_hours.sum()
+    fleet_uptime = uptime_hours.sum()
+    fleet_failures = int(failures.sum())
+
+    return {
+        'fleet_availability': float(fleet_uptime / fleet_total * 100) if fleet_total > 0 else 0.0,
+        'fleet_mtbf': float(fleet_uptime / fleet_failures) if fleet_failures > 0 else float('inf'),
+        'total_equipment': int(total_hours.size)
+    }
+
+
+class FleetAggregate:
+    """Running sums behind the dashboards' statistics block
+
+    Instead of summing over every asset on each request, keep totals and
+    adjust them when something changes: add_reading(..., sign=-1) removes
+    an asset's old latest reading, add_reading(...) adds the new one.
+    Every update is O(1); statistics() turns the totals into averages.
+    """
+    FIELDS = ('equipment_count', 'availability_count', 'availability_sum',
+              'mtbf_count', 'mtbf_sum', 'good_count', 'fair_count', 'poor_count')
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field) or 0)
+
+    @staticmethod
+    def reading_delta(availability, mtbf, failures, status, sign: int = 1) -> Dict[str, float]:
+        """How one latest reading changes each total (sign=-1 to remove it)"""
+        delta = {}
+        if availability is not None:
+            delta['availability_count'] = sign
+            delta['availability_sum'] = sign * availability
+        # Assets without failures have no meaningful MTBF
+        if failures and failures > 0 and mtbf is not None and mtbf < NO_FAILURE_MTBF:
+            delta['mtbf_count'] = sign
+            delta['mtbf_sum'] = sign * mtbf
+        if status in ('GOOD', 'FAIR', 'POOR'):
+            delta[f'{status.lower()}_count'] = sign
+        return delta
+
+    def apply(self, delta: Dict[str, float]):
+        for field, value in delta.items():
+            setattr(self, field, getattr(self, field) + value)
+
+    def add_equipment(self, sign: int = 1):
+        self.equipment_count += sign
+
+    def add_reading(self, availability, mtbf, failures, status, sign: int = 1):
+        self.apply(self.reading_delta(availability, mtbf, failures, status, sign))
+
+    def statistics(self) -> Dict:
+        """Same keys and rounding as the /api/equipment statistics block"""
+        avg_availability = self.availability_sum / self.availability_count if self.availability_count > 0 else 0
+        avg_mtbf = self.mtbf_sum / self.mtbf_count if self.mtbf_count > 0 else 0
+        return {
+            'fleet_availability': round(avg_availability, 2),
+            'total_equipment': self.equipment_count,
+            'critical_alerts': self.poor_count,
+            'avg_mtbf': round(avg_mtbf, 2)
+        }
+
+    def as_dict(self) -> Dict[str, float]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+if __name__ == "__main__":
+    # Quick check with the Day 1 sample equipment
+    metrics = calculate_fleet_metrics([720.0, 720.0, 0.0], [695.5, 635.0, 0.0], [3, 5, 0])
+    for key, values in metrics.items():
+        print(f"{key:<14} {values}")
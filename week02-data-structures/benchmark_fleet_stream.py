@@ -0,0 +1,102 @@
+"""
+Benchmark: load_fleet_from_csv (list of dicts) vs. streaming records
+Usage: python benchmark_fleet_stream.py [number_of_rows]
+
+Writes a synthetic fleet file with append_fleet_csv, then summarizes it both
+ways. Each way runs in its own process so peak memory can be compared.
+"""
+
+import contextlib
+import io
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from fleet_stream import EquipmentRecord, append_fleet_csv, iter_fleet_csv, summarize_fleet
+
+
+def synthetic_records(rows: int, seed: int = 42):
+    """Generate rows lazily so writing the file is constant memory too"""
+    rng = random.Random(seed)
+    for i in range(rows):
+        total_hours = 720.0
+        uptime_hours = round(rng.uniform(600.0, 720.0), 1)
+        failures = rng.randint(0, 10)
+        downtime = total_hours - uptime_hours
+        yield EquipmentRecord(
+            f'Asset-{i}',
+            total_hours,
+            uptime_hours,
+            failures,
+            uptime_hours / total_hours * 100,
+            uptime_hours / failures if failures > 0 else float('inf'),
+            downtime / failures if failures > 0 else 0,
+            '2025-07-27 09:10'
+        )
+
+
+def summarize_with_list(filename: str):
+    """The current way: load everything, then loop like display_fleet_summary"""
+    from day02_fleet_tracker import load_fleet_from_csv
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        fleet = load_fleet_from_csv(filename)
+
+    total_uptime = sum(eq['uptime_hours'] for eq in fleet)
+    total_hours = sum(eq['total_hours'] for eq in fleet)
+    worst = min(fleet, key=lambda x: x['availability'])
+    return len(fleet), total_uptime / total_hours * 100, worst['name']
+
+
+def summarize_with_stream(filename: str):
+    summary = summarize_fleet(iter_fleet_csv(filename))
+    return summary.count, summary.fleet_availability, summary.worst.name
+
+
+def run_mode(mode: str, filename: str):
+    """Child process: summarize once and print time and peak memory"""
+    start = time.perf_counter()
+    if mode == 'list':
+        result = summarize_with_list(filename)
+    else:
+        result = summarize_with_stream(filename)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    print(f"{elapsed:.2f} {peak_mb:.0f} {result[0]} {result[1]:.4f} {result[2]}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'fleet_big.csv')
+        start = time.perf_counter()
+        append_fleet_csv(synthetic_records(rows), filename)
+        size_mb = os.path.getsize(filename) / (1024 * 1024)
+        print(f"Wrote {rows:,} rows ({size_mb:.0f} MB) in {time.perf_counter() - start:.1f} s")
+
+        results = {}
+        for mode in ('list', 'stream'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, filename],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            results[mode] = output
+            print(f"{mode:<7} {float(output[0]):8.2f} s   peak {output[1]:>6} MB")
+
+        same = results['list'][2:] == results['stream'][2:]
+        print(f"Same summary from both: {same}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--mode':
+        run_mode(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -8,6 +8,8 @@ import csv
 import datetime
 from typing import Dict, List
 
+from fleet_stream import iter_fleet_csv, summarize_fleet
+
 # Color codes for better visualization
 RED = '\033[91m'
 GREEN = '\033[92m'
@@ -178,6 +180,29 @@ def load_fleet_from_csv(filename: str = 'fleet_data.csv') -> List[Dict]:
     
     return fleet
 
+# LESSON 4b: Big files - summarize without loading everything
+def display_fleet_file_summary(filename: str = 'fleet_data.csv'):
+    """Fleet-wide summary of a CSV file of any size, read one row at a time"""
+    try:
+        summary = summarize_fleet(iter_fleet_csv(filename))
+    except FileNotFoundError:
+        print(f"{YELLOW}No saved data found in {filename}!{RESET}")
+        return
+    
+    if summary.count == 0:
+        print(f"\n{YELLOW}No equipment in {filename}!{RESET}")
+        return
+    
+    print(f"\n{BLUE}FLEET FILE SUMMARY: {filename}{RESET}")
+    print(f"  Total Equipment: {summary.count}")
+    print(f"  Overall Availability: {summary.fleet_availability:.2f}%")
+    print(f"  Fleet MTBF: {summary.fleet_mtbf:.1f} hours" if summary.fleet_mtbf != float('inf') else "  Fleet MTBF: No failures")
+    print(f"  {GREEN}GOOD: {summary.status_counts['GOOD']}{RESET}  "
+          f"{YELLOW}FAIR: {summary.status_counts['FAIR']}{RESET}  "
+          f"{RED}POOR: {summary.status_counts['POOR']}{RESET}")
+    print(f"  Worst Performer: {summary.worst.name} ({summary.worst.availability:.2f}%)")
+    print(f"  Best Performer: {summary.best.name} ({summary.best.availability:.2f}%)")
+
 # LESSON 5: Main program with menu system
 def main():
     """Main program loop"""
@@ -196,6 +221,7 @@ def main():
         print("4. Find worst performer")
         print("5. Exit")
         print("6. Best Performer")
+        print("7. Summarize saved file (large fleets)")
         choice = input("\nSelect option (1-5): ").strip()
         
         if choice == '1':
@@ -232,6 +258,8 @@ def main():
                 best = max(fleet, key=lambda x: x['availability'])
                 print(f"\n{GREEN}Best Performer: {best['name']}{RESET}")
                 print(f"Availability: {best['availability']:.2f}%")    
+        elif choice == '7':
+            display_fleet_file_summary()
         else:
             print(f"{RED}Invalid option! Please try again.{RESET}")
 
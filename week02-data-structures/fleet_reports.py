@@ -0,0 +1,418 @@
+"""
+Parallel Fleet Report Generator
+Goal: Write one reliability report per asset for a whole fleet, fast
+New concepts: ProcessPoolExecutor, chunked work, bounded queues, worker initializers
+
+Usage:
+    python fleet_reports.py SOURCE [--out DIR] [--format text|html|both]
+                            [--charts] [--workers N] [--chunk-size N] [--history N]
+                            [--archive DIR]
+
+SOURCE is a fleet CSV (see save_fleet_to_csv) or the week 6 SQLite database
+(reliability.db). Readings that week 6 moved to its archive folder (see
+archive-readings) count towards the lifetime totals and fill up the
+history, so reports don't change when old readings are archived.
+
+The main process only reads asset ids (or CSV rows) and hands them out in
+chunks; each worker process opens the source itself, renders its chunk's
+reports and writes them straight to disk, sending back only a count and a
+FleetSummary. At most two chunks per worker are in flight, so memory stays
+flat however big the fleet is.
+"""
+
+import argparse
+import html
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fleet_stream import EquipmentRecord, FleetSummary, iter_fleet_csv
+
+# Same grades as the Day 1 report
+GRADES = [(99, 'EXCELLENT'), (95, 'GOOD'), (90, 'FAIR')]
+
+# Settings for the current worker process (set by init_worker)
+_options: Dict = {}
+
+
+def reliability_grade(availability: float) -> str:
+    for threshold, grade in GRADES:
+        if availability >= threshold:
+            return grade
+    return 'NEEDS IMPROVEMENT'
+
+
+def safe_filename(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', text).strip('_') or 'asset'
+
+
+def format_mtbf(mtbf: float) -> str:
+    return f"{mtbf:.2f} hours" if mtbf != float('inf') else "No failures"
+
+
+# LESSON 1: Reading the sources in chunks
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_database(path: str) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(16) == b'SQLite format 3\x00'
+
+
+def open_database(path: str) -> sqlite3.Connection:
+    """Read-only connection, so report runs can never change the data"""
+    return sqlite3.connect(f'file:{os.path.abspath(path)}?mode=ro', uri=True)
+
+
+def iter_equipment_ids(path: str) -> Iterator[int]:
+    connection = open_database(path)
+    try:
+        for (equipment_id,) in connection.execute('SELECT id FROM equipment ORDER BY id'):
+            yield equipment_id
+    finally:
+        connection.close()
+
+
+def default_archive_dir(database_path: str) -> Optional[str]:
+    """The week 6 archive folder next to the database, if there is one"""
+    folder = os.path.join(os.path.dirname(os.path.abspath(database_path)), 'archive')
+    return folder if os.path.isdir(folder) else None
+
+
+def open_archive(folder: str):
+    """Week 6 ReadingArchive (needs numpy, so only imported when used)"""
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week06-database'))
+    from reading_archive import ReadingArchive
+    return ReadingArchive(folder)
+
+
+def archived_totals(archive, equipment_id: int) -> Tuple[int, float, float, int]:
+    """(readings, total hours, uptime hours, failures) over the archived readings"""
+    columns = archive.read(equipment_id, columns=['total_hours', 'uptime_hours', 'failures'])
+    return (len(columns['reading_date']), float(columns['total_hours'].sum()),
+            float(columns['uptime_hours'].sum()), int(columns['failures'].sum()))
+
+
+def archived_history(archive, equipment_id: int, limit: int) -> List[Tuple[str, Optional[float], int]]:
+    """Up to `limit` newest archived (date, availability, failures), newest first"""
+    columns = archive.newest(equipment_id, limit)
+    dates = columns['reading_date'].astype('datetime64[m]').astype(str)
+    return [(date.replace('T', ' '), None if availability != availability else availability, failures)
+            for date, availability, failures
+            in zip(dates, columns['availability'].tolist(), columns['failures'].tolist())]
+
+
+def load_database_assets(path: str, equipment_ids: List[int], history: int,
+                         archive_dir: Optional[str] = None) -> Iterator[Dict]:
+    """Report data for a chunk of equipment from the week 6 database
+
+    Two queries per chunk (equipment rows and lifetime totals), then one
+    index seek per asset for its newest readings. With archive_dir, each
+    asset's archived readings are added to its lifetime totals and to its
+    history when the live table has fewer than `history` readings.
+    """
+    archive = open_archive(archive_dir) if archive_dir else None
+    connection = open_database(path)
+    try:
+        marks = ','.join('?' * len(equipment_ids))
+        equipment = connection.execute(
+            f'SELECT id, name, equipment_type, location FROM equipment WHERE id IN ({marks}) ORDER BY id',
+            equipment_ids
+        ).fetchall()
+        lifetime = {row[0]: row[1:] for row in connection.execute(
+            f'SELECT equipment_id, COUNT(*), SUM(total_hours), SUM(uptime_hours), SUM(failures) '
+            f'FROM performance_reading WHERE equipment_id IN ({marks}) GROUP BY equipment_id',
+            equipment_ids
+        )}
+
+        for equipment_id, name, equipment_type, location in equipment:
+            readings = connection.execute(
+                'SELECT reading_date, total_hours, uptime_hours, failures, availability, mtbf, mttr '
+                'FROM performance_reading WHERE equipment_id = ? '
+                'ORDER BY reading_date DESC, id DESC LIMIT ?',
+                (equipment_id, history)
+            ).fetchall()
+
+            recent = [(date[:16], availability, failures) for date, _, _, failures, availability, _, _ in readings]
+            totals = lifetime.get(equipment_id)
+            if archive is not None:
+                if len(recent) < history:
+                    recent += archived_history(archive, equipment_id, history - len(recent))
+                archived = archived_totals(archive, equipment_id)
+                if archived[0]:
+                    totals = tuple(live + old for live, old in zip(totals or (0, 0.0, 0.0, 0), archived))
+
+            record = None
+            if readings:
+                date, total, uptime, failures, availability, mtbf, mttr = readings[0]
+                record = EquipmentRecord(name, total, uptime, failures, availability or 0,
+                                         mtbf if mtbf is not None and mtbf < 999999 else float('inf'),
+                                         mttr or 0, date[:16])
+
+            yield {
+                'key': f'{equipment_id}_{safe_filename(name)}',
+                'name': name,
+                'type': equipment_type,
+                'location': location,
+                'record': record,
+                'history': recent[::-1],
+                'lifetime': totals
+            }
+    finally:
+        connection.close()
+
+
+def csv_assets(records: List[EquipmentRecord], first_row: int) -> Iterator[Dict]:
+    """Report data for CSV rows (current values only, no history)"""
+    for row, record in enumerate(records, start=first_row):
+        yield {
+            'key': f'{row:06d}_{safe_filename(record.name)}',
+            'name': record.name,
+            'type': None,
+            'location': None,
+            'record': record,
+            'history': [],
+            'lifetime': None
+        }
+
+
+# LESSON 2: Rendering one report
+def render_text(asset: Dict) -> str:
+    """Plain text report in the Day 1 layout"""
+    record = asset['record']
+    lines = [
+        "=" * 50,
+        f"RELIABILITY REPORT FOR: {asset['name'].upper()}",
+        "=" * 50,
+    ]
+    if asset['type'] or asset['location']:
+        lines.append(f"Type: {asset['type'] or 'Unknown'}    Location: {asset['location'] or 'Not specified'}")
+
+    if record is None:
+        lines.append("No readings yet")
+    else:
+        lines += [
+            f"Total Hours: {record.total_hours:.2f}",
+            f"Uptime Hours: {record.uptime_hours:.2f}",
+            f"Downtime Hours: {record.downtime:.2f}",
+            f"Number of Failures: {record.failures}",
+            "-" * 50,
+            f"MTBF: {format_mtbf(record.mtbf)}",
+            f"MTTR: {record.mttr:.2f} hours",
+            f"Availability: {record.availability:.2f}%",
+            f"Reliability Grade: {reliability_grade(record.availability)}",
+        ]
+
+    if asset['lifetime']:
+        readings, total, uptime, failures = asset['lifetime']
+        lines += [
+            "-" * 50,
+            f"Lifetime ({readings} readings): "
+            f"availability {uptime / total * 100 if total else 0:.2f}%, "
+            f"MTBF {format_mtbf(uptime / failures if failures else float('inf'))}",
+        ]
+
+    if asset['history']:
+        lines += ["-" * 50, f"{'Date':<18} {'Availability':>12} {'Failures':>9}"]
+        lines += [f"{date:<18} {availability or 0:>11.2f}% {failures:>9}"
+                  for date, availability, failures in asset['history']]
+
+    lines += ["-" * 50, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", ""]
+    return '\n'.join(lines)
+
+
+def render_html(asset: Dict, chart_file: Optional[str]) -> str:
+    """The same report as a small standalone HTML page"""
+    body = html.escape(render_text(asset))
+    chart = f'<img src="{html.escape(chart_file)}" alt="Availability chart">' if chart_file else ''
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f'<title>Reliability Report - {html.escape(asset["name"])}</title>'
+        '<style>body{font-family:sans-serif;margin:2em}pre{font-size:14px}</style>'
+        f'</head><body><pre>{body}</pre>{chart}</body></html>\n'
+    )
+
+
+def render_chart(asset: Dict, filename: str) -> bool:
+    """Availability over the recent readings (or uptime vs downtime) as a PNG"""
+    import matplotlib.pyplot as plt
+
+    record = asset['record']
+    if record is None:
+        return False
+
+    figure, axis = plt.subplots(figsize=(6, 3))
+    try:
+        if len(asset['history']) > 1:
+            dates = [date for date, _, _ in asset['history']]
+            axis.plot(range(len(dates)), [a or 0 for _, a, _ in asset['history']], marker='o')
+            axis.set_xticks([0, len(dates) - 1], [dates[0][:10], dates[-1][:10]])
+            axis.axhline(95, color='green', linestyle='--', linewidth=1)
+            axis.axhline(90, color='orange', linestyle='--', linewidth=1)
+            axis.set_ylabel('Availability %')
+        else:
+            axis.barh(['Uptime', 'Downtime'], [record.uptime_hours, record.downtime],
+                      color=['tab:green', 'tab:red'])
+            axis.set_xlabel('Hours')
+        axis.set_title(asset['name'])
+        figure.tight_layout()
+        figure.savefig(filename, dpi=80)
+    finally:
+        # Without this every figure stays in memory until the worker exits
+        plt.close(figure)
+    return True
+
+
+# LESSON 3: Worker processes
+def init_worker(options: Dict):
+    """Runs once in every worker process"""
+    _options.update(options)
+    if options['charts']:
+        import matplotlib
+        matplotlib.use('Agg')  # no display in worker processes
+
+
+def write_reports(assets: Iterable[Dict]) -> Tuple[int, FleetSummary]:
+    """Render and write each asset's files; only counts and a summary go back"""
+    out_dir, formats = _options['out'], _options['formats']
+    written, summary = 0, FleetSummary()
+
+    for asset in assets:
+        base = os.path.join(out_dir, asset['key'])
+        chart_file = None
+        if _options['charts'] and render_chart(asset, base + '.png'):
+            chart_file = os.path.basename(base) + '.png'
+
+        if 'text' in formats:
+            with open(base + '.txt', 'w') as file:
+                file.write(render_text(asset))
+        if 'html' in formats:
+            with open(base + '.html', 'w') as file:
+                file.write(render_html(asset, chart_file))
+
+        written += 1
+        if asset['record'] is not None:
+            summary.add(asset['record'])
+
+    return written, summary
+
+
+def report_database_chunk(path: str, equipment_ids: List[int]) -> Tuple[int, FleetSummary]:
+    return write_reports(load_database_assets(path, equipment_ids, _options['history'], _options['archive']))
+
+
+def report_csv_chunk(records: List[EquipmentRecord], first_row: int) -> Tuple[int, FleetSummary]:
+    return write_reports(csv_assets(records, first_row))
+
+
+def write_fleet_summary(summary: FleetSummary, filename: str):
+    """display_fleet_summary's totals, as a file next to the reports"""
+    with open(filename, 'w') as file:
+        file.write("FLEET RELIABILITY SUMMARY\n")
+        file.write("=" * 70 + "\n")
+        file.write(f"Total Equipment: {summary.count}\n")
+        file.write(f"Overall Availability: {summary.fleet_availability:.2f}%\n")
+        file.write(f"Fleet MTBF: {format_mtbf(summary.fleet_mtbf)}\n")
+        file.write("Status: " + ", ".join(f"{s} {n}" for s, n in summary.status_counts.items()) + "\n")
+        if summary.worst is not None:
+            file.write(f"Lowest availability: {summary.worst.name} ({summary.worst.availability:.2f}%)\n")
+        file.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+
+
+# LESSON 4: Putting it together
+def generate_reports(source: str, out_dir: str, formats=('text',), charts: bool = False,
+                     workers: Optional[int] = None, chunk_size: int = 200,
+                     history: int = 30, archive_dir: Optional[str] = None) -> Tuple[int, FleetSummary]:
+    """Write every asset's report to out_dir in parallel
+
+    archive_dir defaults to the week 6 archive folder next to a database
+    source. Returns the number of reports written and the fleet summary.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if archive_dir is None and is_database(source):
+        archive_dir = default_archive_dir(source)
+    options = {'out': out_dir, 'formats': formats, 'charts': charts, 'history': history,
+               'archive': archive_dir}
+    workers = workers or os.cpu_count() or 1
+
+    if is_database(source):
+        tasks = ((report_database_chunk, source, ids)
+                 for ids in chunked(iter_equipment_ids(source), chunk_size))
+    else:
+        tasks = ((report_csv_chunk, records, i * chunk_size)
+                 for i, records in enumerate(chunked(iter_fleet_csv(source), chunk_size)))
+
+    written, summary = 0, FleetSummary()
+
+    def collect(future):
+        nonlocal written
+        chunk_written, chunk_summary = future.result()
+        written += chunk_written
+        summary.merge(chunk_summary)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(options,)) as pool:
+        pending = set()
+        for task in tasks:
+            # Keep at most two chunks per worker queued
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            pending.add(pool.submit(*task))
+
+        for future in pending:
+            collect(future)
+
+    write_fleet_summary(summary, os.path.join(out_dir, 'fleet_summary.txt'))
+    return written, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a reliability report for every asset in a fleet')
+    parser.add_argument('source', help='fleet CSV file or week 6 SQLite database')
+    parser.add_argument('--out', default='reports', help='output folder (default: reports)')
+    parser.add_argument('--format', choices=['text', 'html', 'both'], default='text')
+    parser.add_argument('--charts', action='store_true', help='add a PNG chart per asset (needs matplotlib)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=200, help='assets per task (default: 200)')
+    parser.add_argument('--history', type=int, default=30, help='recent readings per report (database only)')
+    parser.add_argument('--archive', default=None,
+                        help='week 6 archive folder (default: archive/ next to the database, if present)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        sys.exit(f"Source not found: {args.source}")
+    if args.charts:
+        try:
+            import matplotlib  # noqa: F401
+        except ImportError:
+            sys.exit("--charts needs matplotlib (pip install -r requirements.txt)")
+
+    formats = ('text', 'html') if args.format == 'both' else (args.format,)
+    if args.charts and 'html' not in formats:
+        formats += ('html',)  # charts are shown in the HTML report
+
+    start = time.perf_counter()
+    written, summary = generate_reports(args.source, args.out, formats, args.charts,
+                                        args.workers, args.chunk_size, args.history, args.archive)
+    elapsed = time.perf_counter() - start
+
+    print(f"Wrote {written:,} reports to {args.out}/ in {elapsed:.1f} s "
+          f"({written / elapsed if elapsed else 0:,.0f} per second)")
+    print(f"Fleet availability {summary.fleet_availability:.2f}%, MTBF {format_mtbf(summary.fleet_mtbf)}")
+
+
+if __name__ == '__main__':
+    main()
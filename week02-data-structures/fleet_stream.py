@@ -0,0 +1,182 @@
+"""
+Streaming Fleet Data
+Goal: Read and write fleet CSV files of any size with constant memory
+New concepts: generators, __slots__, append-only files, one-pass aggregates
+
+load_fleet_from_csv builds a list with one dictionary per row, so memory
+grows with the file. Here rows are yielded one at a time as small
+EquipmentRecord objects and summaries are accumulated as we go.
+"""
+
+import csv
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+# Same columns (and order) as save_fleet_to_csv
+FIELDNAMES = ['name', 'total_hours', 'uptime_hours', 'failures',
+              'availability', 'mtbf', 'mttr', 'date_added']
+
+
+class EquipmentRecord:
+    """One row of fleet data
+
+    __slots__ stores the attributes in fixed slots instead of a per-object
+    dictionary, which makes each record several times smaller.
+    """
+    __slots__ = ('name', 'total_hours', 'uptime_hours', 'failures',
+                 'availability', 'mtbf', 'mttr', 'date_added')
+
+    def __init__(self, name: str, total_hours: float, uptime_hours: float, failures: int,
+                 availability: float, mtbf: float, mttr: float, date_added: str):
+        self.name = name
+        self.total_hours = total_hours
+        self.uptime_hours = uptime_hours
+        self.failures = failures
+        self.availability = availability
+        self.mtbf = mtbf
+        self.mttr = mttr
+        self.date_added = date_added
+
+    @property
+    def downtime(self) -> float:
+        return self.total_hours - self.uptime_hours
+
+    @property
+    def status(self) -> str:
+        if self.availability >= 95:
+            return 'GOOD'
+        elif self.availability >= 90:
+            return 'FAIR'
+        return 'POOR'
+
+    def to_dict(self) -> Dict:
+        """Same shape as the dictionaries from load_fleet_from_csv"""
+        record = {field: getattr(self, field) for field in self.__slots__}
+        record['downtime'] = self.downtime
+        return record
+
+    def __repr__(self):
+        return f"EquipmentRecord({self.name!r}, availability={self.availability:.2f})"
+
+
+def iter_fleet_csv(filename: str = 'fleet_data.csv') -> Iterator[EquipmentRecord]:
+    """Yield one EquipmentRecord per CSV row without loading the whole file"""
+    with open(filename, 'r', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        # Look columns up once instead of building a dict for every row
+        col = {name: index for index, name in enumerate(header)}
+        name_i, total_i, uptime_i = col['name'], col['total_hours'], col['uptime_hours']
+        failures_i, avail_i, mtbf_i = col['failures'], col['availability'], col['mtbf']
+        mttr_i, date_i = col['mttr'], col['date_added']
+
+        for row in reader:
+            if not row:
+                continue
+            yield EquipmentRecord(
+                row[name_i],
+                float(row[total_i]),
+                float(row[uptime_i]),
+                int(row[failures_i]),
+                float(row[avail_i]),
+                float(row[mtbf_i]),  # float('inf') understands 'inf'
+                float(row[mttr_i]),
+                row[date_i]
+            )
+
+
+def format_row(record: EquipmentRecord) -> list:
+    """CSV values for a record, formatted like save_fleet_to_csv"""
+    return [
+        record.name,
+        record.total_hours,
+        record.uptime_hours,
+        record.failures,
+        f"{record.availability:.2f}",
+        f"{record.mtbf:.2f}" if record.mtbf != float('inf') else 'inf',
+        f"{record.mttr:.2f}",
+        record.date_added
+    ]
+
+
+def append_fleet_csv(records: Iterable[EquipmentRecord], filename: str = 'fleet_data.csv') -> int:
+    """Append records to the end of a fleet file (header only if the file is new)
+
+    Nothing already in the file is rewritten. Returns the number of rows written.
+    """
+    new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+    count = 0
+
+    with open(filename, 'a', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        if new_file:
+            writer.writerow(FIELDNAMES)
+        for record in records:
+            writer.writerow(format_row(record))
+            count += 1
+
+    return count
+
+
+class FleetSummary:
+    """Running totals for display_fleet_summary-style reports
+
+    Call add() for every record; memory stays the same however many
+    records go through it.
+    """
+    __slots__ = ('count', 'total_hours', 'total_uptime', 'total_failures',
+                 'status_counts', 'worst', 'best')
+
+    def __init__(self):
+        self.count = 0
+        self.total_hours = 0.0
+        self.total_uptime = 0.0
+        self.total_failures = 0
+        self.status_counts = {'GOOD': 0, 'FAIR': 0, 'POOR': 0}
+        self.worst: Optional[EquipmentRecord] = None
+        self.best: Optional[EquipmentRecord] = None
+
+    def add(self, record: EquipmentRecord):
+        self.count += 1
+        self.total_hours += record.total_hours
+        self.total_uptime += record.uptime_hours
+        self.total_failures += record.failures
+        self.status_counts[record.status] += 1
+
+        if self.worst is None or record.availability < self.worst.availability:
+            self.worst = record
+        if self.best is None or record.availability > self.best.availability:
+            self.best = record
+
+    def merge(self, other: 'FleetSummary'):
+        """Fold in a summary built elsewhere (e.g. in another process)"""
+        self.count += other.count
+        self.total_hours += other.total_hours
+        self.total_uptime += other.total_uptime
+        self.total_failures += other.total_failures
+        for status, count in other.status_counts.items():
+            self.status_counts[status] += count
+
+        if other.worst is not None and (self.worst is None or other.worst.availability < self.worst.availability):
+            self.worst = other.worst
+        if other.best is not None and (self.best is None or other.best.availability > self.best.availability):
+            self.best = other.best
+
+    @property
+    def fleet_availability(self) -> float:
+        return (self.total_uptime / self.total_hours * 100) if self.total_hours > 0 else 0
+
+    @property
+    def fleet_mtbf(self) -> float:
+        return self.total_uptime / self.total_failures if self.total_failures > 0 else float('inf')
+
+
+def summarize_fleet(records: Iterable[EquipmentRecord]) -> FleetSummary:
+    """One pass over any number of records"""
+    summary = FleetSummary()
+    for record in records:
+        summary.add(record)
+    return summary
@@ -5,14 +5,36 @@ New concepts: Flask, routes, templates, JSON APIs
 """
 
 from flask import Flask, render_template, request, jsonify
+from contextlib import contextmanager
 import csv
+import fcntl
+import hashlib
 import os
+import sys
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+# Shared metric code from week 1
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week01-foundations'))
+from fleet_metrics import FleetAggregate
 
 # Initialize Flask app
 app = Flask(__name__)
 
+CSV_PATH = '../fleet_data.csv'  # From Day 2
+LOG_PATH = '../fleet_data.log'  # Adds/deletes not yet merged into CSV_PATH
+LOCK_PATH = '../fleet_data.lock'
+COUNTER_PATH = '../fleet_data.counter'  # Number of writes so far, see bump_write_counter
+
+FIELDNAMES = ['name', 'total_hours', 'uptime_hours', 'failures',
+              'availability', 'mtbf', 'mttr', 'date_added']
+LOG_FIELDNAMES = ['op'] + FIELDNAMES
+
+# Seconds between background merges of the log into the CSV
+app.config['COMPACT_INTERVAL'] = 30
+
 # LESSON 1: Flask basics - Creating routes
 @app.route('/')
 def home():
@@ -20,10 +42,86 @@ def home():
     return render_template('dashboard.html')
 
 # LESSON 2: Working with data
+def parse_equipment_row(row: Dict) -> Dict:
+    """Convert one CSV row (strings) into an equipment dictionary"""
+    # Calculate status based on availability
+    availability = float(row.get('availability', 0))
+    if availability >= 95:
+        status = 'GOOD'
+    elif availability >= 90:
+        status = 'FAIR'
+    else:
+        status = 'POOR'
+    
+    return {
+        'name': row['name'],
+        'total_hours': float(row['total_hours']),
+        'uptime_hours': float(row['uptime_hours']),
+        'failures': int(row['failures']),
+        'availability': availability,
+        'mtbf': float(row['mtbf']) if row['mtbf'] != 'inf' else 999999,
+        'mttr': float(row.get('mttr', 0)),
+        'status': status,
+        'date_added': row.get('date_added')
+    }
+
+def format_equipment_row(eq: Dict) -> Dict:
+    """Convert an equipment dictionary into CSV values"""
+    return {
+        'name': eq['name'],
+        'total_hours': eq['total_hours'],
+        'uptime_hours': eq['uptime_hours'],
+        'failures': eq['failures'],
+        'availability': f"{eq['availability']:.2f}",
+        'mtbf': f"{eq['mtbf']:.2f}" if eq['mtbf'] < 999999 else 'inf',
+        'mttr': f"{eq['mttr']:.2f}",
+        'date_added': eq.get('date_added') or datetime.now().strftime('%Y-%m-%d %H:%M')
+    }
+
+@contextmanager
+def fleet_lock(exclusive: bool = True):
+    """Lock the fleet files across threads and worker processes
+
+    Writers take the lock exclusively; readers share it so they never see
+    a compaction half done.
+    """
+    with open(LOCK_PATH, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def read_write_counter() -> int:
+    try:
+        with open(COUNTER_PATH, 'r') as file:
+            return int(file.read())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def bump_write_counter():
+    """Count one more write to the fleet files (call with fleet_lock held)
+
+    Part of FleetCache's signature, so two writes within one file timestamp
+    tick still give different versions. Replaced atomically, so readers
+    without the lock never see a half-written number.
+    """
+    tmp_path = COUNTER_PATH + '.tmp'
+    with open(tmp_path, 'w') as file:
+        file.write(str(read_write_counter() + 1))
+    os.replace(tmp_path, COUNTER_PATH)
+
 def load_equipment_data() -> List[Dict]:
+    """Load equipment data: the CSV file plus any adds/deletes in the log"""
+    with fleet_lock(exclusive=False):
+        equipment_list = load_base_data()
+        apply_log_entries(equipment_list)
+    return equipment_list
+
+def load_base_data() -> List[Dict]:
     """Load equipment data from CSV file"""
     equipment_list = []
-    csv_path = '../fleet_data.csv'  # From Day 2
+    csv_path = CSV_PATH
     
     # Check if file exists
     if not os.path.exists(csv_path):
@@ -55,86 +153,244 @@ def load_equipment_data() -> List[Dict]:
         with open(csv_path, 'r') as file:
             reader = csv.DictReader(file)
             for row in reader:
-                # Calculate status based on availability
-                availability = float(row.get('availability', 0))
-                if availability >= 95:
-                    status = 'GOOD'
-                elif availability >= 90:
-                    status = 'FAIR'
-                else:
-                    status = 'POOR'
-                
-                equipment_list.append({
-                    'name': row['name'],
-                    'total_hours': float(row['total_hours']),
-                    'uptime_hours': float(row['uptime_hours']),
-                    'failures': int(row['failures']),
-                    'availability': availability,
-                    'mtbf': float(row['mtbf']) if row['mtbf'] != 'inf' else 999999,
-                    'mttr': float(row.get('mttr', 0)),
-                    'status': status
-                })
+                equipment_list.append(parse_equipment_row(row))
     except Exception as e:
         print(f"Error loading CSV: {e}")
     
     return equipment_list
 
-def save_equipment_data(equipment_list: List[Dict]):
-    """Save equipment data to CSV"""
-    csv_path = '../fleet_data.csv'
+def apply_log_entries(equipment_list: List[Dict]):
+    """Replay the append log (adds and delete tombstones) onto a list"""
+    if not os.path.exists(LOG_PATH):
+        return
     
-    try:
-        with open(csv_path, 'w', newline='') as file:
-            if equipment_list:
-                fieldnames = ['name', 'total_hours', 'uptime_hours', 'failures', 
-                            'availability', 'mtbf', 'mttr', 'date_added']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for eq in equipment_list:
-                    writer.writerow({
-                        'name': eq['name'],
-                        'total_hours': eq['total_hours'],
-                        'uptime_hours': eq['uptime_hours'],
-                        'failures': eq['failures'],
-                        'availability': f"{eq['availability']:.2f}",
-                        'mtbf': f"{eq['mtbf']:.2f}" if eq['mtbf'] < 999999 else 'inf',
-                        'mttr': f"{eq['mttr']:.2f}",
-                        'date_added': eq.get('date_added', datetime.now().strftime('%Y-%m-%d %H:%M'))
-                    })
-    except Exception as e:
-        print(f"Error saving CSV: {e}")
+    with open(LOG_PATH, 'r', newline='') as file:
+        for row in csv.DictReader(file, fieldnames=LOG_FIELDNAMES):
+            if row['op'] == 'add':
+                try:
+                    equipment_list.append(parse_equipment_row(row))
+                except (TypeError, ValueError):
+                    # Half-written last line from a crashed worker
+                    continue
+            elif row['op'] == 'delete':
+                equipment_list[:] = [eq for eq in equipment_list if eq['name'] != row['name']]
+
+def append_log_entry(op: str, eq: Dict):
+    """Record one add or delete - O(1), nothing else in the files is touched"""
+    with fleet_lock():
+        before = fleet_cache._file_signature()
+        with open(LOG_PATH, 'a', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=LOG_FIELDNAMES)
+            if op == 'delete':
+                row = {'op': op, 'name': eq['name']}
+            else:
+                row = {'op': op, **format_equipment_row(eq)}
+            writer.writerow(row)
+        bump_write_counter()
+        
+        # Still holding the lock, so nobody else changed the files meanwhile
+        fleet_cache.apply_log_entry(row, before)
+    
+    start_compactor()
+
+def write_equipment_csv(equipment_list: List[Dict]):
+    """Replace the CSV file atomically (write a temp file, then rename)"""
+    tmp_path = CSV_PATH + '.tmp'
+    with open(tmp_path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for eq in equipment_list:
+            writer.writerow(format_equipment_row(eq))
+    os.replace(tmp_path, CSV_PATH)
+
+def compact_log() -> bool:
+    """Merge the append log into the CSV file and empty the log"""
+    with fleet_lock():
+        if not os.path.exists(LOG_PATH) or os.path.getsize(LOG_PATH) == 0:
+            return False
+        
+        equipment_list = load_base_data()
+        apply_log_entries(equipment_list)
+        write_equipment_csv(equipment_list)
+        open(LOG_PATH, 'w').close()
+        bump_write_counter()
+    
+    fleet_cache.invalidate()
+    return True
+
+_compactor_lock = threading.Lock()
+_compactor_pid = None
+
+def start_compactor():
+    """Start the background compaction thread (once per worker process)"""
+    global _compactor_pid
+    
+    with _compactor_lock:
+        # Compare pids so a forked worker starts its own thread
+        if _compactor_pid == os.getpid():
+            return
+        _compactor_pid = os.getpid()
+    
+    def run():
+        while True:
+            time.sleep(app.config['COMPACT_INTERVAL'])
+            try:
+                compact_log()
+            except Exception as e:
+                print(f"Error compacting log: {e}")
+    
+    threading.Thread(target=run, name='fleet-compactor', daemon=True).start()
+
+# LESSON 2b: Caching - only re-read the CSV when it changes
+class FleetCache:
+    """Parsed fleet data plus name and status indexes
+
+    The write counter and the files' modification times and sizes are
+    checked on every request; the data is parsed again only when they
+    change (another process wrote or edited the files) or after our own
+    writes call invalidate(). The counter catches writes the timestamps
+    can't tell apart, the timestamps catch edits made outside the app.
+    """
+    
+    def __init__(self, *paths: str):
+        self.paths = paths
+        self._lock = threading.Lock()
+        self._signature = None
+        self._loaded = False
+        self.equipment: List[Dict] = []
+        self.by_name: Dict[str, Dict] = {}
+        self.by_status: Dict[str, List[Dict]] = {}
+        self.aggregate = FleetAggregate()
+    
+    def _file_signature(self):
+        signature = [read_write_counter()]
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def version(self) -> str:
+        """Changes with every write to the CSV or the log, in any worker"""
+        return hashlib.sha1(repr(self._file_signature()).encode()).hexdigest()[:16]
+    
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+    
+    def refresh(self):
+        """Re-parse the CSV if it changed since the last load"""
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return
+        
+        with self._lock:
+            # Another request may have reloaded while we waited
+            signature = self._file_signature()
+            if self._loaded and signature == self._signature:
+                return
+            
+            equipment = load_equipment_data()
+            by_status: Dict[str, List[Dict]] = {}
+            aggregate = FleetAggregate()
+            for eq in equipment:
+                by_status.setdefault(eq['status'], []).append(eq)
+                aggregate.add_equipment()
+                aggregate.add_reading(eq['availability'], eq['mtbf'], eq['failures'], eq['status'])
+            
+            self.equipment = equipment
+            self.by_name = {eq['name']: eq for eq in equipment}
+            self.by_status = by_status
+            self.aggregate = aggregate
+            self._signature = signature
+            self._loaded = True
+    
+    def apply_log_entry(self, row: Dict, before):
+        """Apply our own log write without re-reading the files
+
+        `before` is the file signature from just before the write. If the
+        cache was not up to date at that point, fall back to a full reload.
+        New lists are built (instead of editing them in place) so requests
+        still serializing the old ones are not affected.
+        """
+        with self._lock:
+            if not self._loaded or self._signature != before:
+                self._loaded = False
+                return
+            
+            if row['op'] == 'add':
+                changed = [parse_equipment_row(row)]
+                sign = 1
+                self.equipment = self.equipment + changed
+            else:
+                changed = [eq for eq in self.equipment if eq['name'] == row['name']]
+                sign = -1
+                self.equipment = [eq for eq in self.equipment if eq['name'] != row['name']]
+            
+            by_name = dict(self.by_name)
+            by_status = dict(self.by_status)
+            aggregate = FleetAggregate(**self.aggregate.as_dict())
+            for eq in changed:
+                if sign > 0:
+                    by_name[eq['name']] = eq
+                    by_status[eq['status']] = by_status.get(eq['status'], []) + [eq]
+                else:
+                    by_name.pop(eq['name'], None)
+                    by_status[eq['status']] = [e for e in by_status.get(eq['status'], []) if e is not eq]
+                aggregate.add_equipment(sign)
+                aggregate.add_reading(eq['availability'], eq['mtbf'], eq['failures'], eq['status'], sign)
+            
+            self.by_name = by_name
+            self.by_status = by_status
+            self.aggregate = aggregate
+            self._signature = self._file_signature()
+    
+    def all(self) -> List[Dict]:
+        self.refresh()
+        return self.equipment
+    
+    def get(self, name: str) -> Optional[Dict]:
+        self.refresh()
+        return self.by_name.get(name)
+    
+    def with_status(self, status: str) -> List[Dict]:
+        self.refresh()
+        return self.by_status.get(status, [])
+    
+    def statistics(self) -> Dict:
+        """Fleet statistics from running totals, updated on every add/delete"""
+        self.refresh()
+        return self.aggregate.statistics()
+
+fleet_cache = FleetCache(CSV_PATH, LOG_PATH)
 
 # LESSON 3: API endpoints for dynamic data
 @app.route('/api/equipment')
 def get_equipment():
-    """API endpoint to get all equipment data"""
-    equipment = load_equipment_data()
+    """API endpoint to get all equipment data
+
+    Answers If-None-Match with 304 without parsing or serializing anything.
+    """
+    etag = f'fleet-{fleet_cache.version()}'
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
     
-    # Calculate fleet statistics
-    if equipment:
-        total_availability = sum(eq['availability'] for eq in equipment)
-        avg_availability = total_availability / len(equipment)
-        
-        total_mtbf = sum(eq['mtbf'] for eq in equipment if eq['mtbf'] < 999999)
-        equipment_with_failures = sum(1 for eq in equipment if eq['failures'] > 0)
-        avg_mtbf = total_mtbf / equipment_with_failures if equipment_with_failures > 0 else 0
-        
-        critical_count = sum(1 for eq in equipment if eq['status'] == 'POOR')
-    else:
-        avg_availability = 0
-        avg_mtbf = 0
-        critical_count = 0
+    equipment = fleet_cache.all()
     
-    return jsonify({
+    # Fleet statistics come from running totals, not a pass over the fleet
+    response = jsonify({
         'equipment': equipment,
-        'statistics': {
-            'fleet_availability': round(avg_availability, 2),
-            'total_equipment': len(equipment),
-            'critical_alerts': critical_count,
-            'avg_mtbf': round(avg_mtbf, 2)
-        }
+        'statistics': fleet_cache.statistics()
     })
+    response.set_etag(etag)
+    # Let browsers keep the body but always revalidate with the ETag
+    response.cache_control.no_cache = True
+    return response
 
 # LESSON 4: Handling form submissions
 @app.route('/api/equipment/add', methods=['POST'])
@@ -191,12 +447,8 @@ def add_equipment():
             'date_added': datetime.now().strftime('%Y-%m-%d %H:%M')
         }
         
-        # Load existing equipment and add new one
-        equipment_list = load_equipment_data()
-        equipment_list.append(new_equipment)
-        
-        # Save to CSV
-        save_equipment_data(equipment_list)
+        # Append to the log (merged into the CSV in the background)
+        append_log_entry('add', new_equipment)
         
         return jsonify({
             'success': True,
@@ -211,14 +463,14 @@ def add_equipment():
 @app.route('/api/equipment/<equipment_name>')
 def get_equipment_details(equipment_name):
     """Get details for specific equipment"""
-    equipment_list = load_equipment_data()
-    
-    # Find the equipment
-    equipment = next((eq for eq in equipment_list if eq['name'] == equipment_name), None)
+    equipment = fleet_cache.get(equipment_name)
     
     if not equipment:
         return jsonify({'error': 'Equipment not found'}), 404
     
+    # Copy so the extra fields don't end up in the cache
+    equipment = dict(equipment)
+    
     # Add some calculated details
     equipment['performance_score'] = min(100, equipment['availability'] + (equipment['mtbf'] / 10))
     equipment['maintenance_priority'] = 'HIGH' if equipment['status'] == 'POOR' else 'MEDIUM' if equipment['status'] == 'FAIR' else 'LOW'
@@ -229,16 +481,11 @@ def get_equipment_details(equipment_name):
 @app.route('/api/equipment/<equipment_name>', methods=['DELETE'])
 def delete_equipment(equipment_name):
     """Delete equipment from the system"""
-    equipment_list = load_equipment_data()
-    
-    # Filter out the equipment to delete
-    updated_list = [eq for eq in equipment_list if eq['name'] != equipment_name]
-    
-    if len(updated_list) == len(equipment_list):
+    if fleet_cache.get(equipment_name) is None:
         return jsonify({'error': 'Equipment not found'}), 404
     
-    # Save updated list
-    save_equipment_data(updated_list)
+    # Append a tombstone instead of rewriting the CSV
+    append_log_entry('delete', {'name': equipment_name})
     
     return jsonify({
         'success': True,
@@ -259,8 +506,7 @@ def health_check():
 @app.route('/api/equipment/status/<status>')
 def get_equipment_by_status(status):
     """Get all equipment with specific status (GOOD/FAIR/POOR)"""
-    equipment_list = load_equipment_data()
-    filtered = [eq for eq in equipment_list if eq['status'] == status.upper()]
+    filtered = fleet_cache.with_status(status.upper())
     return jsonify({
         'status': status.upper(),
         'count': len(filtered),
@@ -0,0 +1,283 @@
+"""
+Async Reliability API (ASGI) on the same SQLite database
+Goal: Serve many concurrent readers without one thread per request
+New concepts: ASGI, async/await, SQLAlchemy AsyncSession, aiosqlite, connection pool tuning
+
+Same JSON contract as app_with_db.py for:
+    GET  /api/health
+    GET  /api/equipment
+    GET  /api/equipment/<id>
+    POST /api/equipment/add
+
+The models, the running statistics hooks and the history/archive helpers
+are imported from app_with_db, so both apps can run side by side on one
+database file. Quart is the async twin of Flask (same routes, same
+jsonify), so the route code reads almost the same - the difference is that
+every query is awaited and a waiting request does not hold a thread.
+
+Run it:  uvicorn app_async:app --port 5001
+    or:  hypercorn app_async:app --bind 0.0.0.0:5001
+Compare: python benchmark_async_load.py
+
+Not served here: the SSE stream, bulk upload, history and the reliability
+models - use app_with_db.py for those. Equipment added here is not pushed
+to the sync app's SSE feed (that broker lives in the other process), but
+its ETag changes, so polling clients still see it.
+"""
+
+from quart import Quart, abort, jsonify, request
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as SyncSession
+from datetime import datetime
+from typing import Dict, List
+import asyncio
+import os
+
+from app_with_db import app as sync_app, Equipment, PerformanceReading, FleetStatistics, \
+    init_database, aggregate_snapshot, add_archived_history, bump_version_after_flush
+from sqlite_profiles import apply_sqlite_pragmas, database_profile
+
+app = Quart(__name__)
+
+# Same database as the sync app (honours DATABASE_URL), async driver
+app.config['DATABASE_URL'] = make_url(sync_app.config['SQLALCHEMY_DATABASE_URI']).set(drivername='sqlite+aiosqlite')
+
+# Connection pool. Each aiosqlite connection runs its own thread, so the
+# pool size is how many queries can run at once; everything else waits on
+# the pool (up to POOL_TIMEOUT seconds) instead of opening more files.
+# SQLite allows many readers but only one writer, so a big pool helps reads
+# and does nothing for writes.
+app.config['POOL_SIZE'] = int(os.environ.get('ASYNC_POOL_SIZE', 16))
+app.config['POOL_MAX_OVERFLOW'] = int(os.environ.get('ASYNC_POOL_MAX_OVERFLOW', 8))
+app.config['POOL_TIMEOUT'] = 60
+# Seconds a writer waits for the database lock before "database is locked"
+# (a busy_timeout PRAGMA from the database profile replaces it)
+app.config['SQLITE_BUSY_TIMEOUT'] = 30
+
+engine = create_async_engine(
+    app.config['DATABASE_URL'],
+    pool_size=app.config['POOL_SIZE'],
+    max_overflow=app.config['POOL_MAX_OVERFLOW'],
+    pool_timeout=app.config['POOL_TIMEOUT'],
+    connect_args={'timeout': app.config['SQLITE_BUSY_TIMEOUT']}
+)
+# Same PRAGMAs as the sync app (DATABASE_PROFILE); the pool settings above stay
+apply_sqlite_pragmas(engine.sync_engine, database_profile(sync_app.config['DATABASE_PROFILE'])['pragmas'])
+
+class FleetSession(SyncSession):
+    """Sync session behind each AsyncSession, with the sync app's flush hooks"""
+
+
+event.listen(FleetSession, 'after_flush', bump_version_after_flush)
+
+# expire_on_commit=False: attributes stay readable after commit (an async
+# session cannot lazy-load them again behind our back)
+Session = async_sessionmaker(engine, expire_on_commit=False, sync_session_class=FleetSession)
+
+
+@app.after_request
+async def allow_react_frontend(response):
+    """CORS for the React frontend, like CORS(app, origins=[...]) in the sync app"""
+    if request.headers.get('Origin') == 'http://localhost:3000':
+        response.headers['Access-Control-Allow-Origin'] = 'http://localhost:3000'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Vary'] = 'Origin'
+    return response
+
+
+@app.before_serving
+async def prepare_database():
+    # Tables, indexes and the statistics row are created by the sync code,
+    # in a worker thread so the event loop is not blocked meanwhile
+    await asyncio.to_thread(init_database)
+
+
+@app.after_serving
+async def close_pool():
+    await engine.dispose()
+
+
+async def fleet_version(session: AsyncSession):
+    """Same value as app_with_db.fleet_version(), so ETags match across both apps"""
+    return await session.scalar(select(FleetStatistics.version).where(FleetStatistics.id == 1))
+
+
+async def load_fleet_snapshot(session: AsyncSession) -> List:
+    """(equipment, latest_reading) pairs in one query, see app_with_db.load_fleet_snapshot"""
+    result = await session.execute(
+        select(Equipment, PerformanceReading)
+        .outerjoin(PerformanceReading, PerformanceReading.id == Equipment.latest_reading_id)
+        .order_by(Equipment.id)
+    )
+    return result.all()
+
+
+async def load_fleet_statistics(session: AsyncSession, snapshot) -> Dict:
+    """Statistics block from the running totals"""
+    row = await session.get(FleetStatistics, 1)
+    if row is None:
+        return aggregate_snapshot(snapshot).statistics()
+    return row.to_aggregate().statistics()
+
+
+async def load_equipment(session: AsyncSession, equipment_id: int):
+    """(equipment, latest_reading) for one id, or None"""
+    result = await session.execute(
+        select(Equipment, PerformanceReading)
+        .outerjoin(PerformanceReading, PerformanceReading.id == Equipment.latest_reading_id)
+        .where(Equipment.id == equipment_id)
+    )
+    return result.first()
+
+
+# Routes
+@app.route('/api/equipment')
+async def get_equipment():
+    """Get all equipment with latest readings (304 when the ETag still matches)"""
+    try:
+        async with Session() as session:
+            version = await fleet_version(session)
+            etag = f'fleet-{version}' if version is not None else None
+            if etag and etag in request.if_none_match:
+                response = app.response_class('', status=304)
+                response.set_etag(etag)
+                response.cache_control.no_cache = True
+                return response
+
+            snapshot = await load_fleet_snapshot(session)
+            statistics = await load_fleet_statistics(session, snapshot)
+
+        response = jsonify({
+            'equipment': [eq.to_dict(reading, fetch_latest=False) for eq, reading in snapshot],
+            'statistics': statistics
+        })
+        if etag:
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/equipment/add', methods=['POST'])
+async def add_equipment():
+    """Add new equipment with initial reading"""
+    data = await request.get_json()
+
+    required_fields = ['name', 'total_hours', 'uptime_hours', 'failures']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'error': f'Missing required field: {field}'}), 400
+
+    async with Session() as session:
+        try:
+            name = data['name'].strip()
+            if await session.scalar(select(Equipment.id).where(Equipment.name == name)):
+                return jsonify({'error': 'Equipment already exists'}), 400
+
+            if float(data['uptime_hours']) > float(data['total_hours']):
+                return jsonify({'error': 'Uptime cannot exceed total hours'}), 400
+            if int(data['failures']) < 0:
+                return jsonify({'error': 'Failures cannot be negative'}), 400
+
+            new_equipment = Equipment(
+                name=name,
+                equipment_type=data.get('type', 'Unknown'),
+                location=data.get('location', 'Not specified')
+            )
+            session.add(new_equipment)
+            await session.flush()
+
+            reading = PerformanceReading(
+                equipment_id=new_equipment.id,
+                total_hours=float(data['total_hours']),
+                uptime_hours=float(data['uptime_hours']),
+                failures=int(data['failures']),
+                notes=data.get('notes', '')
+            )
+            reading.calculate_metrics()
+            session.add(reading)
+            # The after_insert hooks (latest reading, fleet totals) run in this flush
+            await session.commit()
+
+            return jsonify({
+                'success': True,
+                'message': f'Equipment {new_equipment.name} added successfully',
+                'equipment': new_equipment.to_dict(reading, fetch_latest=False)
+            })
+        except Exception as e:
+            await session.rollback()
+            return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/equipment/<int:equipment_id>')
+async def get_equipment_details(equipment_id):
+    """Get equipment details with performance history"""
+    async with Session() as session:
+        row = await load_equipment(session, equipment_id)
+        if row is None:
+            abort(404)
+        equipment, latest_reading = row
+
+        live_readings = await session.scalars(
+            select(PerformanceReading)
+            .where(PerformanceReading.equipment_id == equipment_id)
+            .order_by(PerformanceReading.reading_date.desc())
+            .limit(10)
+        )
+        # The archive is read from .npy files (blocking I/O): off the event loop
+        readings = await asyncio.to_thread(add_archived_history, equipment_id, live_readings.all())
+
+    if len(readings) >= 2 and readings[0]['availability'] is not None and readings[-1]['availability'] is not None:
+        availability_trend = readings[0]['availability'] - readings[-1]['availability']
+        trend = 'improving' if availability_trend > 0 else 'declining' if availability_trend < 0 else 'stable'
+    else:
+        trend = 'insufficient data'
+
+    return jsonify({
+        'equipment': equipment.to_dict(latest_reading, fetch_latest=False),
+        'history': [{**r, 'date': r['date'].strftime('%Y-%m-%d')} for r in readings],
+        'trend': trend,
+        'total_readings': len(readings)
+    })
+
+
+@app.route('/api/health')
+async def health_check():
+    """Health check with database status"""
+    try:
+        async with Session() as session:
+            equipment_count = await session.scalar(select(func.count()).select_from(Equipment))
+
+        return jsonify({
+            'status': 'healthy',
+            'database': 'connected',
+            'database_location': engine.url.database,
+            'equipment_count': equipment_count,
+            'pool': engine.pool.status(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'unhealthy',
+            'database': 'error',
+            'error': str(e)
+        }), 500
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("⚡ Async Reliability API (Quart + aiosqlite)")
+    print("=" * 50)
+    print(f"Database location: {engine.url.database}")
+    print(f"Pool: {app.config['POOL_SIZE']} connections + {app.config['POOL_MAX_OVERFLOW']} overflow")
+    print("\nAPI Endpoints:")
+    print("  GET  http://localhost:5001/api/health")
+    print("  GET  http://localhost:5001/api/equipment")
+    print("  GET  http://localhost:5001/api/equipment/<id>")
+    print("  POST http://localhost:5001/api/equipment/add")
+    print("-" * 50)
+
+    app.run(host='0.0.0.0', port=5001)
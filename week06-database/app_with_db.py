@@ -3,12 +3,20 @@ Flask Backend with SQLite Database and CORS enabled
 Complete working version for React frontend
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from datetime import datetime
-from typing import Dict, List
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Dict, Iterator, List
+import click
+import csv
+import io
+import json
 import os
+import sys
+import threading
+import numpy as np
 from sqlalchemy import func
 
 # Initialize Flask app
@@ -19,11 +27,61 @@ CORS(app, origins=['http://localhost:3000'])
 
 # Database Configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "reliability.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f'sqlite:///{os.path.join(basedir, "reliability.db")}'
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Bulk ingestion commits this many readings per transaction
+app.config['BULK_CHUNK_SIZE'] = 5000
+
+# Chart points returned by the history API (default and upper limit)
+app.config['HISTORY_MAX_POINTS'] = 500
+app.config['HISTORY_POINTS_LIMIT'] = 5000
+
+# Readings older than this many days move to the columnar archive
+# (flask --app app_with_db archive-readings)
+app.config['ARCHIVE_PATH'] = os.environ.get('ARCHIVE_PATH', os.path.join(basedir, 'archive'))
+app.config['ARCHIVE_HORIZON_DAYS'] = 365
+
+# Database profile: 'development' (SQLite defaults) or 'production'
+# (WAL, tuned PRAGMAs, bigger pool), see sqlite_profiles.py
+from sqlite_profiles import apply_sqlite_pragmas, current_pragmas, database_profile
+app.config['DATABASE_PROFILE'] = os.environ.get('DATABASE_PROFILE', 'development')
+database_settings = database_profile(app.config['DATABASE_PROFILE'])
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_settings['engine_options']
+
+# Read-only routes (@read_only) get their own connections: the database file
+# opened with mode=ro, or a replica copied from it (flask --app app_with_db
+# refresh-replica) when READ_REPLICA_PATH is set. See read_routing.py
+from read_routing import RoutingSession, configure_read_bind, read_only, refresh_replica, sqlite_path, READ_BIND
+app.config['READ_REPLICA_PATH'] = os.environ.get('READ_REPLICA_PATH')
+configure_read_bind(app, app.config['READ_REPLICA_PATH'])
+
+# Shared vectorized metrics from week 1
+sys.path.append(os.path.join(basedir, '..', 'week01-foundations'))
+from fleet_metrics import calculate_fleet_metrics, FleetAggregate, NO_FAILURE_MTBF
+from reliability_models import fit_reliability_models
+
+from fleet_events import EventBroker
+from reading_archive import ReadingArchive, encode_status
+from timeseries import BUCKET_EXPRESSIONS, BUCKET_FIELDS, aggregate_buckets, bucket_point, \
+    downsample_buckets, merge_buckets, parse_bucket_start
+
+# Live change feed for GET /api/equipment/stream
+fleet_events = EventBroker()
+
+# Cold readings, see archive_readings()
+reading_archive = ReadingArchive(app.config['ARCHIVE_PATH'])
+
 # Initialize database
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+with app.app_context():
+    apply_sqlite_pragmas(db.engine, database_settings['pragmas'])
+    if READ_BIND in db.engines:
+        # journal_mode belongs to the file and a read-only connection can't change it
+        apply_sqlite_pragmas(db.engines[READ_BIND], {name: value for name, value in database_settings['pragmas'].items()
+                                                     if name != 'journal_mode'})
 
 # Database Models
 class Equipment(db.Model):
@@ -34,12 +92,26 @@ class Equipment(db.Model):
     location = db.Column(db.String(100))
     install_date = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Denormalized pointer to the newest reading, kept up to date on every
+    # reading insert (see update_latest_reading). No foreign key here so the
+    # two tables don't depend on each other when they are created.
+    latest_reading_id = db.Column(db.Integer)
+    
     readings = db.relationship('PerformanceReading', backref='equipment', lazy=True, cascade='all, delete-orphan')
+    latest_reading = db.relationship(
+        'PerformanceReading',
+        primaryjoin='foreign(Equipment.latest_reading_id) == PerformanceReading.id',
+        viewonly=True
+    )
     
-    def to_dict(self):
-        """Convert to dictionary for JSON"""
-        latest_reading = PerformanceReading.query.filter_by(equipment_id=self.id)\
-                        .order_by(PerformanceReading.reading_date.desc()).first()
+    def to_dict(self, latest_reading=None, fetch_latest=True):
+        """Convert to dictionary for JSON
+
+        Pass fetch_latest=False when latest_reading was already loaded
+        (see load_fleet_snapshot) to avoid one extra query per equipment.
+        """
+        if fetch_latest:
+            latest_reading = self.latest_reading
         
         if latest_reading:
             return {
@@ -84,6 +156,11 @@ class PerformanceReading(db.Model):
     status = db.Column(db.String(20))
     notes = db.Column(db.Text)
     
+    # Every hot query filters by equipment and orders by date
+    __table_args__ = (
+        db.Index('ix_performance_reading_equipment_date', 'equipment_id', 'reading_date'),
+    )
+    
     def calculate_metrics(self):
         """Calculate all metrics from raw data"""
         downtime = self.total_hours - self.uptime_hours
@@ -98,10 +175,702 @@ class PerformanceReading(db.Model):
         else:
             self.status = 'POOR'
 
+class FleetStatistics(db.Model):
+    """Running fleet totals in a single row (see FleetAggregate)
+
+    Updated in the same transaction as every equipment add/delete and every
+    reading that becomes an equipment's latest, so GET /api/equipment can
+    serve statistics without scanning the fleet. `version` goes up with
+    every commit that changes fleet data (see bump_fleet_version).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    equipment_count = db.Column(db.Integer, nullable=False, default=0)
+    availability_count = db.Column(db.Integer, nullable=False, default=0)
+    availability_sum = db.Column(db.Float, nullable=False, default=0)
+    mtbf_count = db.Column(db.Integer, nullable=False, default=0)
+    mtbf_sum = db.Column(db.Float, nullable=False, default=0)
+    good_count = db.Column(db.Integer, nullable=False, default=0)
+    fair_count = db.Column(db.Integer, nullable=False, default=0)
+    poor_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_aggregate(self) -> FleetAggregate:
+        return FleetAggregate(**{field: getattr(self, field) for field in FleetAggregate.FIELDS})
+
+def reading_delta(reading, sign=1) -> Dict:
+    """FleetAggregate change for adding (or removing) a latest reading"""
+    return FleetAggregate.reading_delta(reading.availability, reading.mtbf,
+                                        reading.failures, reading.status, sign)
+
+def update_fleet_statistics(connection, *deltas: Dict):
+    """Add the deltas to the FleetStatistics row in one UPDATE"""
+    totals = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            totals[field] = totals.get(field, 0) + value
+    
+    table = FleetStatistics.__table__
+    values = {field: table.c[field] + value for field, value in totals.items() if value}
+    if values:
+        connection.execute(table.update().where(table.c.id == 1).values(values))
+
+def latest_readings_for(connection, equipment_ids) -> List:
+    """Current latest reading rows (via latest_reading_id) for some equipment"""
+    equipment = Equipment.__table__
+    readings = PerformanceReading.__table__
+    
+    return connection.execute(
+        db.select(readings.c.id, readings.c.reading_date, readings.c.availability,
+                  readings.c.mtbf, readings.c.failures, readings.c.status)
+        .select_from(equipment.join(readings, readings.c.id == equipment.c.latest_reading_id))
+        .where(equipment.c.id.in_(list(equipment_ids)))
+    ).all()
+
+@db.event.listens_for(PerformanceReading, 'after_insert')
+def update_latest_reading(mapper, connection, reading):
+    """Point the equipment at this reading if it is the newest one
+
+    The fleet statistics move from the old latest reading to this one. Runs
+    inside the same transaction as the INSERT, so the pointer, the totals and
+    the reading are committed (or rolled back) together.
+    """
+    current = latest_readings_for(connection, [reading.equipment_id])
+    current = current[0] if current else None
+    
+    if current is not None and current.reading_date > reading.reading_date:
+        return
+    
+    equipment = Equipment.__table__
+    connection.execute(
+        equipment.update()
+        .where(equipment.c.id == reading.equipment_id)
+        .values(latest_reading_id=reading.id)
+    )
+    
+    deltas = [reading_delta(reading)]
+    if current is not None:
+        deltas.append(reading_delta(current, sign=-1))
+    update_fleet_statistics(connection, *deltas)
+
+@db.event.listens_for(Equipment, 'after_insert')
+def count_new_equipment(mapper, connection, equipment):
+    update_fleet_statistics(connection, {'equipment_count': 1})
+
+def bump_fleet_version(connection):
+    """Count one more change to the fleet, in the caller's transaction"""
+    table = FleetStatistics.__table__
+    connection.execute(table.update().where(table.c.id == 1).values(version=table.c.version + 1))
+
+@db.event.listens_for(db.session, 'after_flush')
+def bump_version_after_flush(session, flush_context):
+    """Every flush that wrote something moves the fleet version on
+
+    app_async registers it for its sessions too. Raw inserts and deletes
+    (bulk ingestion, archiving) call bump_fleet_version themselves.
+    """
+    if session.new or session.dirty or session.deleted:
+        bump_fleet_version(session.connection())
+
+@db.event.listens_for(db.session, 'before_flush')
+def remove_deleted_equipment(session, flush_context, instances):
+    """Take deleted equipment (and its latest reading) out of the totals
+
+    Done before the flush because the cascade deletes the readings first.
+    """
+    deleted_ids = [obj.id for obj in session.deleted if isinstance(obj, Equipment)]
+    if not deleted_ids:
+        return
+    
+    connection = session.connection()
+    deltas = [{'equipment_count': -len(deleted_ids)}]
+    deltas += [reading_delta(current, sign=-1) for current in latest_readings_for(connection, deleted_ids)]
+    update_fleet_statistics(connection, *deltas)
+
+def latest_reading_ids():
+    """Subquery of (equipment_id, reading_id) computed from the full history
+
+    This is the slow, always-correct answer used to rebuild and check the
+    latest_reading_id column.
+    """
+    # Number each equipment's readings newest-first, then keep row 1
+    ranked = db.session.query(
+        PerformanceReading.id,
+        PerformanceReading.equipment_id,
+        func.row_number().over(
+            partition_by=PerformanceReading.equipment_id,
+            order_by=(PerformanceReading.reading_date.desc(), PerformanceReading.id.desc())
+        ).label('row_number')
+    ).subquery()
+
+    return db.session.query(ranked.c.equipment_id, ranked.c.id.label('reading_id'))\
+             .filter(ranked.c.row_number == 1).subquery()
+
+def ensure_latest_reading_column():
+    """Add Equipment.latest_reading_id to databases created before it existed"""
+    columns = [column['name'] for column in db.inspect(db.engine).get_columns('equipment')]
+    if 'latest_reading_id' in columns:
+        return False
+    
+    with db.engine.begin() as connection:
+        connection.execute(db.text('ALTER TABLE equipment ADD COLUMN latest_reading_id INTEGER'))
+    return True
+
+def refresh_latest_readings_statement(equipment_ids=None):
+    """UPDATE that points equipment at their newest reading
+
+    Each equipment is one index seek on (equipment_id, reading_date). Limit
+    it to equipment_ids after inserts that skip the ORM (bulk ingestion).
+    """
+    newest_id = db.select(PerformanceReading.id)\
+                  .where(PerformanceReading.equipment_id == Equipment.id)\
+                  .order_by(PerformanceReading.reading_date.desc(), PerformanceReading.id.desc())\
+                  .limit(1)\
+                  .scalar_subquery()
+    
+    statement = db.update(Equipment).values(latest_reading_id=newest_id)
+    if equipment_ids is not None:
+        statement = statement.where(Equipment.id.in_(equipment_ids))
+    return statement
+
+def rebuild_latest_readings(equipment_ids=None):
+    """Recompute latest_reading_id from the reading history
+
+    Runs in the current transaction; the caller commits.
+    """
+    result = db.session.execute(refresh_latest_readings_statement(equipment_ids))
+    bump_fleet_version(db.session.connection())
+    return result.rowcount
+
+def check_latest_readings() -> List[int]:
+    """Return ids of equipment whose latest_reading_id is out of date"""
+    latest = latest_reading_ids()
+    
+    mismatched = db.session.query(Equipment.id)\
+                   .outerjoin(latest, latest.c.equipment_id == Equipment.id)\
+                   .filter(Equipment.latest_reading_id.is_not(latest.c.reading_id))\
+                   .order_by(Equipment.id)
+    
+    return [equipment_id for (equipment_id,) in mismatched]
+
+def ensure_indexes():
+    """Create model indexes that are missing from an existing database"""
+    for model in (Equipment, PerformanceReading):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def fleet_snapshot_query():
+    """Query of (equipment, latest_reading) pairs, see load_fleet_snapshot"""
+    return db.session.query(Equipment, PerformanceReading)\
+             .outerjoin(PerformanceReading, PerformanceReading.id == Equipment.latest_reading_id)\
+             .order_by(Equipment.id)
+
+def reading_history_query(equipment_id, limit=10):
+    """Newest readings first for one equipment"""
+    return PerformanceReading.query.filter_by(equipment_id=equipment_id)\
+             .order_by(PerformanceReading.reading_date.desc()).limit(limit)
+
+def reading_buckets_query(equipment_id, bucket, start=None, end=None):
+    """Sums and counts per time bucket for one equipment's readings
+
+    A range seek on (equipment_id, reading_date) followed by GROUP BY, so
+    only one row per bucket leaves the database.
+    """
+    bucket_start = db.literal_column(
+        BUCKET_EXPRESSIONS[bucket].format(column='performance_reading.reading_date')
+    ).label('bucket_start')
+    # Same rule as the fleet statistics: MTBF only counts when there were failures
+    has_mtbf = db.and_(PerformanceReading.failures > 0, PerformanceReading.mtbf < NO_FAILURE_MTBF)
+    
+    query = db.session.query(
+        bucket_start,
+        func.count(PerformanceReading.id).label('readings'),
+        func.coalesce(func.sum(PerformanceReading.availability), 0).label('availability_sum'),
+        func.count(PerformanceReading.availability).label('availability_count'),
+        func.coalesce(func.sum(db.case((has_mtbf, PerformanceReading.mtbf))), 0).label('mtbf_sum'),
+        func.count(db.case((has_mtbf, 1))).label('mtbf_count'),
+        func.coalesce(func.sum(PerformanceReading.failures), 0).label('failures')
+    ).filter(PerformanceReading.equipment_id == equipment_id)
+    
+    if start is not None:
+        query = query.filter(PerformanceReading.reading_date >= start)
+    if end is not None:
+        query = query.filter(PerformanceReading.reading_date < end)
+    
+    return query.group_by(bucket_start).order_by(bucket_start)
+
+def load_reading_buckets(equipment_id, bucket, start=None, end=None) -> List[Dict]:
+    """Time buckets (oldest first) from the live table and the archive together"""
+    # Columns come back in BUCKET_FIELDS order after the bucket start
+    live = [
+        dict(zip(BUCKET_FIELDS, values), start=parse_bucket_start(bucket_start))
+        for bucket_start, *values in reading_buckets_query(equipment_id, bucket, start, end)
+    ]
+    # A bucket can hold both archived and live readings, merge_buckets adds them up
+    return merge_buckets(archived_buckets(equipment_id, bucket, start, end), live)
+
+def archived_buckets(equipment_id, bucket, start=None, end=None) -> List[Dict]:
+    """Same buckets as reading_buckets_query, computed over archived columns"""
+    columns = reading_archive.read(equipment_id, start, end, columns=('availability', 'mtbf', 'failures'))
+    availability, mtbf, failures = columns['availability'], columns['mtbf'], columns['failures']
+    
+    has_availability = ~np.isnan(availability)
+    has_mtbf = (failures > 0) & (mtbf < NO_FAILURE_MTBF)
+    
+    return aggregate_buckets(columns['reading_date'], bucket, {
+        'readings': np.ones(len(failures), dtype=np.int64),
+        'availability_sum': np.where(has_availability, availability, 0.0),
+        'availability_count': has_availability,
+        'mtbf_sum': np.where(has_mtbf, mtbf, 0.0),
+        'mtbf_count': has_mtbf,
+        'failures': failures
+    })
+
+def load_recent_history(equipment_id, limit=10) -> List[Dict]:
+    """Newest readings first, from the live table and then the archive"""
+    return add_archived_history(equipment_id, reading_history_query(equipment_id, limit), limit)
+
+def add_archived_history(equipment_id, live_readings, limit=10) -> List[Dict]:
+    """History entries for the newest live readings topped up from the archive"""
+    history = [{
+        'date': r.reading_date,
+        'availability': r.availability,
+        'mtbf': r.mtbf,
+        'failures': r.failures
+    } for r in live_readings]
+    
+    archived = reading_archive.newest(equipment_id, limit)
+    availability = archived['availability'].tolist()
+    history += [{
+        'date': date,
+        'availability': None if np.isnan(availability[i]) else availability[i],
+        'mtbf': archived['mtbf'][i].item(),
+        'failures': archived['failures'][i].item()
+    } for i, date in enumerate(archived['reading_date'].astype(datetime))]
+    
+    history.sort(key=lambda reading: reading['date'], reverse=True)
+    return history[:limit]
+
+def archivable_readings_query(equipment_id, cutoff, latest_reading_id=None):
+    """Readings of one equipment older than cutoff, except its latest one
+
+    The latest reading always stays in the live table because
+    Equipment.latest_reading_id and the fleet statistics point at it.
+    """
+    query = db.select(
+        PerformanceReading.id, PerformanceReading.reading_date, PerformanceReading.total_hours,
+        PerformanceReading.uptime_hours, PerformanceReading.failures, PerformanceReading.availability,
+        PerformanceReading.mtbf, PerformanceReading.mttr, PerformanceReading.status, PerformanceReading.notes
+    ).where(
+        PerformanceReading.equipment_id == equipment_id,
+        PerformanceReading.reading_date < cutoff
+    )
+    if latest_reading_id is not None:
+        query = query.where(PerformanceReading.id != latest_reading_id)
+    return query.order_by(PerformanceReading.reading_date)
+
+def archive_readings(cutoff: datetime) -> int:
+    """Move readings older than cutoff into the archive, one equipment at a time
+
+    Files are written before the rows are deleted, and the archive ignores
+    readings it already has, so an interrupted run can simply be repeated.
+    """
+    table = PerformanceReading.__table__
+    moved = 0
+    
+    for equipment_id, latest_reading_id in db.session.query(Equipment.id, Equipment.latest_reading_id).all():
+        rows = db.session.execute(archivable_readings_query(equipment_id, cutoff, latest_reading_id)).all()
+        if not rows:
+            continue
+        
+        ids, dates, total_hours, uptime_hours, failures, availability, mtbf, mttr, status, notes = zip(*rows)
+        reading_archive.write(equipment_id, {
+            'id': ids,
+            'reading_date': dates,
+            'total_hours': total_hours,
+            'uptime_hours': uptime_hours,
+            'failures': failures,
+            'availability': availability,
+            'mtbf': mtbf,
+            'mttr': mttr,
+            'status': encode_status(status)
+        }, dict(zip(ids, notes)))
+        
+        # Stay under SQLite's limit on bound parameters
+        for i in range(0, len(ids), 500):
+            db.session.execute(table.delete().where(table.c.id.in_(ids[i:i + 500])))
+        bump_fleet_version(db.session.connection())
+        db.session.commit()
+        moved += len(ids)
+    
+    return moved
+
+def fleet_version():
+    """A counter that goes up with every commit that changes fleet data
+
+    Kept in FleetStatistics and bumped in the same transaction as the
+    change, so it is shared by all workers and can't miss two commits close
+    together (file modification times can). One primary key lookup. In a
+    read-only route this is the version of the data reads come from.
+    Returns None before the statistics row exists.
+    """
+    return db.session.query(FleetStatistics.version).filter(FleetStatistics.id == 1).scalar()
+
+def not_modified(etag):
+    """Empty 304 response for a client that already has this version"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def load_fleet_snapshot():
+    """Load every equipment with its latest reading in a single query
+
+    Returns a list of (equipment, latest_reading) pairs. latest_reading is
+    None for equipment that has no readings yet. Uses the maintained
+    latest_reading_id, so the cost does not grow with reading history.
+    """
+    return fleet_snapshot_query().all()
+
+def publish_fleet_change(event_type: str, equipment_ids=(), deleted_ids=()):
+    """Tell open dashboards what changed (call after the commit)
+
+    Sends the new state of the changed equipment plus fleet statistics,
+    computed once no matter how many dashboards are listening.
+    """
+    if fleet_events.subscriber_count == 0:
+        return
+    
+    changed = fleet_snapshot_query().filter(Equipment.id.in_(list(equipment_ids))).all()
+    
+    fleet_events.publish(event_type, {
+        'equipment': [eq.to_dict(reading, fetch_latest=False) for eq, reading in changed],
+        'deleted': list(deleted_ids),
+        'statistics': load_fleet_statistics()
+    })
+
+def load_fleet_statistics() -> Dict:
+    """Statistics block from the running totals (one primary key lookup)"""
+    row = db.session.get(FleetStatistics, 1)
+    if row is None:
+        # Totals not built yet, fall back to a full recompute
+        return recompute_fleet_statistics().statistics()
+    return row.to_aggregate().statistics()
+
+def recompute_fleet_statistics() -> FleetAggregate:
+    """FleetAggregate built from scratch over the whole fleet"""
+    return aggregate_snapshot(load_fleet_snapshot())
+
+def aggregate_snapshot(snapshot) -> FleetAggregate:
+    """FleetAggregate of (equipment, latest_reading) pairs"""
+    aggregate = FleetAggregate()
+    for _, reading in snapshot:
+        aggregate.add_equipment()
+        if reading is not None:
+            aggregate.add_reading(reading.availability, reading.mtbf, reading.failures, reading.status)
+    return aggregate
+
+def rebuild_fleet_statistics():
+    """Replace the running totals with a full recompute; the caller commits"""
+    aggregate = recompute_fleet_statistics()
+    row = db.session.get(FleetStatistics, 1) or FleetStatistics(id=1)
+    for field, value in aggregate.as_dict().items():
+        setattr(row, field, value)
+    db.session.add(row)
+
+def check_fleet_statistics() -> Dict:
+    """Fields where the running totals differ from a full recompute"""
+    row = db.session.get(FleetStatistics, 1)
+    stored = row.to_aggregate().as_dict() if row else None
+    expected = recompute_fleet_statistics().as_dict()
+    
+    if stored is None:
+        return {'missing': True}
+    
+    # Sums of floats drift a little after many updates
+    return {
+        field: {'stored': stored[field], 'expected': value}
+        for field, value in expected.items()
+        if abs(stored[field] - value) > 1e-6 * max(1.0, abs(value))
+    }
+
+# Reliability models (Weibull and Crow-AMSAA), see week01 reliability_models
+_reliability_lock = threading.Lock()
+_reliability_cache = {'version': None, 'models': None}
+
+def load_reliability_inputs():
+    """Every reading (live and archived) as columns sorted by equipment and date
+
+    Returns (equipment_ids, equipment_types, system, uptime_hours, failures)
+    where system is each reading's position in equipment_ids.
+    """
+    equipment = db.session.query(Equipment.id, Equipment.equipment_type).order_by(Equipment.id).all()
+    equipment_ids = np.array([eq_id for eq_id, _ in equipment], dtype=np.int64)
+    equipment_types = [eq_type or 'Unknown' for _, eq_type in equipment]
+    
+    rows = db.session.connection().exec_driver_sql(
+        f'SELECT equipment_id, reading_date, uptime_hours, failures FROM {PerformanceReading.__tablename__}'
+    ).fetchall()
+    live_ids, live_dates, live_uptime, live_failures = zip(*rows) if rows else ((), (), (), ())
+    
+    ids = [np.array(live_ids, dtype=np.int64)]
+    dates = [np.array(live_dates, dtype='datetime64[us]')]
+    uptime = [np.array(live_uptime, dtype=np.float64)]
+    failures = [np.array(live_failures, dtype=np.int64)]
+    
+    for eq_id in equipment_ids.tolist():
+        archived = reading_archive.read(eq_id, columns=('uptime_hours', 'failures'))
+        if len(archived['failures']):
+            ids.append(np.full(len(archived['failures']), eq_id, dtype=np.int64))
+            dates.append(archived['reading_date'])
+            uptime.append(archived['uptime_hours'])
+            failures.append(archived['failures'].astype(np.int64))
+    
+    ids, dates = np.concatenate(ids), np.concatenate(dates)
+    order = np.lexsort((dates, ids))
+    
+    return (equipment_ids, equipment_types, np.searchsorted(equipment_ids, ids[order]),
+            np.concatenate(uptime)[order], np.concatenate(failures)[order])
+
+def describe_reliability_model(fits: Dict, i: int) -> Dict:
+    """JSON-friendly view of group i of fit_reliability_models output"""
+    def value(array, digits=4):
+        number = float(array[i])
+        return None if np.isnan(number) else round(number, digits)
+    
+    weibull, crow_amsaa = fits['weibull'], fits['crow_amsaa']
+    shape, beta = value(weibull['shape']), value(crow_amsaa['beta'])
+    
+    return {
+        'weibull': {
+            'shape': shape,
+            'scale': value(weibull['scale'], 2),
+            'failures': int(weibull['failures'][i]),
+            'censored': int(weibull['censored'][i]),
+            'pattern': None if shape is None else
+                       'early-life' if shape < 0.95 else 'wear-out' if shape > 1.05 else 'random'
+        },
+        'crow_amsaa': {
+            'beta': beta,
+            'lambda': value(crow_amsaa['lambda'], 8),
+            'failures': int(crow_amsaa['failures'][i]),
+            'operating_hours': round(float(crow_amsaa['operating_hours'][i]), 2),
+            'current_mtbf': value(crow_amsaa['current_mtbf'], 2),
+            'trend': None if beta is None else
+                     'improving' if beta < 0.95 else 'deteriorating' if beta > 1.05 else 'stable'
+        }
+    }
+
+def fit_fleet_reliability_models() -> Dict:
+    """Fit every equipment and every equipment type in two batched calls"""
+    equipment_ids, equipment_types, system, uptime, failures = load_reliability_inputs()
+    type_names, type_of_equipment = np.unique(np.array(equipment_types, dtype=object).astype(str),
+                                              return_inverse=True)
+    
+    per_equipment = fit_reliability_models(system, uptime, failures, np.arange(len(equipment_ids)))
+    per_type = fit_reliability_models(system, uptime, failures, type_of_equipment)
+    
+    return {
+        'equipment': {
+            eq_id: {'type': equipment_types[i], **describe_reliability_model(per_equipment, i)}
+            for i, eq_id in enumerate(equipment_ids.tolist())
+        },
+        'equipment_types': {
+            name: {'equipment_count': int(np.sum(type_of_equipment == i)), **describe_reliability_model(per_type, i)}
+            for i, name in enumerate(type_names.tolist())
+        }
+    }
+
+def load_reliability_models() -> Dict:
+    """Cached fleet fits, recomputed when the fleet version changes"""
+    version = fleet_version()
+    with _reliability_lock:
+        if version is not None and _reliability_cache['version'] == version:
+            return _reliability_cache['models']
+        
+        models = fit_fleet_reliability_models()
+        _reliability_cache.update(version=version, models=models)
+        return models
+
+# Bulk reading ingestion
+def iter_bulk_rows() -> Iterator[Dict]:
+    """Yield reading dictionaries from the request body
+
+    Accepts a JSON array, NDJSON (one object per line) or CSV with a header
+    row. NDJSON and CSV are read line by line from the request stream.
+    """
+    content_type = request.mimetype
+    
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        for line in io.TextIOWrapper(request.stream, encoding='utf-8'):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Reported as a per-row error by parse_reading_row
+                yield line
+    elif content_type == 'text/csv':
+        yield from csv.DictReader(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('readings')
+        if not isinstance(data, list):
+            raise ValueError('Expected a JSON array of readings')
+        yield from data
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO 8601 date or date-time, as a naive UTC datetime like the table stores"""
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def parse_reading_row(row: Dict, equipment_ids: Dict[str, int], known_ids: set) -> Dict:
+    """Validate one bulk row and convert it to column values
+
+    Raises ValueError with a message for the per-row error list.
+    """
+    if not isinstance(row, dict):
+        raise ValueError('Reading must be a JSON object')
+    
+    for field in ['total_hours', 'uptime_hours', 'failures']:
+        if row.get(field) in (None, ''):
+            raise ValueError(f'Missing required field: {field}')
+    
+    if row.get('equipment_id') not in (None, ''):
+        equipment_id = int(row['equipment_id'])
+        if equipment_id not in known_ids:
+            raise ValueError(f'Unknown equipment id: {equipment_id}')
+    elif row.get('equipment_name'):
+        equipment_id = equipment_ids.get(str(row['equipment_name']).strip())
+        if equipment_id is None:
+            raise ValueError(f"Unknown equipment: {row['equipment_name']}")
+    else:
+        raise ValueError('Missing required field: equipment_id or equipment_name')
+    
+    total_hours = float(row['total_hours'])
+    uptime_hours = float(row['uptime_hours'])
+    failures = int(row['failures'])
+    
+    if uptime_hours > total_hours:
+        raise ValueError('Uptime cannot exceed total hours')
+    if failures < 0:
+        raise ValueError('Failures cannot be negative')
+    
+    reading_date = parse_timestamp(row['reading_date']) if row.get('reading_date') else datetime.utcnow()
+    
+    return {
+        'equipment_id': equipment_id,
+        'reading_date': reading_date,
+        'total_hours': total_hours,
+        'uptime_hours': uptime_hours,
+        'failures': failures,
+        'notes': row.get('notes') or ''
+    }
+
+def insert_readings(readings: List[Dict]):
+    """Calculate metrics for a chunk at once and insert it with executemany
+
+    Runs in the current transaction; the caller commits.
+    """
+    metrics = calculate_fleet_metrics(
+        [r['total_hours'] for r in readings],
+        [r['uptime_hours'] for r in readings],
+        [r['failures'] for r in readings],
+        no_failure_mtbf=NO_FAILURE_MTBF
+    )
+    
+    rows = zip(
+        [r['equipment_id'] for r in readings],
+        # Same text format SQLAlchemy uses for DateTime columns on SQLite
+        [r['reading_date'].isoformat(' ', 'microseconds') for r in readings],
+        [r['total_hours'] for r in readings],
+        [r['uptime_hours'] for r in readings],
+        [r['failures'] for r in readings],
+        metrics['availability'].tolist(),
+        metrics['mtbf'].tolist(),
+        metrics['mttr'].tolist(),
+        metrics['status'].tolist(),
+        [r['notes'] for r in readings]
+    )
+    
+    # Plain DB-API executemany: the per-row parameter processing of an ORM
+    # or Core insert costs more than SQLite's own work at this volume
+    columns = ['equipment_id', 'reading_date', 'total_hours', 'uptime_hours', 'failures',
+               'availability', 'mtbf', 'mttr', 'status', 'notes']
+    insert_sql = f"INSERT INTO performance_reading ({', '.join(columns)}) " \
+                 f"VALUES ({', '.join('?' * len(columns))})"
+    db.session.connection().exec_driver_sql(insert_sql, list(rows))
+    
+    # The raw insert skips the ORM after_insert hook, so refresh the
+    # latest reading pointers for this chunk in one statement instead,
+    # and move the statistics from the old latest readings to the new ones
+    touched = {r['equipment_id'] for r in readings}
+    connection = db.session.connection()
+    before = latest_readings_for(connection, touched)
+    rebuild_latest_readings(touched)
+    after = latest_readings_for(connection, touched)
+    
+    update_fleet_statistics(
+        connection,
+        *[reading_delta(r, sign=-1) for r in before],
+        *[reading_delta(r) for r in after]
+    )
+
+def ingest_readings(rows: Iterator[Dict], chunk_size: int) -> Dict:
+    """Validate and insert readings in chunked transactions"""
+    equipment_ids = dict(db.session.query(Equipment.name, Equipment.id).all())
+    known_ids = set(equipment_ids.values())
+    
+    inserted = 0
+    errors = []
+    row_number = 0
+    touched = set()
+    
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        
+        readings = []
+        for row in chunk:
+            row_number += 1
+            try:
+                readings.append(parse_reading_row(row, equipment_ids, known_ids))
+            except (ValueError, TypeError) as e:
+                errors.append({'row': row_number, 'error': str(e)})
+        
+        if readings:
+            try:
+                insert_readings(readings)
+                db.session.commit()
+                inserted += len(readings)
+                touched.update(r['equipment_id'] for r in readings)
+            except Exception as e:
+                db.session.rollback()
+                first_row = row_number - len(chunk) + 1
+                errors.append({'rows': [first_row, row_number], 'error': str(e)})
+    
+    if touched:
+        publish_fleet_change('updated', touched)
+    
+    return {'inserted': inserted, 'failed': row_number - inserted, 'errors': errors}
+
 def init_database():
     """Create tables and add sample data if empty"""
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)  # primary only, the read bind is read-only
+        ensure_indexes()
+        
+        if ensure_latest_reading_column():
+            print("Added latest_reading_id column, rebuilding...")
+            rebuild_latest_readings()
+            db.session.commit()
+        
+        if db.session.get(FleetStatistics, 1) is None:
+            rebuild_fleet_statistics()
+            db.session.commit()
         
         if Equipment.query.count() == 0:
             print("Initializing database with sample data...")
@@ -139,6 +908,9 @@ def init_database():
             
             db.session.commit()
             print("Sample data added successfully!")
+        
+        if app.config['READ_REPLICA_PATH']:
+            refresh_replica(db.engine.url.database, app.config['READ_REPLICA_PATH'])
 
 # Routes
 @app.route('/')
@@ -152,50 +924,30 @@ def test():
     return jsonify({"message": "Flask API is working!", "timestamp": datetime.now().isoformat()})
 
 @app.route('/api/equipment')
+@read_only
 def get_equipment():
-    """Get all equipment with latest readings"""
+    """Get all equipment with latest readings
+
+    Answers If-None-Match with 304 after one primary key lookup.
+    """
     try:
-        equipment_list = Equipment.query.all()
-        equipment_data = [eq.to_dict() for eq in equipment_list]
+        version = fleet_version()
+        etag = f'fleet-{version}' if version is not None else None
+        if etag and etag in request.if_none_match:
+            return not_modified(etag)
         
-        total_equipment = len(equipment_data)
+        snapshot = load_fleet_snapshot()
+        equipment_data = [eq.to_dict(reading, fetch_latest=False) for eq, reading in snapshot]
         
-        if total_equipment > 0:
-            subquery = db.session.query(
-                PerformanceReading.equipment_id,
-                func.max(PerformanceReading.reading_date).label('max_date')
-            ).group_by(PerformanceReading.equipment_id).subquery()
-
-            latest_readings = db.session.query(PerformanceReading).join(
-                subquery,
-                (PerformanceReading.equipment_id == subquery.c.equipment_id) &
-                (PerformanceReading.reading_date == subquery.c.max_date)
-            ).all()
-            
-            if latest_readings:
-                valid_readings = [r for r in latest_readings if r.availability is not None]
-                avg_availability = sum(r.availability for r in valid_readings) / len(valid_readings) if valid_readings else 0
-                critical_count = sum(1 for r in latest_readings if r.status == 'POOR')
-                readings_with_failures = [r for r in latest_readings if r.failures > 0 and r.mtbf < 999999]
-                avg_mtbf = sum(r.mtbf for r in readings_with_failures) / len(readings_with_failures) if readings_with_failures else 0
-            else:
-                avg_availability = 0
-                critical_count = 0
-                avg_mtbf = 0
-        else:
-            avg_availability = 0
-            critical_count = 0
-            avg_mtbf = 0
-        
-        return jsonify({
+        response = jsonify({
             'equipment': equipment_data,
-            'statistics': {
-                'fleet_availability': round(avg_availability, 2),
-                'total_equipment': total_equipment,
-                'critical_alerts': critical_count,
-                'avg_mtbf': round(avg_mtbf, 2)
-            }
+            'statistics': load_fleet_statistics()
         })
+        if etag:
+            response.set_etag(etag)
+            # Let browsers keep the body but always revalidate with the ETag
+            response.cache_control.no_cache = True
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -239,6 +991,8 @@ def add_equipment():
         db.session.add(reading)
         db.session.commit()
         
+        publish_fleet_change('added', [new_equipment.id])
+        
         return jsonify({
             'success': True,
             'message': f'Equipment {new_equipment.name} added successfully',
@@ -249,32 +1003,137 @@ def add_equipment():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/equipment/stream')
+def stream_equipment_changes():
+    """Server-Sent Events feed of equipment changes
+
+    Events: 'added', 'updated', 'deleted' (each with the changed equipment
+    and fresh statistics) and 'reset' (reload everything). Browsers resume
+    with the Last-Event-ID header after a reconnect.
+    Try it with: curl -N http://localhost:5000/api/equipment/stream
+    """
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    
+    return Response(
+        fleet_events.stream(last_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # don't let nginx buffer the stream
+        }
+    )
+
+@app.route('/api/readings/bulk', methods=['POST'])
+def add_readings_bulk():
+    """Add many performance readings at once (JSON array, NDJSON or CSV)"""
+    try:
+        result = ingest_readings(iter_bulk_rows(), app.config['BULK_CHUNK_SIZE'])
+    except ValueError as e:
+        # Body could not be parsed at all (bad JSON, wrong shape)
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': result['failed'] == 0,
+        'message': f"{result['inserted']} readings added, {result['failed']} rejected",
+        **result
+    })
+
 @app.route('/api/equipment/<int:equipment_id>')
+@read_only
 def get_equipment_details(equipment_id):
     """Get equipment details with performance history"""
     equipment = Equipment.query.get_or_404(equipment_id)
     
-    readings = PerformanceReading.query.filter_by(equipment_id=equipment_id)\
-              .order_by(PerformanceReading.reading_date.desc()).limit(10).all()
+    readings = load_recent_history(equipment_id)
     
-    if len(readings) >= 2:
-        availability_trend = readings[0].availability - readings[-1].availability
+    if len(readings) >= 2 and readings[0]['availability'] is not None and readings[-1]['availability'] is not None:
+        availability_trend = readings[0]['availability'] - readings[-1]['availability']
         trend = 'improving' if availability_trend > 0 else 'declining' if availability_trend < 0 else 'stable'
     else:
         trend = 'insufficient data'
     
     return jsonify({
         'equipment': equipment.to_dict(),
-        'history': [{
-            'date': r.reading_date.strftime('%Y-%m-%d'),
-            'availability': r.availability,
-            'mtbf': r.mtbf,
-            'failures': r.failures
-        } for r in readings],
+        'history': [{**r, 'date': r['date'].strftime('%Y-%m-%d')} for r in readings],
         'trend': trend,
         'total_readings': len(readings)
     })
 
+@app.route('/api/equipment/<int:equipment_id>/history')
+@read_only
+def get_equipment_history(equipment_id):
+    """Reading history in time buckets, downsampled for charting
+
+    Query parameters:
+      from, to     ISO dates or date-times (from inclusive, to exclusive)
+      bucket       1h, 1d (default) or 1w
+      max_points   most points to return; extra buckets are thinned with LTTB
+    """
+    equipment = Equipment.query.get_or_404(equipment_id)
+    
+    bucket = request.args.get('bucket', '1d')
+    if bucket not in BUCKET_EXPRESSIONS:
+        return jsonify({'error': f"bucket must be one of: {', '.join(BUCKET_EXPRESSIONS)}"}), 400
+    
+    try:
+        start = parse_timestamp(request.args['from']) if request.args.get('from') else None
+        end = parse_timestamp(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'from and to must be ISO 8601 dates'}), 400
+    
+    max_points = request.args.get('max_points', app.config['HISTORY_MAX_POINTS'], type=int)
+    max_points = min(max(max_points, 3), app.config['HISTORY_POINTS_LIMIT'])
+    
+    buckets = load_reading_buckets(equipment_id, bucket, start, end)
+    chart = downsample_buckets(buckets, max_points)
+    
+    return jsonify({
+        'equipment': {'id': equipment.id, 'name': equipment.name},
+        'bucket': bucket,
+        'from': start.isoformat() if start else None,
+        'to': end.isoformat() if end else None,
+        'bucket_count': len(buckets),
+        'downsampled': len(chart) < len(buckets),
+        'points': [bucket_point(b) for b in chart]
+    })
+
+@app.route('/api/equipment/<int:equipment_id>/reliability-model')
+@read_only
+def get_reliability_model(equipment_id):
+    """Weibull and Crow-AMSAA fits for one equipment and for its type
+
+    Uses the whole reading history, including archived readings. Parameters
+    are null when there are too few failures to fit.
+    """
+    equipment = Equipment.query.get_or_404(equipment_id)
+    models = load_reliability_models()
+    model = models['equipment'][equipment.id]
+    
+    return jsonify({
+        'equipment': {'id': equipment.id, 'name': equipment.name, 'type': model['type']},
+        'weibull': model['weibull'],
+        'crow_amsaa': model['crow_amsaa'],
+        'equipment_type': {'type': model['type'], **models['equipment_types'][model['type']]}
+    })
+
+@app.route('/api/reliability-models')
+@read_only
+def get_reliability_models():
+    """Reliability model fits for the whole fleet and for every equipment type"""
+    models = load_reliability_models()
+    names = dict(db.session.query(Equipment.id, Equipment.name))
+    
+    return jsonify({
+        'equipment': [
+            {'id': eq_id, 'name': names.get(eq_id), **model}
+            for eq_id, model in models['equipment'].items()
+        ],
+        'equipment_types': [
+            {'type': name, **model} for name, model in models['equipment_types'].items()
+        ]
+    })
+
 @app.route('/api/equipment/<int:equipment_id>', methods=['DELETE'])
 def delete_equipment(equipment_id):
     """Delete equipment and all its readings"""
@@ -284,6 +1143,9 @@ def delete_equipment(equipment_id):
         equipment_name = equipment.name
         db.session.delete(equipment)
         db.session.commit()
+        reading_archive.remove(equipment_id)
+        
+        publish_fleet_change('deleted', deleted_ids=[equipment_id])
         
         return jsonify({
             'success': True,
@@ -294,6 +1156,69 @@ def delete_equipment(equipment_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.cli.command('archive-readings')
+@click.option('--days', type=int, default=None, help='Archive readings older than this (default ARCHIVE_HORIZON_DAYS)')
+@click.option('--vacuum', is_flag=True, help='Shrink the database file afterwards')
+def archive_readings_command(days, vacuum):
+    """Move old readings from the database into the columnar archive"""
+    days = days if days is not None else app.config['ARCHIVE_HORIZON_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    
+    moved = archive_readings(cutoff)
+    print(f"Archived {moved} readings older than {cutoff:%Y-%m-%d} to {app.config['ARCHIVE_PATH']}")
+    
+    if vacuum and moved:
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('VACUUM')
+        print("Database file compacted")
+
+@app.cli.command('refresh-replica')
+def refresh_replica_command():
+    """Copy the database into READ_REPLICA_PATH (run it from cron to keep reads fresh)"""
+    replica_path = app.config['READ_REPLICA_PATH']
+    if not replica_path:
+        raise click.ClickException('READ_REPLICA_PATH is not set, read-only routes use the primary file')
+    pages = refresh_replica(db.engine.url.database, replica_path)
+    click.echo(f"Replica {replica_path} refreshed ({pages} pages)")
+
+@app.cli.command('rebuild-latest')
+def rebuild_latest_command():
+    """Recompute every equipment's latest reading pointer"""
+    db.create_all(bind_key=None)  # primary only, the read bind is read-only
+    ensure_indexes()
+    ensure_latest_reading_column()
+    updated = rebuild_latest_readings()
+    db.session.commit()
+    print(f"Rebuilt latest reading for {updated} equipment")
+
+@app.cli.command('check-latest')
+def check_latest_command():
+    """Verify latest reading pointers match the reading history"""
+    mismatched = check_latest_readings()
+    if mismatched:
+        print(f"{len(mismatched)} equipment out of date: {mismatched}")
+        print("Run 'flask --app app_with_db rebuild-latest' to fix")
+        raise SystemExit(1)
+    print("All latest reading pointers are consistent")
+
+@app.cli.command('rebuild-statistics')
+def rebuild_statistics_command():
+    """Recompute the running fleet statistics from scratch"""
+    db.create_all(bind_key=None)  # primary only, the read bind is read-only
+    rebuild_fleet_statistics()
+    db.session.commit()
+    print(f"Rebuilt fleet statistics: {load_fleet_statistics()}")
+
+@app.cli.command('check-statistics')
+def check_statistics_command():
+    """Verify the running fleet statistics match a full recompute"""
+    differences = check_fleet_statistics()
+    if differences:
+        print(f"Fleet statistics out of date: {differences}")
+        print("Run 'flask --app app_with_db rebuild-statistics' to fix")
+        raise SystemExit(1)
+    print("Fleet statistics are consistent")
+
 @app.route('/api/health')
 def health_check():
     """Health check with database status"""
@@ -305,6 +1230,8 @@ def health_check():
             'status': 'healthy',
             'database': 'connected',
             'database_location': db_location,
+            'database_profile': app.config['DATABASE_PROFILE'],
+            'journal_mode': current_pragmas(db.session.connection(), ['journal_mode'])['journal_mode'],
             'equipment_count': equipment_count,
             'timestamp': datetime.now().isoformat()
         })
@@ -320,6 +1247,7 @@ if __name__ == '__main__':
     print("🚀 Flask Reliability Dashboard with SQLite")
     print("=" * 50)
     print(f"Database location: {os.path.join(basedir, 'reliability.db')}")
+    print(f"Database profile: {app.config['DATABASE_PROFILE']} (set DATABASE_PROFILE=production for WAL)")
     print("CORS enabled for React frontend at http://localhost:3000")
     
     init_database()
@@ -329,6 +1257,14 @@ if __name__ == '__main__':
     print("  GET  http://localhost:5000/api/health")
     print("  GET  http://localhost:5000/api/equipment")
     print("  POST http://localhost:5000/api/equipment/add")
+    print("  POST http://localhost:5000/api/readings/bulk")
+    print("  GET  http://localhost:5000/api/equipment/stream (Server-Sent Events, one thread per stream here;")
+    print("       many dashboards: gunicorn -k gevent -w 1 --worker-connections 1000 app_with_db:app)")
+    print("  GET  http://localhost:5000/api/equipment/<id>/history?bucket=1d")
+    print("  GET  http://localhost:5000/api/equipment/<id>/reliability-model")
+    print("  GET  http://localhost:5000/api/reliability-models")
+    print("  flask --app app_with_db archive-readings   (move old readings to ./archive)")
+    print("  flask --app app_with_db refresh-replica    (copy to READ_REPLICA_PATH for read-only routes)")
     print("-" * 50)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
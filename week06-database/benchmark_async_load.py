@@ -0,0 +1,149 @@
+"""
+Load test: sync Flask app vs. async Quart app with many concurrent clients
+Usage: python benchmark_async_load.py [clients] [seconds] [number_of_equipment] [write_percent]
+
+Copies nothing from the real database: both servers run against one scratch
+SQLite file filled with synthetic equipment. Each server is started in its
+own process (threaded Werkzeug for app_with_db, uvicorn for app_async),
+then `clients` concurrent httpx connections loop over a read-heavy mix
+(GET /api/equipment, GET /api/equipment/<id>, GET /api/health, plus
+write_percent % POST /api/equipment/add) for `seconds` seconds.
+
+The load generator shares the machine with the server, so run it on the
+same hardware for both apps and compare the two numbers, not absolutes.
+"""
+
+import asyncio
+from collections import Counter
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Point both apps at a throwaway database before anything is imported
+scratch_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch_dir, 'load.db')}"
+os.environ['ARCHIVE_PATH'] = os.path.join(scratch_dir, 'archive')
+
+from app_with_db import app, db, Equipment, PerformanceReading, init_database
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+SERVERS = {
+    'sync (Flask, threaded)': (5080, [sys.executable, '-m', 'flask', '--app', 'app_with_db', 'run',
+                                      '--port', '5080', '--with-threads', '--no-reload']),
+    'async (Quart, uvicorn)': (5081, [sys.executable, '-m', 'uvicorn', 'app_async:app',
+                                      '--port', '5081', '--log-level', 'warning', '--backlog', '4096']),
+}
+
+
+def seed_database(equipment_count: int):
+    init_database()
+    with app.app_context():
+        rng = random.Random(42)
+        for i in range(equipment_count):
+            equipment = Equipment(name=f'Load-{i}', equipment_type='Pump', location='Plant')
+            db.session.add(equipment)
+            db.session.flush()
+            for day in range(5):
+                reading = PerformanceReading(equipment_id=equipment.id, total_hours=24,
+                                             uptime_hours=round(rng.uniform(18, 24), 1),
+                                             failures=rng.randint(0, 3))
+                reading.calculate_metrics()
+                db.session.add(reading)
+        db.session.commit()
+        return [eq_id for (eq_id,) in db.session.query(Equipment.id)]
+
+
+def start_server(command, port: int):
+    server = subprocess.Popen(command, cwd=basedir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/api/health', timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"server on port {port} did not start: {server.stderr.read().decode()[-500:]}")
+
+
+async def client_loop(client, base_url, equipment_ids, write_percent, stop_at, rng, latencies, errors, name_prefix):
+    sequence = 0
+    while time.perf_counter() < stop_at:
+        roll = rng.random() * 100
+        started = time.perf_counter()
+        try:
+            if roll < write_percent:
+                sequence += 1
+                response = await client.post(f'{base_url}/api/equipment/add', json={
+                    'name': f'{name_prefix}-{sequence}', 'total_hours': 24, 'uptime_hours': 20, 'failures': 1
+                })
+            elif roll < 60:
+                response = await client.get(f'{base_url}/api/equipment/{rng.choice(equipment_ids)}')
+            elif roll < 90:
+                response = await client.get(f'{base_url}/api/equipment')
+            else:
+                response = await client.get(f'{base_url}/api/health')
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+            else:
+                latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def run_load(port: int, clients: int, seconds: float, equipment_ids, write_percent: float, label: str):
+    base_url = f'http://127.0.0.1:{port}'
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        stop_at = time.perf_counter() + seconds
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, base_url, equipment_ids, write_percent, stop_at,
+                        random.Random(i), latencies, errors, f'{label}-{i}')
+            for i in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    equipment_count = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    write_percent = float(sys.argv[4]) if len(sys.argv) > 4 else 1
+
+    equipment_ids = seed_database(equipment_count)
+    print(f"{clients} concurrent clients, {seconds:.0f}s per server, {len(equipment_ids)} equipment, "
+          f"{write_percent:g}% writes")
+
+    for label, (port, command) in SERVERS.items():
+        server = start_server(command, port)
+        try:
+            latencies, errors, elapsed = asyncio.run(
+                run_load(port, clients, seconds, equipment_ids, write_percent, label.split()[0]))
+        finally:
+            server.terminate()
+            server.wait()
+
+        print(f"{label:24s} {len(latencies) / elapsed:8.0f} req/s   "
+              f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms   "
+              f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms   "
+              f"errors {len(errors)}")
+        if errors:
+            print(f"{'':24s} {dict(Counter(errors).most_common(3))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: POST /api/readings/bulk throughput into a scratch SQLite file
+Usage: python benchmark_bulk_ingest.py [number_of_readings] [number_of_equipment]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before it is imported
+scratch_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch_dir, 'bench.db')}"
+os.environ['ARCHIVE_PATH'] = os.path.join(scratch_dir, 'archive')
+
+from app_with_db import app, db, Equipment, init_database, check_latest_readings
+
+
+def make_csv(readings: int, equipment_names, seed: int = 42) -> bytes:
+    """Synthetic historian export: one shift reading per line"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    lines = ['equipment_name,reading_date,total_hours,uptime_hours,failures']
+    for i in range(readings):
+        uptime = round(rng.uniform(6.0, 8.0), 2)
+        date = start + timedelta(minutes=i)
+        lines.append(f"{rng.choice(equipment_names)},{date.isoformat()},8,{uptime},{rng.randint(0, 2)}")
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def main():
+    readings = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    equipment_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    init_database()
+    with app.app_context():
+        db.session.add_all(Equipment(name=f'Asset-{i}') for i in range(equipment_count))
+        db.session.commit()
+        names = [name for (name,) in db.session.query(Equipment.name)]
+
+    body = make_csv(readings, names)
+    client = app.test_client()
+
+    start = time.perf_counter()
+    response = client.post('/api/readings/bulk', data=body, content_type='text/csv')
+    elapsed = time.perf_counter() - start
+
+    result = response.get_json()
+    print(f"Readings:    {readings:,} across {len(names):,} equipment")
+    print(f"Inserted:    {result['inserted']:,} (rejected {result['failed']})")
+    print(f"Time:        {elapsed:.2f} s")
+    print(f"Throughput:  {result['inserted'] / elapsed:,.0f} readings/s")
+
+    with app.app_context():
+        mismatched = check_latest_readings()
+    print(f"Latest pointers consistent: {not mismatched}")
+
+
+if __name__ == '__main__':
+    main()
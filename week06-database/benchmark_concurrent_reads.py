@@ -0,0 +1,107 @@
+"""
+Benchmark: read latency while a bulk import is writing, per database profile
+Usage: python benchmark_concurrent_reads.py [number_of_readings] [reader_threads] [profile]
+
+Without a profile argument both 'development' (rollback journal) and
+'production' (WAL, see sqlite_profiles.py) are measured, each in a fresh
+process because the profile is picked when app_with_db is imported.
+
+A separate writer process posts a large CSV to /api/readings/bulk while
+reader threads keep calling GET /api/equipment and GET /api/equipment/<id>.
+With a rollback journal every commit locks readers out; with WAL they keep
+reading the last committed data, so the slowest reads should drop.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Point the app at a throwaway database before it is imported
+scratch_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch_dir, 'concurrent.db')}"
+os.environ['ARCHIVE_PATH'] = os.path.join(scratch_dir, 'archive')
+
+PROFILES = ('development', 'production')
+EQUIPMENT_COUNT = 500
+
+
+def run_writer(body: bytes):
+    from app_with_db import app
+    app.test_client().post('/api/readings/bulk', data=body, content_type='text/csv')
+
+
+def run_readers(app, equipment_ids, threads: int, writer):
+    """Read until the writer finishes; returns (latencies, errors)"""
+    latencies, errors = [], []
+
+    def reader(offset):
+        client = app.test_client()
+        i = offset
+        while writer.is_alive():
+            i += 1
+            url = '/api/equipment' if i % 4 == 0 else f'/api/equipment/{equipment_ids[i % len(equipment_ids)]}'
+            started = time.perf_counter()
+            response = client.get(url)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(response.status_code)
+
+    workers = [threading.Thread(target=reader, args=(n * 7,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, errors
+
+
+def measure(profile: str, readings: int, threads: int):
+    from app_with_db import app, db, Equipment, init_database
+    from benchmark_bulk_ingest import make_csv
+
+    init_database()
+    with app.app_context():
+        db.session.add_all(Equipment(name=f'Asset-{i}') for i in range(EQUIPMENT_COUNT))
+        db.session.commit()
+        equipment = db.session.query(Equipment.id, Equipment.name).all()
+        db.engine.dispose()  # don't carry open connections into the writer process
+
+    body = make_csv(readings, [name for _, name in equipment])
+
+    writer = multiprocessing.get_context('fork').Process(target=run_writer, args=(body,))
+    started = time.perf_counter()
+    writer.start()
+    latencies, errors = run_readers(app, [eq_id for eq_id, _ in equipment], threads, writer)
+    writer.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000 if latencies else float('nan')
+
+    print(f"{profile:12s} import {elapsed:6.2f} s   reads {len(latencies):6,}   "
+          f"p50 {percentile(0.5):7.1f} ms   p99 {percentile(0.99):7.1f} ms   "
+          f"max {percentile(1.0):7.1f} ms   failed {len(errors)}")
+
+
+def main():
+    readings = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    if len(sys.argv) > 3:
+        measure(sys.argv[3], readings, threads)
+        return
+
+    print(f"Bulk import of {readings:,} readings with {threads} reader threads")
+    for profile in PROFILES:
+        subprocess.run([sys.executable, __file__, str(readings), str(threads), profile],
+                       env={**os.environ, 'DATABASE_PROFILE': profile}, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Randomized check: running fleet statistics vs. a full recompute
+Usage: python check_fleet_statistics.py [number_of_steps] [seed]   (exit code 1 on a mismatch)
+
+Drives the real routes against a scratch SQLite file with a random mix of
+equipment adds, single readings (some older than the latest one), bulk
+uploads and deletes. After every step the stored FleetStatistics row must
+match FleetAggregate rebuilt from the whole fleet.
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before it is imported
+scratch_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch_dir, 'check.db')}"
+os.environ['ARCHIVE_PATH'] = os.path.join(scratch_dir, 'archive')
+
+from app_with_db import app, db, Equipment, PerformanceReading, init_database, \
+    check_fleet_statistics, check_latest_readings
+
+
+def random_hours(rng: random.Random):
+    total = rng.choice([0, 8, 24, 720])
+    uptime = round(rng.uniform(0, total), 1)
+    return total, uptime, rng.choice([0, 0, 1, 2, 5])
+
+
+def add_equipment(client, rng, step):
+    total, uptime, failures = random_hours(rng)
+    client.post('/api/equipment/add', json={
+        'name': f'Asset-{step}', 'total_hours': total, 'uptime_hours': uptime, 'failures': failures
+    })
+
+
+def add_reading(client, rng, step):
+    """One ORM reading, sometimes dated before the equipment's latest one"""
+    ids = [eq_id for (eq_id,) in db.session.query(Equipment.id)]
+    if not ids:
+        return
+    total, uptime, failures = random_hours(rng)
+    reading = PerformanceReading(
+        equipment_id=rng.choice(ids),
+        reading_date=datetime.utcnow() + timedelta(hours=rng.randint(-48, 48)),
+        total_hours=total, uptime_hours=uptime, failures=failures
+    )
+    reading.calculate_metrics()
+    db.session.add(reading)
+    db.session.commit()
+
+
+def bulk_upload(client, rng, step):
+    names = [name for (name,) in db.session.query(Equipment.name)]
+    if not names:
+        return
+    rows = []
+    for _ in range(rng.randint(1, 20)):
+        total, uptime, failures = random_hours(rng)
+        date = datetime.utcnow() + timedelta(hours=rng.randint(-48, 48))
+        rows.append({'equipment_name': rng.choice(names), 'reading_date': date.isoformat(),
+                     'total_hours': total, 'uptime_hours': uptime, 'failures': failures})
+    client.post('/api/readings/bulk', json=rows)
+
+
+def delete_equipment(client, rng, step):
+    ids = [eq_id for (eq_id,) in db.session.query(Equipment.id)]
+    if ids:
+        client.delete(f'/api/equipment/{rng.choice(ids)}')
+
+
+ACTIONS = [(add_equipment, 3), (add_reading, 4), (bulk_upload, 2), (delete_equipment, 1)]
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+    rng = random.Random(seed)
+
+    init_database()
+    client = app.test_client()
+    actions, weights = zip(*ACTIONS)
+
+    with app.app_context():
+        for step in range(steps):
+            action = rng.choices(actions, weights)[0]
+            action(client, rng, step)
+            db.session.expire_all()
+
+            differences = check_fleet_statistics()
+            if differences or check_latest_readings():
+                print(f"Step {step} ({action.__name__}): statistics out of date: {differences}")
+                sys.exit(1)
+
+        count = Equipment.query.count()
+
+    print(f"{steps} random steps (seed {seed}), {count} equipment left: statistics match a full recompute")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Query Plan Check for the reliability database
+Goal: Fail loudly if a hot query stops using its index
+Usage: python check_query_plans.py   (exit code 1 when a query regressed)
+
+Covers the fleet list, history, bulk upload and maintenance queries of
+app_with_db; how a plan is judged is explained in query_plans.py.
+"""
+
+import sys
+from typing import Dict, Tuple
+
+from sqlalchemy import create_engine
+
+from datetime import datetime
+
+from app_with_db import app, db, Equipment, PerformanceReading, \
+    fleet_snapshot_query, reading_history_query, reading_buckets_query, latest_reading_ids, \
+    refresh_latest_readings_statement, archivable_readings_query
+from query_plans import explain, find_problems
+
+TABLES = {Equipment.__tablename__, PerformanceReading.__tablename__}
+
+
+def hot_queries() -> Dict[str, Tuple[object, set, bool]]:
+    """name -> (query, tables that may be fully scanned, may sort)"""
+    return {
+        'GET /api/equipment fleet snapshot': (fleet_snapshot_query(), {'equipment'}, False),
+        'GET /api/equipment/<id> history (limit 10)': (reading_history_query(1), set(), False),
+        # Grouping by a computed bucket needs one sort over the matching rows
+        'GET /api/equipment/<id>/history buckets': (
+            reading_buckets_query(1, '1d', datetime(2024, 1, 1), datetime(2025, 1, 1)), set(), True),
+        'Equipment.latest_reading lookup': (PerformanceReading.query.filter_by(id=1), set(), False),
+        'Equipment.readings (delete cascade)': (PerformanceReading.query.filter_by(equipment_id=1), set(), False),
+        'POST /api/readings/bulk latest refresh': (refresh_latest_readings_statement([1, 2]), set(), False),
+        # Maintenance queries, they walk the whole table but must do it via the index
+        'rebuild-latest': (refresh_latest_readings_statement(), {'equipment'}, False),
+        'check-latest': (db.session.query(latest_reading_ids()), set(), False),
+        'archive-readings (per equipment)': (archivable_readings_query(1, datetime(2024, 1, 1), 1), set(), False),
+    }
+
+
+def main():
+    # Empty in-memory copy of the schema: plans only depend on the indexes
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+
+    failed = False
+    with app.app_context():
+        for name, (query, allowed_scans, may_sort) in hot_queries().items():
+            plan = explain(engine, query)
+            problems = find_problems(plan, TABLES, allowed_scans, may_sort)
+            print(f"{'FAIL' if problems else 'OK  '}  {name}")
+            for line in plan:
+                print(f"        {line}")
+            failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
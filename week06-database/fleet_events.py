@@ -0,0 +1,102 @@
+"""
+Fleet change events for Server-Sent Events (SSE)
+Goal: Push equipment changes to every open dashboard instead of polling
+New concepts: publish/subscribe, ring buffers, threading.Condition, SSE format
+
+The broker keeps the most recent events in one shared ring buffer. Publishing
+appends once and wakes the waiting streams; it does no per-client work, so
+the cost of a change does not grow with the number of dashboards. Each
+stream just remembers the id of the last event it sent.
+
+Events live in this process only, so run the app as a single process.
+Each open stream holds its worker for as long as it is open: the dev
+server (python app_with_db.py) gives every stream its own thread, fine for
+a few dashboards. For many, use one gunicorn worker with gevent, where a
+stream is a greenlet rather than a thread:
+
+    gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:5000 app_with_db:app
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class EventBroker:
+    """In-process pub/sub with a replay buffer for Last-Event-ID"""
+
+    def __init__(self, history: int = 1000):
+        self._events: deque = deque(maxlen=history)  # (id, type, json data)
+        self._next_id = 1
+        self._condition = threading.Condition()
+        self._subscribers = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscribers
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def publish(self, event_type: str, data: Dict) -> int:
+        """Store an event and wake every waiting stream"""
+        payload = json.dumps(data)
+        with self._condition:
+            event_id = self._next_id
+            self._next_id += 1
+            self._events.append((event_id, event_type, payload))
+            self._condition.notify_all()
+        return event_id
+
+    def _events_after(self, last_id: int) -> Optional[List[Tuple[int, str, str]]]:
+        """Events newer than last_id, or None if some were already dropped"""
+        if self._events and self._events[0][0] > last_id + 1:
+            return None
+        return [event for event in self._events if event[0] > last_id]
+
+    def wait_for_events(self, last_id: int, timeout: float) -> Optional[List[Tuple[int, str, str]]]:
+        """Block until there is something newer than last_id (or timeout)"""
+        with self._condition:
+            if self.last_id <= last_id:
+                self._condition.wait(timeout)
+            return self._events_after(last_id)
+
+    def stream(self, last_id: Optional[int] = None, keepalive: float = 15.0) -> Iterator[str]:
+        """Yield SSE-formatted text for one client connection
+
+        Without last_id the client gets only events published from now on.
+        If the client is too far behind to replay, it gets a 'reset' event
+        and should reload the full list.
+        """
+        with self._condition:
+            self._subscribers += 1
+            if last_id is None or last_id > self.last_id:
+                last_id = self.last_id
+
+        try:
+            # Ask browsers to wait 5 s before reconnecting
+            yield 'retry: 5000\n\n'
+
+            while True:
+                events = self.wait_for_events(last_id, keepalive)
+
+                if events is None:
+                    last_id = self.last_id
+                    yield format_event(last_id, 'reset', json.dumps({'last_id': last_id}))
+                elif events:
+                    for event_id, event_type, payload in events:
+                        yield format_event(event_id, event_type, payload)
+                    last_id = events[-1][0]
+                else:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+
+
+def format_event(event_id: int, event_type: str, payload: str) -> str:
+    """One SSE message (id, event name and a single data line)"""
+    return f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'
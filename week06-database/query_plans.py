@@ -0,0 +1,35 @@
+"""
+Query plan helpers shared by the check_query_plans scripts (week 6 and 11)
+
+SQLite's EXPLAIN QUERY PLAN prints "SCAN <table>" for a full table scan and
+"SEARCH <table> USING INDEX ..." when an index is used. Each hot query lists
+the tables it is allowed to scan (e.g. the fleet list reads every equipment
+on purpose) and whether it may sort its rows; any other full scan, or a sort
+where the index should already deliver the order, counts as a regression.
+"""
+
+import re
+from typing import List
+
+
+def explain(engine, query) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for an ORM query or statement"""
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_problems(plan: List[str], tables: set, allowed_scans: set, may_sort: bool) -> List[str]:
+    """Full scans of `tables` and whole-result sorts that are not allowed"""
+    problems = []
+    for line in plan:
+        match = re.match(r'SCAN (\w+)', line)
+        if match and match.group(1) in tables and 'USING' not in line \
+                and match.group(1) not in allowed_scans:
+            problems.append(line)
+        if line.startswith('USE TEMP B-TREE FOR ORDER BY') and not may_sort:
+            problems.append(line)
+    return problems
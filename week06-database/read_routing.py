@@ -0,0 +1,106 @@
+"""
+Read-Only Connection Routing
+Goal: Give dashboard reads their own connections, separate from the writers
+New concepts: SQLAlchemy binds, Session.get_bind, SQLite URI filenames (mode=ro), backup API
+
+Routes marked with @read_only (or every route of a blueprint passed to
+route_blueprint_reads) run their queries on the 'read' bind; everything
+else uses the primary database as before. The read bind is either
+
+- the primary file opened with mode=ro: own pool, cannot write by accident
+  (pair it with the WAL profile so readers don't wait on writers), or
+- a replica file refreshed from the primary with SQLite's backup API
+  (refresh_replica): readers never touch the primary file at all, so read
+  workers can be added without adding lock contention. Reads are as old as
+  the last refresh.
+
+A write inside a read-only route fails with "attempt to write a readonly
+database" instead of silently going to the replica.
+"""
+
+import sqlite3
+from functools import wraps
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+READ_BIND = 'read'
+
+# Kept on the request (not on g, which can outlive it inside an app context)
+ROLE_KEY = 'database.role'
+
+
+def sqlite_path(url) -> str:
+    """Database file of a SQLite URL, also for sqlite:///file:...?uri=true URLs"""
+    url = make_url(url)
+    database = url.database or ''
+    return database[len('file:'):] if url.query.get('uri') else database
+
+
+def configure_read_bind(app, replica_path: str = None) -> bool:
+    """Add the 'read' bind to the app config (before SQLAlchemy(app) is created)
+
+    Uses the replica file if given, otherwise the primary database file in
+    read-only mode. Returns False for databases that are not a SQLite file.
+    """
+    primary = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if primary.get_backend_name() != 'sqlite' or sqlite_path(primary) in ('', ':memory:'):
+        return False
+
+    path = replica_path or sqlite_path(primary)
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds[READ_BIND] = f'sqlite:///file:{path}?mode=ro&uri=true'
+    app.config['SQLALCHEMY_BINDS'] = binds
+    return True
+
+
+def reads_routed() -> bool:
+    return has_request_context() and request.environ.get(ROLE_KEY) == 'read'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends read-only routes to the read bind
+
+    Use with SQLAlchemy(app, session_options={'class_': RoutingSession}).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and reads_routed() and READ_BIND in self._db.engines:
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_read_connections():
+    """Route the rest of this request to the read bind"""
+    request.environ[ROLE_KEY] = 'read'
+
+
+def read_only(view):
+    """Route decorator: this view only reads"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        use_read_connections()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def route_blueprint_reads(blueprint):
+    """Send every route of a blueprint to the read bind"""
+    blueprint.before_request(use_read_connections)
+
+
+def refresh_replica(primary_path: str, replica_path: str) -> int:
+    """Copy a consistent snapshot of the primary into the replica file
+
+    The backup runs as one transaction on the replica, so readers see the
+    old snapshot or the new one. Returns the number of pages copied.
+    """
+    source = sqlite3.connect(f'file:{primary_path}?mode=ro', uri=True)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+        return target.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        target.close()
+        source.close()
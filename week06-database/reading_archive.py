@@ -0,0 +1,189 @@
+"""
+Columnar Archive for Old Performance Readings
+Goal: Keep years of history out of the live database but still fast to read
+New concepts: columnar storage, memory-mapped .npy files, partitioning
+
+Each equipment gets one folder per month, and each month stores every
+column as its own NumPy .npy file:
+
+    archive/<equipment_id>/<YYYY-MM>/reading_date.npy
+                                     availability.npy
+                                     ...
+
+Reading a month maps the files into memory (np.load(..., mmap_mode='r')),
+so a long-range query touches only the columns and months it needs and
+never builds one Python object per reading. Files are plain uncompressed
+.npy because compressed .npz files cannot be memory-mapped; the columns use
+compact fixed-size types instead (status is stored as a one-byte code).
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Column name -> NumPy type. Missing floats are stored as NaN.
+ARCHIVE_COLUMNS = {
+    'id': np.int64,
+    'reading_date': 'datetime64[us]',
+    'total_hours': np.float64,
+    'uptime_hours': np.float64,
+    'failures': np.int32,
+    'availability': np.float64,
+    'mtbf': np.float64,
+    'mttr': np.float64,
+    'status': np.uint8,
+}
+
+# status.npy holds an index into this tuple
+STATUS_CODES = (None, 'GOOD', 'FAIR', 'POOR')
+
+
+def encode_status(statuses) -> np.ndarray:
+    codes = {status: code for code, status in enumerate(STATUS_CODES)}
+    return np.array([codes.get(status, 0) for status in statuses], dtype=np.uint8)
+
+
+def decode_status(codes: np.ndarray) -> List[Optional[str]]:
+    return [STATUS_CODES[code] for code in codes.tolist()]
+
+
+def empty_columns() -> Dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=dtype) for name, dtype in ARCHIVE_COLUMNS.items()}
+
+
+class ReadingArchive:
+    """Monthly column files per equipment under one root folder"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def equipment_dir(self, equipment_id: int) -> str:
+        return os.path.join(self.root, str(equipment_id))
+
+    def months(self, equipment_id: int) -> List[str]:
+        """Archived months ('YYYY-MM'), oldest first"""
+        try:
+            names = os.listdir(self.equipment_dir(equipment_id))
+        except FileNotFoundError:
+            return []
+        # Skip half-written (.tmp) and replaced (.old) folders
+        return sorted(name for name in names if '.' not in name)
+
+    def read_month(self, equipment_id: int, month: str, columns=ARCHIVE_COLUMNS) -> Dict[str, np.ndarray]:
+        """Memory-mapped columns of one month (read-only, nothing is copied)"""
+        folder = os.path.join(self.equipment_dir(equipment_id), month)
+        return {
+            name: np.load(os.path.join(folder, f'{name}.npy'), mmap_mode='r')
+            for name in columns
+        }
+
+    def read_notes(self, equipment_id: int, month: str) -> Dict[int, str]:
+        """Non-empty notes of one month, by reading id"""
+        path = os.path.join(self.equipment_dir(equipment_id), month, 'notes.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return {int(reading_id): note for reading_id, note in json.load(file).items()}
+
+    def read(self, equipment_id: int, start=None, end=None, columns=ARCHIVE_COLUMNS) -> Dict[str, np.ndarray]:
+        """Columns for readings with start <= reading_date < end, oldest first
+
+        Only the named columns are opened, and months outside the range are
+        skipped without opening any of their files.
+        """
+        columns = ['reading_date'] + [name for name in columns if name != 'reading_date']
+        start = np.datetime64(start, 'us') if start is not None else None
+        end = np.datetime64(end, 'us') if end is not None else None
+
+        parts = []
+        for month in self.months(equipment_id):
+            month_start = np.datetime64(month, 'M')
+            if end is not None and month_start.astype('datetime64[us]') >= end:
+                break
+            if start is not None and (month_start + 1).astype('datetime64[us]') <= start:
+                continue
+
+            month_columns = self.read_month(equipment_id, month, columns)
+            dates = month_columns['reading_date']
+            keep = np.ones(len(dates), dtype=bool)
+            if start is not None:
+                keep &= dates >= start
+            if end is not None:
+                keep &= dates < end
+            parts.append({name: column[keep] for name, column in month_columns.items()})
+
+        if not parts:
+            return {name: column for name, column in empty_columns().items() if name in columns}
+        return {name: np.concatenate([part[name] for part in parts]) for name in columns}
+
+    def newest(self, equipment_id: int, limit: int) -> Dict[str, np.ndarray]:
+        """Up to `limit` most recent archived readings, newest first"""
+        parts, count = [], 0
+        for month in reversed(self.months(equipment_id)):
+            if count >= limit:
+                break
+            columns = self.read_month(equipment_id, month)
+            part = {name: column[::-1][:limit - count] for name, column in columns.items()}
+            parts.append(part)
+            count += len(part['id'])
+
+        if not parts:
+            return empty_columns()
+        return {name: np.concatenate([part[name] for part in parts]) for name in ARCHIVE_COLUMNS}
+
+    def write(self, equipment_id: int, columns: Dict[str, np.ndarray], notes: Dict[int, str] = None) -> int:
+        """Add readings to the archive, one partition per month
+
+        Months that already exist are merged. Rows are matched on reading id,
+        so writing the same readings twice (e.g. after a crash before they
+        were deleted from the database) does not duplicate them.
+        """
+        notes = notes or {}
+        columns = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in ARCHIVE_COLUMNS.items()}
+        months = columns['reading_date'].astype('datetime64[M]')
+
+        for month in np.unique(months):
+            in_month = months == month
+            part = {name: column[in_month] for name, column in columns.items()}
+            part_notes = {reading_id: notes[reading_id] for reading_id in part['id'].tolist()
+                          if notes.get(reading_id)}
+            self._write_month(equipment_id, str(month), part, part_notes)
+
+        return len(columns['id'])
+
+    def _write_month(self, equipment_id: int, month: str, part: Dict[str, np.ndarray], notes: Dict[int, str]):
+        folder = os.path.join(self.equipment_dir(equipment_id), month)
+        tmp_folder, old_folder = folder + '.tmp', folder + '.old'
+
+        # Finish a replacement that was interrupted last time
+        if os.path.exists(old_folder) and not os.path.exists(folder):
+            os.replace(old_folder, folder)
+
+        if os.path.exists(folder):
+            existing = self.read_month(equipment_id, month)
+            keep = ~np.isin(existing['id'], part['id'])
+            part = {name: np.concatenate([existing[name][keep], part[name]]) for name in ARCHIVE_COLUMNS}
+            notes = {**self.read_notes(equipment_id, month), **notes}
+
+        order = np.lexsort((part['id'], part['reading_date']))
+
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        os.makedirs(tmp_folder)
+        for name in ARCHIVE_COLUMNS:
+            np.save(os.path.join(tmp_folder, f'{name}.npy'), np.ascontiguousarray(part[name][order]))
+        if notes:
+            with open(os.path.join(tmp_folder, 'notes.json'), 'w') as file:
+                json.dump({str(reading_id): note for reading_id, note in notes.items()}, file)
+
+        # Swap folders so readers see the old month or the new one, never a mix
+        if os.path.exists(folder):
+            os.replace(folder, old_folder)
+        os.replace(tmp_folder, folder)
+        shutil.rmtree(old_folder, ignore_errors=True)
+
+    def remove(self, equipment_id: int):
+        """Delete everything archived for one equipment"""
+        shutil.rmtree(self.equipment_dir(equipment_id), ignore_errors=True)
@@ -0,0 +1,158 @@
+"""
+Time-Series Helpers for Reading History
+Goal: Send years of readings to a chart as a few hundred points
+New concepts: time buckets, mergeable aggregates, LTTB downsampling
+
+Readings are first grouped into fixed buckets (hour, day or week) in SQL.
+Each bucket keeps sums and counts rather than averages, so buckets from
+different sources can be merged before the averages are taken. If there are
+still more buckets than the chart can use, Largest-Triangle-Three-Buckets
+keeps the points that preserve the shape of the line (peaks and dips)
+instead of every n-th point.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# SQLite expression for the start of each bucket, given a date column
+BUCKET_EXPRESSIONS = {
+    '1h': "strftime('%Y-%m-%d %H:00:00', {column})",
+    '1d': "date({column})",
+    '1w': "date({column}, 'weekday 0', '-6 days')",  # Monday of the week
+}
+
+# The same buckets as NumPy datetime units, for data outside the database
+BUCKET_UNITS = {
+    '1h': 'datetime64[h]',
+    '1d': 'datetime64[D]',
+    '1w': 'datetime64[D]',
+}
+
+# Columns every bucket carries (all of them can simply be added up)
+BUCKET_FIELDS = ('readings', 'availability_sum', 'availability_count',
+                 'mtbf_sum', 'mtbf_count', 'failures')
+
+
+def parse_bucket_start(value: str) -> datetime:
+    """Bucket keys are 'YYYY-MM-DD' or 'YYYY-MM-DD HH:00:00'"""
+    return datetime.fromisoformat(value)
+
+
+def bucket_floor(dates: np.ndarray, bucket: str) -> np.ndarray:
+    """Start of the bucket for every date (same rules as BUCKET_EXPRESSIONS)"""
+    starts = dates.astype(BUCKET_UNITS[bucket])
+    if bucket == '1w':
+        # Day 0 (1970-01-01) was a Thursday, so Monday is 3 days before it
+        starts = starts - (starts.astype(np.int64) + 3) % 7
+    return starts
+
+
+def aggregate_buckets(dates: np.ndarray, bucket: str, values: Dict[str, np.ndarray]) -> List[Dict]:
+    """Buckets from columns in memory, the NumPy version of the SQL GROUP BY
+
+    `values` has one array per BUCKET_FIELDS name with each reading's
+    contribution (1 for counts), which are summed per bucket.
+    """
+    if len(dates) == 0:
+        return []
+
+    starts, index = np.unique(bucket_floor(dates, bucket), return_inverse=True)
+    totals = {}
+    for field in BUCKET_FIELDS:
+        column = values[field]
+        summed = np.bincount(index, weights=column, minlength=len(starts))
+        totals[field] = np.rint(summed).astype(np.int64) if column.dtype.kind in 'biu' else summed
+
+    start_times = starts.astype('datetime64[us]').astype(datetime)
+    return [
+        dict({field: totals[field][i].item() for field in BUCKET_FIELDS}, start=start_times[i])
+        for i in range(len(starts))
+    ]
+
+
+def merge_buckets(*sources: Iterable[Dict]) -> List[Dict]:
+    """Add up buckets with the same start time, sorted by time"""
+    merged: Dict[datetime, Dict] = {}
+    for source in sources:
+        for bucket in source:
+            target = merged.get(bucket['start'])
+            if target is None:
+                merged[bucket['start']] = dict(bucket)
+            else:
+                for field in BUCKET_FIELDS:
+                    target[field] += bucket[field]
+    return [merged[start] for start in sorted(merged)]
+
+
+def bucket_point(bucket: Dict) -> Dict:
+    """One chart point (averages) from a bucket's sums and counts"""
+    return {
+        'time': bucket['start'].strftime('%Y-%m-%d %H:%M'),
+        'availability': round(bucket['availability_sum'] / bucket['availability_count'], 2)
+                        if bucket['availability_count'] else None,
+        'mtbf': round(bucket['mtbf_sum'] / bucket['mtbf_count'], 2) if bucket['mtbf_count'] else None,
+        'failures': bucket['failures'],
+        'readings': bucket['readings']
+    }
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets would keep
+
+    Always keeps the first and last point. The points in between are split
+    into threshold - 2 buckets; from each one we keep the point that makes
+    the largest triangle with the point kept before it and the average of
+    the next bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket edges for the n - 2 inner points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area for every candidate at once
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+
+    return kept
+
+
+def downsample_buckets(buckets: List[Dict], max_points: int) -> List[Dict]:
+    """Keep at most max_points buckets, chosen by LTTB on average availability"""
+    if len(buckets) <= max_points:
+        return buckets
+
+    x = np.array([b['start'].timestamp() for b in buckets])
+    availability_sum = np.array([b['availability_sum'] for b in buckets], dtype=np.float64)
+    availability_count = np.array([b['availability_count'] for b in buckets], dtype=np.float64)
+
+    # Buckets without readings are drawn at the previous value
+    has_value = availability_count > 0
+    y = np.zeros(len(buckets))
+    np.divide(availability_sum, availability_count, out=y, where=has_value)
+    last_valid = np.maximum.accumulate(np.where(has_value, np.arange(len(buckets)), 0))
+    y = y[last_valid]
+
+    return [buckets[i] for i in lttb_indices(x, y, max_points)]
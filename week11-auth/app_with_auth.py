@@ -8,10 +8,19 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import os
+import sys
+import threading
+import time
 from sqlalchemy import func
+from sqlalchemy.orm import make_transient_to_detached, object_session
+from sqlalchemy.dialects.sqlite import insert
 import secrets
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -19,16 +28,78 @@ app = Flask(__name__)
 # Configuration
 app.config['SECRET_KEY'] = secrets.token_hex(16)  # Generate a secure secret key
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "reliability_auth.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f'sqlite:///{os.path.join(basedir, "reliability_auth.db")}'
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Password hashing policy: any werkzeug method, e.g. 'scrypt:32768:8:1' or
+# 'pbkdf2:sha256:600000'. Hashes made with another method are replaced
+# with one using this method the next time the user logs in.
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+
+# load_user runs on every authenticated request; keep recently seen users
+# for a while instead of querying them each time (0 turns the cache off).
+# Changes made in this process invalidate the entry at once; other worker
+# processes see them after at most USER_CACHE_TTL seconds.
+app.config['USER_CACHE_SIZE'] = 1024
+app.config['USER_CACHE_TTL'] = 60
+
+# Bearer tokens for API clients (POST /api/login with "mode": "token").
+# A token carries the user id and admin flag and is checked in memory, no
+# query. API_TOKEN_KEYS is "key_id:secret,key_id:secret", newest first: new tokens
+# are signed with the first key and carry its id, and are checked with the
+# key of that id. To rotate, put a new key in front and drop the old one
+# after API_TOKEN_TTL seconds. Without it tokens are signed with SECRET_KEY.
+def parse_token_keys(setting: str) -> List[Tuple[str, str]]:
+    keys = []
+    for entry in filter(None, setting.split(',')):
+        key_id, separator, secret = entry.partition(':')
+        if not separator or not key_id or '.' in key_id or not secret:
+            raise ValueError(f'API_TOKEN_KEYS entries must be "key_id:secret" (no "." in the id): {key_id!r}')
+        keys.append((key_id, secret))
+    return keys
+
+app.config['API_TOKEN_KEYS'] = parse_token_keys(os.environ.get('API_TOKEN_KEYS', '')) \
+    or [('default', app.config['SECRET_KEY'])]
+app.config['API_TOKEN_TTL'] = 3600
+# Reject tokens issued before their user was deleted or had the admin flag
+# changed in this process (other workers: until the token expires).
+# False makes tokens fully stateless.
+app.config['API_TOKEN_REVOCATION'] = True
+
+# Database profile from week 6: 'development' (SQLite defaults) or
+# 'production' (WAL, tuned PRAGMAs, bigger pool)
+sys.path.append(os.path.join(basedir, '..', 'week06-database'))
+from sqlite_profiles import apply_sqlite_pragmas, database_profile
+app.config['DATABASE_PROFILE'] = os.environ.get('DATABASE_PROFILE', 'development')
+database_settings = database_profile(app.config['DATABASE_PROFILE'])
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_settings['engine_options']
+
+# Read-only routes (@read_only) get their own connections, as in week 6:
+# the database file opened with mode=ro, or a replica when
+# READ_REPLICA_PATH is set (week 6 refresh_replica keeps it up to date)
+from read_routing import RoutingSession, configure_read_bind, read_only, READ_BIND
+app.config['READ_REPLICA_PATH'] = os.environ.get('READ_REPLICA_PATH')
+configure_read_bind(app, app.config['READ_REPLICA_PATH'])
+
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+with app.app_context():
+    apply_sqlite_pragmas(db.engine, database_settings['pragmas'])
+    if READ_BIND in db.engines:
+        # journal_mode belongs to the file and a read-only connection can't change it
+        apply_sqlite_pragmas(db.engines[READ_BIND], {name: value for name, value in database_settings['pragmas'].items()
+                                                     if name != 'journal_mode'})
 CORS(app, origins=['http://localhost:3000'], supports_credentials=True)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+# Shared metric code from week 1
+sys.path.append(os.path.join(basedir, '..', 'week01-foundations'))
+from fleet_metrics import FleetAggregate
+
 # User Model
 class User(UserMixin, db.Model):
     """User account model"""
@@ -43,11 +114,16 @@ class User(UserMixin, db.Model):
     equipment = db.relationship('Equipment', backref='owner', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=app.config['PASSWORD_HASH_METHOD'])
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    def password_needs_rehash(self) -> bool:
+        """True if the stored hash was made with another hashing policy"""
+        stored_method = (self.password_hash or '').split('$', 1)[0]
+        return stored_method != hash_method_prefix(app.config['PASSWORD_HASH_METHOD'])
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -67,14 +143,21 @@ class Equipment(db.Model):
     install_date = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
-    # Unique constraint: same user cannot have duplicate equipment names
+    # Unique constraint: same user cannot have duplicate equipment names.
+    # Its index starts with user_id, so it also serves "equipment for this user".
     __table_args__ = (db.UniqueConstraint('user_id', 'name', name='_user_equipment_uc'),)
     
     readings = db.relationship('PerformanceReading', backref='equipment', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        latest_reading = PerformanceReading.query.filter_by(equipment_id=self.id)\
-                        .order_by(PerformanceReading.reading_date.desc()).first()
+    def to_dict(self, latest_reading=None, fetch_latest=True):
+        """Convert to dictionary for JSON
+
+        Pass fetch_latest=False when latest_reading was already loaded
+        (see load_fleet_snapshot) to avoid one extra query per equipment.
+        """
+        if fetch_latest:
+            latest_reading = PerformanceReading.query.filter_by(equipment_id=self.id)\
+                            .order_by(PerformanceReading.reading_date.desc()).first()
         
         if latest_reading:
             return {
@@ -120,6 +203,11 @@ class PerformanceReading(db.Model):
     status = db.Column(db.String(20))
     notes = db.Column(db.Text)
     
+    # Every hot query filters by equipment and orders by date
+    __table_args__ = (
+        db.Index('ix_performance_reading_equipment_date', 'equipment_id', 'reading_date'),
+    )
+    
     def calculate_metrics(self):
         downtime = self.total_hours - self.uptime_hours
         self.availability = (self.uptime_hours / self.total_hours * 100) if self.total_hours > 0 else 0
@@ -133,9 +221,329 @@ class PerformanceReading(db.Model):
         else:
             self.status = 'POOR'
 
+class FleetStatistics(db.Model):
+    """Running fleet totals for one user (see FleetAggregate)
+
+    Updated in the same transaction as every equipment add/delete and every
+    reading that becomes an equipment's latest, so GET /api/equipment can
+    serve statistics without scanning the user's fleet. `version` goes up
+    with every change to the user's fleet (the ETag of GET /api/equipment).
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    equipment_count = db.Column(db.Integer, nullable=False, default=0)
+    availability_count = db.Column(db.Integer, nullable=False, default=0)
+    availability_sum = db.Column(db.Float, nullable=False, default=0)
+    mtbf_count = db.Column(db.Integer, nullable=False, default=0)
+    mtbf_sum = db.Column(db.Float, nullable=False, default=0)
+    good_count = db.Column(db.Integer, nullable=False, default=0)
+    fair_count = db.Column(db.Integer, nullable=False, default=0)
+    poor_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_aggregate(self) -> FleetAggregate:
+        return FleetAggregate(**{field: getattr(self, field) for field in FleetAggregate.FIELDS})
+
+def reading_delta(reading, sign=1) -> Dict:
+    """FleetAggregate change for adding (or removing) a latest reading"""
+    return FleetAggregate.reading_delta(reading.availability, reading.mtbf,
+                                        reading.failures, reading.status, sign)
+
+def update_fleet_statistics(connection, user_id, *deltas: Dict):
+    """Add the deltas to a user's FleetStatistics row and bump its version
+
+    One upsert: the first change for a new user creates the row.
+    """
+    totals = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            totals[field] = totals.get(field, 0) + value
+    totals = {field: value for field, value in totals.items() if value}
+    
+    table = FleetStatistics.__table__
+    values = {field: table.c[field] + value for field, value in totals.items()}
+    values['version'] = table.c.version + 1
+    connection.execute(
+        insert(table).values(user_id=user_id, version=1, **totals)
+        .on_conflict_do_update(index_elements=[table.c.user_id], set_=values)
+    )
+
+def latest_readings_for(connection, equipment_id, limit=1) -> List:
+    """Newest reading rows for one equipment (one index seek)"""
+    readings = PerformanceReading.__table__
+    return connection.execute(
+        db.select(readings.c.id, readings.c.availability, readings.c.mtbf,
+                  readings.c.failures, readings.c.status)
+        .where(readings.c.equipment_id == equipment_id)
+        .order_by(readings.c.reading_date.desc(), readings.c.id.desc())
+        .limit(limit)
+    ).all()
+
+def equipment_owner(connection, equipment_id):
+    equipment = Equipment.__table__
+    return connection.execute(
+        db.select(equipment.c.user_id).where(equipment.c.id == equipment_id)
+    ).scalar()
+
+@db.event.listens_for(PerformanceReading, 'after_insert')
+def update_statistics_for_reading(mapper, connection, reading):
+    """Move the owner's statistics to this reading if it is now the latest
+
+    An older (backfilled) reading leaves the totals alone but still counts
+    as a change to the fleet.
+    """
+    newest = latest_readings_for(connection, reading.equipment_id, limit=2)
+    deltas = []
+    if newest[0].id == reading.id:
+        deltas.append(reading_delta(reading))
+        if len(newest) > 1:
+            deltas.append(reading_delta(newest[1], sign=-1))
+    update_fleet_statistics(connection, equipment_owner(connection, reading.equipment_id), *deltas)
+
+@db.event.listens_for(Equipment, 'after_insert')
+def count_new_equipment(mapper, connection, equipment):
+    update_fleet_statistics(connection, equipment.user_id, {'equipment_count': 1})
+
+@db.event.listens_for(db.session, 'before_flush')
+def remove_deleted_equipment(session, flush_context, instances):
+    """Take deleted equipment (and its latest reading) out of the totals
+
+    Done before the flush because the cascade deletes the readings first.
+    """
+    for equipment in [obj for obj in session.deleted if isinstance(obj, Equipment)]:
+        connection = session.connection()
+        deltas = [{'equipment_count': -1}]
+        deltas += [reading_delta(r, sign=-1) for r in latest_readings_for(connection, equipment.id)]
+        update_fleet_statistics(connection, equipment.user_id, *deltas)
+
+def ensure_indexes():
+    """Create model indexes that are missing from an existing database"""
+    for model in (User, Equipment, PerformanceReading):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def fleet_snapshot_query(user_id):
+    """Query of (equipment, latest_reading) pairs, see load_fleet_snapshot"""
+    # Number each equipment's readings newest-first, then keep row 1
+    ranked = db.session.query(
+        PerformanceReading.id,
+        PerformanceReading.equipment_id,
+        func.row_number().over(
+            partition_by=PerformanceReading.equipment_id,
+            order_by=(PerformanceReading.reading_date.desc(), PerformanceReading.id.desc())
+        ).label('row_number')
+    ).join(
+        Equipment, Equipment.id == PerformanceReading.equipment_id
+    ).filter(
+        Equipment.user_id == user_id
+    ).subquery()
+
+    latest = db.session.query(ranked.c.equipment_id, ranked.c.id.label('reading_id'))\
+               .filter(ranked.c.row_number == 1).subquery()
+
+    return db.session.query(Equipment, PerformanceReading)\
+             .outerjoin(latest, latest.c.equipment_id == Equipment.id)\
+             .outerjoin(PerformanceReading, PerformanceReading.id == latest.c.reading_id)\
+             .filter(Equipment.user_id == user_id)\
+             .order_by(Equipment.id)
+
+def fleet_version(user_id) -> int:
+    """A counter that goes up with every change to the user's fleet
+
+    Bumped by update_fleet_statistics in the same transaction as the change,
+    so it is shared by all workers and no commit is missed. One primary key
+    lookup; 0 for a user who never had any equipment.
+    """
+    version = db.session.query(FleetStatistics.version).filter(FleetStatistics.user_id == user_id).scalar()
+    return version or 0
+
+def not_modified(etag):
+    """Empty 304 response for a client that already has this version"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def load_fleet_snapshot(user_id):
+    """Load every equipment with its latest reading in a single query
+
+    Only equipment owned by user_id is included. Returns a list of
+    (equipment, latest_reading) pairs; latest_reading is None for
+    equipment that has no readings yet.
+    """
+    return fleet_snapshot_query(user_id).all()
+
+def load_fleet_statistics(user_id) -> Dict:
+    """Statistics block from the user's running totals (one primary key lookup)"""
+    row = db.session.get(FleetStatistics, user_id)
+    if row is None:
+        return FleetAggregate().statistics()
+    return row.to_aggregate().statistics()
+
+def rebuild_fleet_statistics(user_id):
+    """Replace a user's running totals with a full recompute; the caller commits"""
+    aggregate = FleetAggregate()
+    for _, reading in load_fleet_snapshot(user_id):
+        aggregate.add_equipment()
+        if reading is not None:
+            aggregate.add_reading(reading.availability, reading.mtbf, reading.failures, reading.status)
+    
+    row = db.session.get(FleetStatistics, user_id) or FleetStatistics(user_id=user_id, version=0)
+    for field, value in aggregate.as_dict().items():
+        setattr(row, field, value)
+    row.version += 1
+    db.session.add(row)
+
+@lru_cache(maxsize=None)
+def hash_method_prefix(method: str) -> str:
+    """Method part of a hash made with `method`, with werkzeug's defaults filled in
+
+    'pbkdf2' becomes e.g. 'pbkdf2:sha256:1000000', as it appears in stored hashes.
+    """
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+class UserCache:
+    """Least-recently-used cache of user rows with a time-to-live
+
+    Stores column values, not User objects: an ORM object belongs to the
+    session of the request that loaded it and can't be shared between
+    requests or threads.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # user_id -> (expires_at, values)
+        self._lock = threading.Lock()
+    
+    def get(self, user_id: int) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+    
+    def put(self, user_id: int, values: Dict):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, user):
+    """Drop a changed user from the cache, and again once the change is committed
+
+    Until the commit other requests still read the old row, and a
+    load_user in between would put it back into the cache.
+    """
+    user_cache.invalidate(user.id)
+    object_session(user).info.setdefault('changed_user_ids', set()).add(user.id)
+
+@db.event.listens_for(db.session, 'after_commit')
+@db.event.listens_for(db.session, 'after_rollback')
+def invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_cache.invalidate(user_id)
+
+# user id -> time before which that user's bearer tokens are rejected
+token_revocations: Dict[int, float] = {}
+
+def revoke_api_tokens(user_id: int):
+    token_revocations[user_id] = time.time()
+
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def revoke_outdated_tokens(mapper, connection, user):
+    """Tokens carry the admin flag, so a role change or deletion revokes them
+
+    Again after the commit, for tokens issued from the old row meanwhile.
+    """
+    state = db.inspect(user)
+    if state.attrs.is_admin.history.has_changes() or user in object_session(user).deleted:
+        revoke_api_tokens(user.id)
+        object_session(user).info.setdefault('revoked_user_ids', set()).add(user.id)
+
+@db.event.listens_for(db.session, 'after_commit')
+def revoke_committed_changes(session):
+    for user_id in session.info.pop('revoked_user_ids', ()):
+        revoke_api_tokens(user_id)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    """User for the session cookie, from the cache when possible
+
+    A cached user is attached to this request's session without a query
+    (merge with load=False), so it behaves like a freshly loaded one.
+    """
+    user_id = int(user_id)
+    values = user_cache.get(user_id)
+    if values is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            user_cache.put(user_id, {column.key: getattr(user, column.key) for column in User.__table__.columns})
+        return user
+    
+    return attach_user(values)
+
+def attach_user(values: Dict):
+    """User with these column values in the current session, without a query
+
+    Columns missing from `values` are loaded from the database on first use.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+def token_serializer(secret: str) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(secret, salt='api-token')
+
+def issue_api_token(user) -> str:
+    """'<key id>.<HMAC-signed user id, admin flag and issue time>', signed with the newest key"""
+    key_id, secret = app.config['API_TOKEN_KEYS'][0]
+    claims = {'uid': user.id, 'adm': bool(user.is_admin), 'iat': time.time()}
+    return f"{key_id}.{token_serializer(secret).dumps(claims)}"
+
+@login_manager.request_loader
+def load_user_from_token(request):
+    """Authorization: Bearer <token>
+
+    Checked in memory: the signature with the key named in the token,
+    then the revocations (API_TOKEN_REVOCATION). The user is built from
+    the claims and attached without a query; other columns load only if
+    a route uses them. Otherwise a token stays valid until it expires
+    (API_TOKEN_TTL) or its key is removed from API_TOKEN_KEYS.
+    """
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    key_id, _, signed = token.partition('.')
+    secret = dict(app.config['API_TOKEN_KEYS']).get(key_id)
+    if secret is None:
+        return None
+    try:
+        claims = token_serializer(secret).loads(signed, max_age=app.config['API_TOKEN_TTL'])
+    except (SignatureExpired, BadSignature):
+        return None
+    if app.config['API_TOKEN_REVOCATION'] and claims['iat'] <= token_revocations.get(claims['uid'], 0):
+        return None
+    return attach_user({'id': claims['uid'], 'is_admin': claims['adm']})
 
 # Authentication Routes
 @app.route('/api/register', methods=['POST'])
@@ -200,6 +608,22 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid credentials'}), 401
         
+        # The password is known right now, so this is the moment to move
+        # the stored hash to the current policy
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
+        # API clients get a bearer token instead of a session cookie
+        if data.get('mode') == 'token':
+            return jsonify({
+                'success': True,
+                'token': issue_api_token(user),
+                'token_type': 'Bearer',
+                'expires_in': app.config['API_TOKEN_TTL'],
+                'user': user.to_dict()
+            })
+        
         login_user(user, remember=True)
         
         return jsonify({
@@ -232,57 +656,33 @@ def get_current_user():
 # Protected Equipment Routes (now user-specific)
 @app.route('/api/equipment')
 @login_required
+@read_only
 def get_equipment():
-    """Get all equipment for current user"""
+    """Get all equipment for current user
+
+    Answers If-None-Match with 304 after one primary key lookup. The user
+    is loaded (by login_required) before reads are routed, so logins and
+    permission changes always come from the primary database.
+    """
     try:
-        # Get only equipment owned by current user
-        equipment_list = Equipment.query.filter_by(user_id=current_user.id).all()
-        equipment_data = [eq.to_dict() for eq in equipment_list]
-        
-        # Calculate statistics for user's equipment only
-        total_equipment = len(equipment_data)
+        # Each user sees different equipment, so the user is part of the tag
+        etag = f'fleet-{current_user.id}-{fleet_version(current_user.id)}'
+        if etag in request.if_none_match:
+            return not_modified(etag)
         
-        if total_equipment > 0:
-            # Get latest readings for user's equipment
-            user_equipment_ids = [eq.id for eq in equipment_list]
-            
-            subquery = db.session.query(
-                PerformanceReading.equipment_id,
-                func.max(PerformanceReading.reading_date).label('max_date')
-            ).filter(
-                PerformanceReading.equipment_id.in_(user_equipment_ids)
-            ).group_by(PerformanceReading.equipment_id).subquery()
-
-            latest_readings = db.session.query(PerformanceReading).join(
-                subquery,
-                (PerformanceReading.equipment_id == subquery.c.equipment_id) &
-                (PerformanceReading.reading_date == subquery.c.max_date)
-            ).all()
-            
-            if latest_readings:
-                valid_readings = [r for r in latest_readings if r.availability is not None]
-                avg_availability = sum(r.availability for r in valid_readings) / len(valid_readings) if valid_readings else 0
-                critical_count = sum(1 for r in latest_readings if r.status == 'POOR')
-                readings_with_failures = [r for r in latest_readings if r.failures > 0 and r.mtbf < 999999]
-                avg_mtbf = sum(r.mtbf for r in readings_with_failures) / len(readings_with_failures) if readings_with_failures else 0
-            else:
-                avg_availability = 0
-                critical_count = 0
-                avg_mtbf = 0
-        else:
-            avg_availability = 0
-            critical_count = 0
-            avg_mtbf = 0
+        # Get only equipment owned by current user, with latest readings
+        snapshot = load_fleet_snapshot(current_user.id)
+        equipment_data = [eq.to_dict(reading, fetch_latest=False) for eq, reading in snapshot]
         
-        return jsonify({
+        # Statistics for user's equipment only, kept up to date on every write
+        response = jsonify({
             'equipment': equipment_data,
-            'statistics': {
-                'fleet_availability': round(avg_availability, 2),
-                'total_equipment': total_equipment,
-                'critical_alerts': critical_count,
-                'avg_mtbf': round(avg_mtbf, 2)
-            }
+            'statistics': load_fleet_statistics(current_user.id)
         })
+        response.set_etag(etag)
+        # Let browsers keep the body but always revalidate with the ETag
+        response.cache_control.no_cache = True
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -415,7 +815,14 @@ def dashboard():
 def init_database():
     """Initialize database with demo data"""
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)  # primary only, the read bind is read-only
+        ensure_indexes()
+        
+        # Build running statistics for users from before the table existed
+        missing = User.query.outerjoin(FleetStatistics).filter(FleetStatistics.user_id.is_(None)).all()
+        for user in missing:
+            rebuild_fleet_statistics(user.id)
+        db.session.commit()
         
         # Create demo user if no users exist
         if User.query.count() == 0:
@@ -443,7 +850,7 @@ if __name__ == '__main__':
     
     print("\nAPI Endpoints:")
     print("  POST /api/register - Create new account")
-    print("  POST /api/login - Login")
+    print("  POST /api/login - Login (add \"mode\": \"token\" for a bearer token)")
     print("  POST /api/logout - Logout")
     print("  GET  /api/user - Get current user")
     print("  GET  /api/equipment - Get user's equipment (protected)")
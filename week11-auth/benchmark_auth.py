@@ -0,0 +1,101 @@
+"""
+Benchmark: authenticated GET /api/equipment - session cookie (with and
+without the user cache) vs. bearer token
+Usage: python benchmark_auth.py [number_of_requests] [number_of_equipment]
+
+Runs against a scratch SQLite file. Measures the full response and the
+304 (If-None-Match) path, where loading the user is most of the work, and
+counts SQL statements per request. Also shows a password hash made with an
+older policy being replaced on login.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Point the app at a throwaway database before it is imported
+scratch_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch_dir, 'auth_bench.db')}"
+
+from werkzeug.security import generate_password_hash
+
+from app_with_auth import app, db, User, init_database, user_cache
+
+statements = 0
+
+
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+def time_requests(client, requests: int, headers=None):
+    """(ms per request, SQL statements per request)"""
+    global statements
+    statements = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/api/equipment', headers=headers or {})
+        assert response.status_code in (200, 304), response.status_code
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1000, statements / requests
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    equipment_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    init_database()
+    client = app.test_client()
+
+    # Give the demo user a hash from an older policy, then log in
+    with app.app_context():
+        demo = User.query.filter_by(username='demo').first()
+        demo.password_hash = generate_password_hash('demo123', method='pbkdf2:sha256:600000')
+        db.session.commit()
+
+    start = time.perf_counter()
+    client.post('/api/login', json={'username': 'demo', 'password': 'demo123'})
+    first_login = time.perf_counter() - start
+    start = time.perf_counter()
+    client.post('/api/login', json={'username': 'demo', 'password': 'demo123'})
+    second_login = time.perf_counter() - start
+
+    with app.app_context():
+        stored_method = User.query.filter_by(username='demo').first().password_hash.split('$')[0]
+    print(f"Login with old pbkdf2 hash: {first_login * 1000:.0f} ms (rehashed to {stored_method}), "
+          f"next login: {second_login * 1000:.0f} ms")
+
+    for i in range(equipment_count):
+        client.post('/api/equipment/add', json={
+            'name': f'Asset-{i}', 'total_hours': 720, 'uptime_hours': 700, 'failures': i % 5
+        })
+    etag = client.get('/api/equipment').headers['ETag']
+
+    with app.app_context():
+        # The primary and the read bind used by GET /api/equipment
+        for engine in db.engines.values():
+            db.event.listen(engine, 'before_cursor_execute', count_statement)
+
+    print(f"{requests} authenticated requests, {equipment_count} equipment")
+    for label, maxsize in (('no user cache', 0), ('LRU+TTL cache', app.config['USER_CACHE_SIZE'])):
+        user_cache.maxsize = maxsize
+        user_cache.clear()
+        full_ms, full_sql = time_requests(client, requests)
+        cached_ms, cached_sql = time_requests(client, requests, {'If-None-Match': etag})
+        print(f"  {label:14s} 200: {full_ms:6.3f} ms ({full_sql:.0f} SQL)   "
+              f"304: {cached_ms:6.3f} ms ({cached_sql:.0f} SQL)")
+
+    # Stateless client: no cookie, only the bearer token
+    token = client.post('/api/login', json={'username': 'demo', 'password': 'demo123', 'mode': 'token'}).get_json()['token']
+    token_client = app.test_client(use_cookies=False)
+    bearer = {'Authorization': f'Bearer {token}'}
+    full_ms, full_sql = time_requests(token_client, requests, bearer)
+    cached_ms, cached_sql = time_requests(token_client, requests, {**bearer, 'If-None-Match': etag})
+    print(f"  {'bearer token':14s} 200: {full_ms:6.3f} ms ({full_sql:.0f} SQL)   "
+          f"304: {cached_ms:6.3f} ms ({cached_sql:.0f} SQL)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Query Plan Check for the reliability database
+Goal: Fail loudly if a hot query stops using its index
+Usage: python check_query_plans.py   (exit code 1 when a query regressed)
+
+Covers the per-user fleet queries and the login lookup of app_with_auth,
+judged with week 6's query_plans.py (see there for the rules).
+"""
+
+import os
+import sys
+from typing import Dict, Tuple
+
+from sqlalchemy import create_engine
+
+from app_with_auth import app, db, User, Equipment, PerformanceReading, fleet_snapshot_query
+
+# Plan helpers from week 6
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week06-database'))
+from query_plans import explain, find_problems
+
+TABLES = {User.__tablename__, Equipment.__tablename__, PerformanceReading.__tablename__}
+
+
+def hot_queries() -> Dict[str, Tuple[object, set, bool]]:
+    """name -> (query, tables that may be fully scanned, may sort)"""
+    return {
+        # Sorting is fine here: it only touches one user's rows
+        'GET /api/equipment fleet snapshot': (fleet_snapshot_query(1), set(), True),
+        'Equipment.to_dict latest reading': (
+            PerformanceReading.query.filter_by(equipment_id=1)
+            .order_by(PerformanceReading.reading_date.desc()).limit(1),
+            set(), False
+        ),
+        'POST /api/equipment/add duplicate check': (Equipment.query.filter_by(user_id=1, name='Pump-101'), set(), False),
+        'DELETE /api/equipment/<id> ownership check': (Equipment.query.filter_by(id=1, user_id=1), set(), False),
+        'Equipment.readings (delete cascade)': (PerformanceReading.query.filter_by(equipment_id=1), set(), False),
+        'POST /api/login user lookup': (
+            User.query.filter((User.username == 'demo') | (User.email == 'demo')), set(), False
+        ),
+    }
+
+
+def main():
+    # Empty in-memory copy of the schema: plans only depend on the indexes
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+
+    failed = False
+    with app.app_context():
+        for name, (query, allowed_scans, may_sort) in hot_queries().items():
+            plan = explain(engine, query)
+            problems = find_problems(plan, TABLES, allowed_scans, may_sort)
+            print(f"{'FAIL' if problems else 'OK  '}  {name}")
+            for line in plan:
+                print(f"        {line}")
+            failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()